@@ -0,0 +1,45 @@
+"""Simulated cluster the benchmarks run against.
+
+Benchmarks of the helpers which run commands use the local cluster
+simulator as the command transport, so they need neither a cluster nor
+a Glusto config file. Config used by the library gets defined here and
+must be set before any of the library modules get imported.
+"""
+
+from glusto.core import Glusto as g
+
+
+OCP_NODE = "master.example.com"
+HEKETI_DC_NAME = "heketi-storage"
+HEKETI_SERVER_URL = "http://heketi-storage.glusterfs.svc:8080"
+
+# NOTE: commands served by the simulator take most of the time on large
+# scale, so limit amount of rounds to keep the run time reasonable.
+ROUNDS = 3
+
+g.update_config({
+    "ocp_servers": {
+        "master": {OCP_NODE: {"hostname": OCP_NODE}},
+        "client": {OCP_NODE: {"hostname": OCP_NODE}},
+        "nodes": {},
+    },
+    "gluster_servers": {},
+    "openshift": {
+        "storage_project_name": "glusterfs",
+        "heketi_config": {
+            "heketi_dc_name": HEKETI_DC_NAME,
+            "heketi_service_name": "heketi-storage",
+            "heketi_client_node": OCP_NODE,
+            "heketi_server_url": HEKETI_SERVER_URL,
+            "heketi_cli_user": "admin",
+            "heketi_cli_key": "adminkey",
+        },
+    },
+    "common": {},
+})
+
+
+def run(benchmark, func, *args, **kwargs):
+    """Benchmark function which runs commands on the simulated cluster."""
+    return benchmark.pedantic(
+        func, args=args, kwargs=kwargs, rounds=ROUNDS, iterations=1)
@@ -0,0 +1,33 @@
+from glusto.core import Glusto as g
+import pytest
+
+from benchmarks import cluster
+from openshiftstoragelibs import heketi_ops
+from openshiftstoragelibs import openshift_ops
+from openshiftstoragelibs import simulator
+
+
+@pytest.fixture
+def simulated_cluster():
+    """Factory of the cluster simulators serving commands of a benchmark.
+
+    Accepts the 'ClusterSimulator' args and returns its instance which
+    replaces the command transport till the end of the benchmark.
+    """
+    previous_transports = []
+
+    def create(**kwargs):
+        kwargs.setdefault("seed", 0)
+        kwargs.setdefault("heketi_dc_name", cluster.HEKETI_DC_NAME)
+        simulated = simulator.ClusterSimulator(**kwargs)
+        previous_transports.append(g.set_transport(simulated))
+        openshift_ops.GLUSTER_TOPOLOGY.invalidate()
+        heketi_ops.HEKETI_ENDPOINT.invalidate()
+        return simulated
+
+    yield create
+
+    if previous_transports:
+        g.set_transport(previous_transports[0])
+    openshift_ops.GLUSTER_TOPOLOGY.invalidate()
+    heketi_ops.HEKETI_ENDPOINT.invalidate()
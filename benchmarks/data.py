@@ -0,0 +1,109 @@
+"""Generators of the large command outputs used by the benchmarks.
+
+Outputs have the same structure as the ones recorded on real clusters,
+but are generated to be able to get any amount of objects in them.
+"""
+
+import json
+
+import yaml
+
+
+AMOUNTS = (10, 100, 1000, 5000)
+
+
+def get_pv(index):
+    pvc_name = "autotests-pvc-%05d" % index
+    return {
+        "apiVersion": "v1",
+        "kind": "PersistentVolume",
+        "metadata": {
+            "annotations": {
+                "Description": "Gluster-Internal: Dynamically provisioned PV",
+                "gluster.kubernetes.io/heketi-volume-id": "%032x" % index,
+                "gluster.org/type": "file",
+                "kubernetes.io/createdby": "heketi-dynamic-provisioner",
+                "pv.beta.kubernetes.io/gid": "%d" % (2000 + index),
+                "pv.kubernetes.io/bound-by-controller": "yes",
+                "pv.kubernetes.io/provisioned-by": "kubernetes.io/glusterfs",
+            },
+            "creationTimestamp": "2020-05-21T10:%02d:%02dZ" % (
+                index // 60 % 60, index % 60),
+            "finalizers": ["kubernetes.io/pv-protection"],
+            "name": "pvc-%08x-9b4c-11ea-8a7d-005056b2%04x" % (index, index),
+            "resourceVersion": "%d" % (100000 + index),
+            "selfLink": "/api/v1/persistentvolumes/pvc-%08x" % index,
+            "uid": "%08x-9b4c-11ea-8a7d-005056b2f%03x" % (index, index % 4096),
+        },
+        "spec": {
+            "accessModes": ["ReadWriteOnce"],
+            "capacity": {"storage": "1Gi"},
+            "claimRef": {
+                "apiVersion": "v1",
+                "kind": "PersistentVolumeClaim",
+                "name": pvc_name,
+                "namespace": "glusterfs",
+                "resourceVersion": "%d" % (99000 + index),
+                "uid": "%08x-9b4c-11ea-8a7d-005056b2e%03x" % (
+                    index, index % 4096),
+            },
+            "glusterfs": {
+                "endpoints": "glusterfs-dynamic-%s" % pvc_name,
+                "path": "vol_%032x" % index,
+            },
+            "persistentVolumeReclaimPolicy": "Delete",
+            "storageClassName": "glusterfs-storage",
+        },
+        "status": {"phase": "Bound"},
+    }
+
+
+def get_list(items):
+    return {
+        "apiVersion": "v1",
+        "items": items,
+        "kind": "List",
+        "metadata": {"resourceVersion": "", "selfLink": ""},
+    }
+
+
+def get_pvs_yaml_output(amount):
+    """Get output of the 'oc get pv -o yaml' command."""
+    return yaml.safe_dump(
+        get_list([get_pv(i) for i in range(amount)]),
+        default_flow_style=False)
+
+
+def get_pvs_json_output(amount):
+    """Get output of the 'oc get pv -o json' command."""
+    return json.dumps(get_list([get_pv(i) for i in range(amount)]), indent=4)
+
+
+def get_pods_wide_output(amount):
+    """Get output of the 'oc get pods -o wide --no-headers' command."""
+    return "".join(
+        "autotests-dc-%05d-1-%05x   1/1   Running   %d   %dd   "
+        "10.128.%d.%d   node-%d.example.com\n" % (
+            i, i, i % 3, i % 30 + 1, i // 250 % 256, i % 250 + 2, i % 3)
+        for i in range(amount))
+
+
+def get_prometheus_output(amount):
+    """Get Heketi metrics of the 'amount' of devices."""
+    lines = []
+    for name, metric_type, value in (
+            ("heketi_device_size_bytes", "gauge", 2 ** 40),
+            ("heketi_device_free_bytes", "gauge", 2 ** 39),
+            ("heketi_device_used_bytes", "gauge", 2 ** 39),
+            ("heketi_device_brick_count", "gauge", 250)):
+        lines.append("# HELP %s %s" % (name, name.replace("_", " ")))
+        lines.append("# TYPE %s %s" % (name, metric_type))
+        for i in range(amount):
+            lines.append(
+                '%s{cluster="%032x",device="/dev/sd%s",'
+                'hostname="node-%d.example.com"} %d' % (
+                    name, i // 100, chr(ord("b") + i % 20), i // 20, value))
+    lines.append("# HELP heketi_up Verifies if heketi is running.")
+    lines.append("# TYPE heketi_up gauge")
+    lines.append("heketi_up 1")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,47 @@
+"""Benchmarks of the scale test helpers of 'ScaleUpBaseClass'."""
+
+import pytest
+
+from benchmarks import cluster
+from benchmarks import data
+from openshiftstoragelibs import baseclass
+
+
+def _get_scale_up_test_case():
+    test_case = baseclass.ScaleUpBaseClass("verify_setup")
+    test_case.ocp_master_node = [cluster.OCP_NODE]
+    test_case.ocp_client = [cluster.OCP_NODE]
+    test_case.heketi_client_node = cluster.OCP_NODE
+    test_case.heketi_server_url = cluster.HEKETI_SERVER_URL
+    return test_case
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_check_vol_status(benchmark, simulated_cluster, amount):
+    benchmark.group = "check status of Gluster volumes (%d volumes)" % amount
+    simulated_cluster(pvcs=amount)
+
+    cluster.run(benchmark, _get_scale_up_test_case().check_vol_status)
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_verify_setup(benchmark, simulated_cluster, amount):
+    benchmark.group = "verify scale setup (%d PVCs)" % amount
+    simulated_cluster(
+        pvcs=amount, pvc_name_prefix="auto-scale-pvc-file-benchmark",
+        volume_name_prefix="scale")
+
+    cluster.run(
+        benchmark, _get_scale_up_test_case().verify_setup, "benchmark",
+        timeout=60, wait_step=1)
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_create_pvcs_in_batch(benchmark, simulated_cluster, amount):
+    benchmark.group = "create PVCs in batches (%d PVCs)" % amount
+    simulated_cluster()
+
+    cluster.run(
+        benchmark, _get_scale_up_test_case().create_pvcs_in_batch,
+        "glusterfs-storage", amount, batch_amount=100, timeout=60,
+        wait_step=1, skip_cleanup=True)
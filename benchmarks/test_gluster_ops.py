@@ -0,0 +1,49 @@
+"""Benchmarks of the 'gluster_ops' helpers."""
+
+import pytest
+
+from benchmarks import cluster
+from benchmarks import data
+from openshiftstoragelibs import gluster_ops
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_get_peer_status(benchmark, simulated_cluster, amount):
+    benchmark.group = "get Gluster peer status (%d peers)" % amount
+    simulated_cluster(nodes=amount + 1)
+
+    result = cluster.run(
+        benchmark, gluster_ops.get_peer_status, "auto_get_gluster_endpoint")
+
+    assert len(result) == amount
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_wait_to_heal_complete(benchmark, simulated_cluster, amount):
+    benchmark.group = "wait for heal of Gluster volumes (%d volumes)" % amount
+    simulated_cluster(volumes=amount)
+
+    cluster.run(benchmark, gluster_ops.wait_to_heal_complete)
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_heal_progress_tracker_sample(benchmark, simulated_cluster, amount):
+    benchmark.group = "sample heal progress (%d volumes)" % amount
+    simulated_cluster(volumes=amount)
+
+    def sample():
+        return gluster_ops.HealProgressTracker().sample()
+
+    result = cluster.run(benchmark, sample)
+
+    assert len(result) == amount + 1
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_get_block_volumes_by_bhv(benchmark, simulated_cluster, amount):
+    benchmark.group = "list Gluster block volumes (%d volumes)" % amount
+    simulated_cluster(block_volumes=amount, block_hosting_volume_size=10)
+
+    result = cluster.run(benchmark, gluster_ops.get_block_volumes_by_bhv)
+
+    assert sum(len(blocks) for blocks in result.values()) == amount
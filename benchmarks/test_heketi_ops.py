@@ -0,0 +1,49 @@
+"""Benchmarks of the 'heketi_ops' helpers."""
+
+import pytest
+
+from benchmarks import cluster
+from benchmarks import data
+from openshiftstoragelibs import heketi_ops
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_heketi_volume_list_by_name_prefix(
+        benchmark, simulated_cluster, amount):
+    benchmark.group = "list Heketi volumes by name prefix (%d volumes)" % (
+        amount)
+    simulated_cluster(
+        pvcs=amount, volumes=amount, volume_name_prefix="autotests")
+
+    result = cluster.run(
+        benchmark, heketi_ops.heketi_volume_list_by_name_prefix,
+        cluster.OCP_NODE, cluster.HEKETI_SERVER_URL, "autotests")
+
+    assert len(result) == amount
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_get_total_free_space(benchmark, simulated_cluster, amount):
+    benchmark.group = "get total free space (%d nodes)" % amount
+    simulated_cluster(nodes=amount)
+
+    result = cluster.run(
+        benchmark, heketi_ops.get_total_free_space,
+        cluster.OCP_NODE, cluster.HEKETI_SERVER_URL)
+
+    assert result[1] == amount
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_get_heketi_volume_and_brick_count_list(
+        benchmark, simulated_cluster, amount):
+    benchmark.group = "get Heketi volumes and brick counts (%d volumes)" % (
+        amount)
+    simulated_cluster(volumes=amount)
+
+    result = cluster.run(
+        benchmark, heketi_ops.get_heketi_volume_and_brick_count_list,
+        cluster.OCP_NODE, cluster.HEKETI_SERVER_URL)
+
+    # NOTE: Heketi DB volume is created along with the cluster
+    assert len(result) == amount + 1
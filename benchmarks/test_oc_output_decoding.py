@@ -0,0 +1,51 @@
+"""Benchmarks of decoding of the 'oc get' outputs.
+
+Compare the pure-Python YAML loader which was used for parsing of
+'oc get -o yaml' output with the libyaml based one and with decoding of
+the 'oc get -o json' output which is used now.
+"""
+
+import pytest
+import yaml
+
+from benchmarks import data
+from openshiftstoragelibs import utils
+
+
+def _run(benchmark, func, *args):
+    # NOTE: pure-Python loader takes seconds on large outputs,
+    # so limit amount of rounds to keep the run time reasonable.
+    return benchmark.pedantic(func, args=args, rounds=3, iterations=1)
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_pvs_yaml_full_loader(benchmark, amount):
+    benchmark.group = "decode 'oc get pv' output (%d PVs)" % amount
+    output = data.get_pvs_yaml_output(amount)
+
+    result = _run(
+        benchmark, lambda text: yaml.load(text, Loader=yaml.FullLoader),
+        output)
+
+    assert len(result["items"]) == amount
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_pvs_yaml_c_safe_loader(benchmark, amount):
+    benchmark.group = "decode 'oc get pv' output (%d PVs)" % amount
+    output = data.get_pvs_yaml_output(amount)
+
+    result = _run(benchmark, utils.load_json_or_yaml, output)
+
+    assert len(result["items"]) == amount
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_pvs_json(benchmark, amount):
+    benchmark.group = "decode 'oc get pv' output (%d PVs)" % amount
+    output = data.get_pvs_json_output(amount)
+
+    result = _run(benchmark, utils.load_json_or_yaml, output)
+
+    assert result == yaml.load(
+        data.get_pvs_yaml_output(amount), Loader=utils.YAML_LOADER)
@@ -0,0 +1,43 @@
+"""Benchmarks of the 'openshift_ops' helpers."""
+
+import pytest
+
+from benchmarks import cluster
+from benchmarks import data
+from openshiftstoragelibs import openshift_ops
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_parse_wide_pods_output(benchmark, amount):
+    benchmark.group = "parse 'oc get pods -o wide' output (%d PODs)" % amount
+    output = data.get_pods_wide_output(amount)
+
+    result = benchmark(openshift_ops._parse_wide_pods_output, output)
+
+    assert len(result) == amount
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_oc_get_custom_resource_with_field_selectors(
+        benchmark, simulated_cluster, amount):
+    benchmark.group = "get PVCs using field selectors (%d PVCs)" % amount
+    simulated_cluster(pvcs=amount)
+
+    result = cluster.run(
+        benchmark, openshift_ops.oc_get_custom_resource, cluster.OCP_NODE,
+        "pvc", ":.metadata.name", field_selector=[
+            "status.phase=Bound",
+            "spec.storageClassName=glusterfs-storage"])
+
+    assert len(result) == amount
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_wait_for_pvcs_be_bound(benchmark, simulated_cluster, amount):
+    benchmark.group = "wait for PVCs be bound (%d PVCs)" % amount
+    simulated_cluster(pvcs=amount)
+    pvc_names = ["autotests-pvc-%05d" % i for i in range(amount)]
+
+    cluster.run(
+        benchmark, openshift_ops.wait_for_pvcs_be_bound, cluster.OCP_NODE,
+        pvc_names, timeout=60, wait_step=1)
@@ -0,0 +1,25 @@
+"""Benchmarks of the 'reconciliation' helpers."""
+
+import pytest
+
+from benchmarks import cluster
+from benchmarks import data
+from openshiftstoragelibs import reconciliation
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_collect_and_reconcile(benchmark, simulated_cluster, amount):
+    benchmark.group = "reconcile storage inventories (%d PVCs)" % amount
+    simulated_cluster(
+        pvcs=amount, block_volumes=amount // 10 or 1,
+        block_hosting_volume_size=10)
+
+    def collect_and_reconcile():
+        inventory = reconciliation.StorageInventory.collect(
+            cluster.OCP_NODE, cluster.OCP_NODE, cluster.HEKETI_SERVER_URL)
+        return reconciliation.reconcile(
+            inventory, pvc_prefixes=["autotests-pvc"])
+
+    report = cluster.run(benchmark, collect_and_reconcile)
+
+    assert report.is_consistent(), report.get_message()
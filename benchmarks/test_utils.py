@@ -0,0 +1,16 @@
+"""Benchmarks of the 'utils' helpers."""
+
+import pytest
+
+from benchmarks import data
+from openshiftstoragelibs import utils
+
+
+@pytest.mark.parametrize("amount", data.AMOUNTS)
+def test_parse_prometheus_data(benchmark, amount):
+    benchmark.group = "parse Heketi metrics (%d devices)" % amount
+    text = data.get_prometheus_output(amount)
+
+    result = benchmark(utils.parse_prometheus_data, text)
+
+    assert len(result["heketi_device_brick_count"]) == amount
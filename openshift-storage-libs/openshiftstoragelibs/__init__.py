@@ -1,7 +1,21 @@
+import threading
+import time
+
 from glusto.core import Glusto
 import six
 
+from openshiftstoragelibs.command_log import COMMAND_OUTPUT_LOGGER
+from openshiftstoragelibs.command_metrics import COMMAND_METRICS
 from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import simulator
+from openshiftstoragelibs import transport
+
+
+_SSH_POOL_LOCK = threading.Lock()
+_TRANSPORT_LOCK = threading.Lock()
+
+# NOTE: original method is used for running async commands over SSH.
+_glusto_run_async = Glusto.run_async
 
 
 def monkeypatch_class(name, bases, namespace):
@@ -13,8 +27,208 @@ def monkeypatch_class(name, bases, namespace):
     return base
 
 
+class SSHSessionPool(object):
+    """Thread-safe pool of warm SSH sessions grouped by 'user@host' key.
+
+    Each host has its own set of idle sessions and its own limit of
+    concurrently used sessions. Callers which exceed the limit wait until
+    one of the sessions gets released. Sessions which were not used for
+    'idle_timeout' seconds get closed and the ones which were idle for more
+    than 'health_check_interval' seconds get checked before reuse.
+
+    Args:
+        connect (callable): function which accepts 'host' and 'user'
+            args and returns new SSH session object with 'popen' method.
+        disconnect (callable): function which accepts SSH session object
+            and closes it.
+        max_sessions_per_host (int): amount of sessions which may be used
+            at the same time for one host.
+        idle_timeout (int): seconds after which unused session gets closed.
+        health_check_interval (int): seconds of inactivity after which
+            session gets checked before being reused.
+    """
+
+    def __init__(self, connect, disconnect, max_sessions_per_host=4,
+                 idle_timeout=300, health_check_interval=60):
+        self._connect = connect
+        self._disconnect = disconnect
+        self.max_sessions_per_host = max(int(max_sessions_per_host), 1)
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _get_host_slot(self, key):
+        slot = self._hosts.get(key)
+        if slot is None:
+            slot = self._hosts[key] = {
+                "idle": [],
+                "busy": 0,
+                "generation": 0,
+                "generations": {},
+                "cond": threading.Condition(self._lock),
+                "stats": {
+                    "hits": 0,
+                    "connects": 0,
+                    "reconnects": 0,
+                    "evictions": 0,
+                    "waits": 0,
+                    "wait_time": 0.0,
+                },
+            }
+        return slot
+
+    def _pop_expired_sessions(self, slot, now):
+        expired = [
+            conn for conn, last_used in slot["idle"]
+            if now - last_used > self.idle_timeout]
+        if expired:
+            slot["idle"] = [
+                (conn, last_used) for conn, last_used in slot["idle"]
+                if now - last_used <= self.idle_timeout]
+            for conn in expired:
+                slot["generations"].pop(id(conn), None)
+            slot["stats"]["evictions"] += len(expired)
+        return expired
+
+    def _close(self, conns):
+        for conn in conns:
+            try:
+                self._disconnect(conn)
+            except Exception as e:
+                Glusto.log.debug(
+                    "Failed to close SSH session: %s" % six.text_type(e))
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            proc = conn.popen("true", universal_newlines=True)
+            proc.communicate()
+            return proc.returncode == 0
+        except Exception:
+            return False
+
+    def acquire(self, host, user, fresh=False):
+        """Get SSH session for the host waiting for a free slot if needed.
+
+        Args:
+            host (str): hostname to get SSH session for.
+            user (str): user to be used for the SSH session.
+            fresh (bool): if True, then all the idle sessions of the host
+                get closed and new session gets created.
+        Returns:
+            SSH session object which must be returned back using
+            'release' method.
+        """
+        key = "%s@%s" % (user, host)
+        start, to_close, conn = time.time(), [], None
+        with self._lock:
+            slot = self._get_host_slot(key)
+            to_close.extend(self._pop_expired_sessions(slot, start))
+            if slot["busy"] >= self.max_sessions_per_host:
+                slot["stats"]["waits"] += 1
+                while slot["busy"] >= self.max_sessions_per_host:
+                    slot["cond"].wait()
+                slot["stats"]["wait_time"] += time.time() - start
+            slot["busy"] += 1
+            if fresh:
+                to_close.extend(conn for conn, _ in slot["idle"])
+                slot["idle"], slot["generations"] = [], {}
+                slot["generation"] += 1
+                slot["stats"]["reconnects"] += 1
+            elif slot["idle"]:
+                conn, last_used = slot["idle"].pop()
+        self._close(to_close)
+
+        if conn is not None and (
+                time.time() - last_used > self.health_check_interval
+                and not self._is_alive(conn)):
+            with self._lock:
+                slot["generations"].pop(id(conn), None)
+                slot["stats"]["reconnects"] += 1
+            self._close([conn])
+        elif conn is not None:
+            with self._lock:
+                slot["stats"]["hits"] += 1
+            return conn
+
+        try:
+            conn = self._connect(host, user)
+        except Exception:
+            with self._lock:
+                slot["busy"] -= 1
+                slot["cond"].notify()
+            raise
+        with self._lock:
+            slot["generations"][id(conn)] = slot["generation"]
+            slot["stats"]["connects"] += 1
+        return conn
+
+    def release(self, host, user, conn, broken=False):
+        """Return SSH session back to the pool.
+
+        Args:
+            host (str): hostname the SSH session was acquired for.
+            user (str): user the SSH session was acquired for.
+            conn (obj): SSH session object got from 'acquire' method.
+            broken (bool): if True, then session gets closed instead of
+                being reused.
+        """
+        key = "%s@%s" % (user, host)
+        now, to_close = time.time(), []
+        with self._lock:
+            slot = self._get_host_slot(key)
+            slot["busy"] = max(slot["busy"] - 1, 0)
+            generation = slot["generations"].get(id(conn))
+            if broken or generation != slot["generation"]:
+                slot["generations"].pop(id(conn), None)
+                to_close.append(conn)
+            else:
+                slot["idle"].append((conn, now))
+            to_close.extend(self._pop_expired_sessions(slot, now))
+            slot["cond"].notify()
+        self._close(to_close)
+
+    def close_sessions(self, host, user):
+        """Close idle sessions of a host and mark busy ones as outdated.
+
+        Args:
+            host (str): hostname which sessions should be closed.
+            user (str): user the SSH sessions were created for.
+        """
+        key = "%s@%s" % (user, host)
+        with self._lock:
+            slot = self._hosts.get(key)
+            if slot is None:
+                return
+            to_close = [conn for conn, _ in slot["idle"]]
+            slot["idle"], slot["generations"] = [], {}
+            slot["generation"] += 1
+        self._close(to_close)
+
+    def get_stats(self):
+        """Get statistics of the pool usage.
+
+        Returns:
+            dict: 'user@host' keys and dict values with 'hits', 'connects',
+                'reconnects', 'evictions', 'waits', 'wait_time',
+                'idle' and 'busy' keys.
+        """
+        with self._lock:
+            stats = {}
+            for key, slot in self._hosts.items():
+                stats[key] = dict(slot["stats"])
+                stats[key]["idle"] = len(slot["idle"])
+                stats[key]["busy"] = slot["busy"]
+            return stats
+
+
 @six.add_metaclass(monkeypatch_class)
 class MonkeyPatchedGlusto(Glusto):
+    _ssh_pool = None
+    _transport = None
+    _is_transport_configured = False
+
     @classmethod
     def _wrapper_for_get_ssh_connection(cls, host, user=None, recreate=False):
         if recreate and "%s@%s" % (user, host) in cls._ssh_connections:
@@ -32,6 +246,119 @@ class MonkeyPatchedGlusto(Glusto):
                     "connection from your host." % (host, user))
         return ssh
 
+    @classmethod
+    def _create_pooled_ssh_connection(cls, host, user):
+        """Create SSH connection which is not shared via Glusto's cache.
+
+        Connection gets created by the Glusto subclass having its own empty
+        connections cache, so the shared connections used by the other
+        Glusto methods, like 'rpyc' or 'upload', are left untouched and
+        connections to different hosts get established in parallel.
+        """
+        connector = type(
+            "PooledSSHConnector", (cls,), {"_ssh_connections": {}})
+        return connector._wrapper_for_get_ssh_connection(host, user)
+
+    @classmethod
+    def _get_ssh_pool(cls):
+        if cls._ssh_pool is None:
+            with _SSH_POOL_LOCK:
+                if cls._ssh_pool is None:
+                    common = cls.config.get("common", {}) or {}
+                    cls._ssh_pool = SSHSessionPool(
+                        cls._create_pooled_ssh_connection,
+                        lambda ssh: ssh.close(),
+                        max_sessions_per_host=common.get(
+                            "ssh_max_sessions_per_host", 4),
+                        idle_timeout=common.get(
+                            "ssh_session_idle_timeout", 300),
+                        health_check_interval=common.get(
+                            "ssh_session_health_check_interval", 60))
+        return cls._ssh_pool
+
+    @classmethod
+    def ssh_pool_close_connections(cls, host, user=None):
+        """Close pooled SSH sessions of the host."""
+        cls._get_ssh_pool().close_sessions(host, user or cls.user)
+
+    @classmethod
+    def get_ssh_pool_stats(cls):
+        """Get usage statistics of the pooled SSH sessions."""
+        return cls._get_ssh_pool().get_stats()
+
+    @classmethod
+    def _get_transport(cls):
+        if not cls._is_transport_configured:
+            with _TRANSPORT_LOCK:
+                if not cls._is_transport_configured:
+                    common = cls.config.get("common", {}) or {}
+                    path = common.get("command_journal")
+                    mode = common.get("command_journal_mode", "record")
+                    simulator_options = dict(
+                        common.get("cluster_simulator") or {})
+                    if simulator_options.pop("enabled", False):
+                        cls._transport = simulator.ClusterSimulator(
+                            **simulator_options)
+                    elif path and mode == "replay":
+                        cls._transport = transport.ReplayTransport(
+                            path, with_latency=common.get(
+                                "command_journal_replay_latency", False))
+                    elif path:
+                        cls._transport = transport.RecordingTransport(path)
+                    cls._is_transport_configured = True
+        return cls._transport
+
+    @classmethod
+    def set_transport(cls, new_transport):
+        """Replace SSH with the provided transport for running commands.
+
+        Args:
+            new_transport (obj): object with 'run' and 'run_async' methods
+                which accept 'host', 'command' and 'user' args. 'run' returns
+                tuple with return code, stdout and stderr, 'run_async' returns
+                object with the 'async_communicate' method returning the same.
+                If None, then commands are run over SSH.
+        Returns:
+            Previous transport or None if SSH was used.
+        """
+        with _TRANSPORT_LOCK:
+            previous_transport = cls._transport
+            cls._transport, cls._is_transport_configured = new_transport, True
+        return previous_transport
+
+    @classmethod
+    def _run_over_ssh(cls, host, command, user):
+        pool = cls._get_ssh_pool()
+        ssh = pool.acquire(host, user)
+        try:
+            proc = ssh.popen(command, universal_newlines=True)
+        except Exception as e:
+            err_msg = (
+                "Failed to establish SSH connection: %s" % six.text_type(e))
+            cls.log.error(err_msg)
+            pool.release(host, user, ssh, broken=True)
+            COMMAND_METRICS.record_retry(host, command)
+            COMMAND_METRICS.record_reconnect(host)
+            ssh = pool.acquire(host, user, fresh=True)
+            try:
+                proc = ssh.popen(command, universal_newlines=True)
+            except Exception:
+                pool.release(host, user, ssh, broken=True)
+                raise
+
+        try:
+            stdout, stderr = proc.communicate()
+        except Exception:
+            pool.release(host, user, ssh, broken=True)
+            raise
+        pool.release(host, user, ssh)
+        return proc.returncode, stdout, stderr
+
+    @classmethod
+    def _run_async_over_ssh(cls, host, command, user=None, log_level=None):
+        return _glusto_run_async(
+            host, command, user=user, log_level=log_level)
+
     @classmethod
     def run(cls, host, command, user=None, log_level=None):
         """Wrapper for original "run" method fixing broken connections."""
@@ -43,25 +370,67 @@ class MonkeyPatchedGlusto(Glusto):
             ctlpersist = " (cp)"
 
         # output command
-        cls.log.info("%s@%s%s: %s" % (user, host, ctlpersist, command))
+        identifier = "%s@%s" % (user, host)
+        COMMAND_OUTPUT_LOGGER.log_command(identifier + ctlpersist, command)
 
         # run the command
-        ssh = cls._wrapper_for_get_ssh_connection(host, user, False)
+        cmd_transport, start = cls._get_transport(), time.time()
         try:
-            proc = ssh.popen(command, universal_newlines=True)
-        except Exception as e:
-            err_msg = (
-                "Failed to establish SSH connection: %s" % six.text_type(e))
-            cls.log.error(err_msg)
-            ssh = cls._wrapper_for_get_ssh_connection(host, user, True)
-            proc = ssh.popen(command, universal_newlines=True)
-
-        stdout, stderr = proc.communicate()
-        retcode = proc.returncode
+            if cmd_transport is not None:
+                retcode, stdout, stderr = cmd_transport.run(
+                    host, command, user)
+            else:
+                retcode, stdout, stderr = cls._run_over_ssh(
+                    host, command, user)
+        except Exception:
+            COMMAND_METRICS.record(host, command, time.time() - start, None)
+            raise
+        COMMAND_METRICS.record(
+            host, command, time.time() - start, retcode, stdout, stderr)
 
         # output command results
-        identifier = "%s@%s" % (user, host)
-        cls._log_results(identifier, retcode, stdout, stderr,
-                         log_level=log_level)
+        COMMAND_OUTPUT_LOGGER.log_results(
+            identifier, retcode, stdout, stderr, log_level=log_level,
+            command=command)
 
         return (retcode, stdout, stderr)
+
+    @classmethod
+    def _log_results(cls, identifier, retcode, stdout, stderr,
+                     log_level=None):
+        """Log results of the command truncating too long outputs."""
+        COMMAND_OUTPUT_LOGGER.log_results(
+            identifier, retcode, stdout, stderr, log_level=log_level)
+
+    @staticmethod
+    def _measure_async(host, command, proc, start):
+        """Account the async command when its results get requested."""
+        async_communicate, results = proc.async_communicate, []
+
+        def communicate():
+            if results:
+                return results[0]
+            try:
+                retcode, stdout, stderr = async_communicate()
+            except Exception:
+                COMMAND_METRICS.record(
+                    host, command, time.time() - start, None)
+                raise
+            COMMAND_METRICS.record(
+                host, command, time.time() - start, retcode, stdout, stderr)
+            results.append((retcode, stdout, stderr))
+            return results[0]
+        proc.async_communicate = communicate
+        return proc
+
+    @classmethod
+    def run_async(cls, host, command, user=None, log_level=None):
+        """Wrapper for original "run_async" method supporting transports."""
+        cmd_transport, start = cls._get_transport(), time.time()
+        if cmd_transport is None:
+            return cls._measure_async(host, command, cls._run_async_over_ssh(
+                host, command, user=user, log_level=log_level), start)
+        COMMAND_OUTPUT_LOGGER.log_command(
+            "%s@%s (async)" % (user or cls.user, host), command)
+        return cls._measure_async(host, command, cmd_transport.run_async(
+            host, command, user=user or cls.user, log_level=log_level), start)
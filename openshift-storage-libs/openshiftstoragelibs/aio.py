@@ -0,0 +1,115 @@
+"""Asyncio counterparts of the command runners and common helpers.
+
+Each coroutine from this module runs the corresponding synchronous function
+in a shared thread pool, so SSH sessions get taken from the per-host pool
+of 'MonkeyPatchedGlusto' and many targets can be processed concurrently.
+The synchronous API stays untouched and keeps being the source of truth.
+
+Note: this module requires Python 3.
+
+Example:
+    >>> from openshiftstoragelibs import aio
+    >>> async def get_all_pods_info(ocp_node, pod_names):
+    ...     return await aio.gather_bounded(
+    ...         [aio.oc_get_yaml(ocp_node, 'pod', name)
+    ...          for name in pod_names],
+    ...         limit=20)
+    >>> pods = aio.run(get_all_pods_info('master-node', ['pod1', 'pod2']))
+"""
+
+import asyncio
+from concurrent import futures
+import functools
+import threading
+
+from glusto.core import Glusto as g
+
+from openshiftstoragelibs import command
+from openshiftstoragelibs import heketi_ops
+from openshiftstoragelibs import openshift_ops
+
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor():
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                max_workers = g.config.get("common", {}).get(
+                    "aio_max_workers", 32)
+                _EXECUTOR = futures.ThreadPoolExecutor(
+                    max_workers=max_workers)
+    return _EXECUTOR
+
+
+async def to_thread(func, *args, **kwargs):
+    """Run synchronous function in the shared thread pool.
+
+    Args:
+        func (callable): synchronous function to be called.
+        args, kwargs: arguments to be passed to the function.
+    Returns:
+        Return value of the function.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def _make_async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await to_thread(func, *args, **kwargs)
+    wrapper.__doc__ = "Coroutine version of '%s.%s'.\n\n%s" % (
+        func.__module__, func.__name__, func.__doc__ or '')
+    return wrapper
+
+
+async def gather_bounded(aws, limit=10, return_exceptions=False):
+    """Await set of awaitables not running more than 'limit' at once.
+
+    Args:
+        aws (iterable): coroutines or other awaitable objects.
+        limit (int): maximum amount of awaitables running at the same time.
+        return_exceptions (bool): if True, then exceptions are returned
+            as results, otherwise first exception gets raised.
+    Returns:
+        list: results in the same order as 'aws'.
+    """
+    semaphore = asyncio.Semaphore(max(int(limit), 1))
+
+    async def _bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(
+        *[_bounded(aw) for aw in aws], return_exceptions=return_exceptions)
+
+
+def run(coro):
+    """Run coroutine from synchronous code and return its result."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+cmd_run = _make_async(command.cmd_run)
+cmd_run_many = _make_async(command.cmd_run_many)
+
+cmd_run_on_gluster_pod_or_node = _make_async(
+    openshift_ops.cmd_run_on_gluster_pod_or_node)
+oc_get_custom_resource = _make_async(openshift_ops.oc_get_custom_resource)
+oc_get_pods = _make_async(openshift_ops.oc_get_pods)
+oc_get_yaml = _make_async(openshift_ops.oc_get_yaml)
+
+cmd_run_on_heketi_pod = _make_async(heketi_ops.cmd_run_on_heketi_pod)
+heketi_cmd_run = _make_async(heketi_ops.heketi_cmd_run)
+for _name in dir(heketi_ops):
+    if _name.startswith("heketi_") and callable(getattr(heketi_ops, _name)):
+        globals()[_name] = _make_async(getattr(heketi_ops, _name))
+del _name
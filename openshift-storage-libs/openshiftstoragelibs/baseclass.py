@@ -24,24 +24,22 @@ from openshiftstoragelibs.exceptions import (
 )
 from openshiftstoragelibs.gluster_ops import (
     get_block_hosting_volume_name,
-    get_gluster_vol_status,
-    match_heketi_and_gluster_volumes_by_prefix,
+    iter_gluster_vol_status,
     wait_to_heal_complete,
 )
 from openshiftstoragelibs.heketi_ops import (
     get_block_hosting_volume_list,
+    HeketiTopology,
     hello_heketi,
     heketi_blockvolume_create,
     heketi_blockvolume_delete,
     heketi_blockvolume_info,
     heketi_blockvolume_list,
     heketi_db_check,
-    heketi_topology_info,
     heketi_volume_create,
     heketi_volume_delete,
     heketi_volume_info,
     heketi_volume_list,
-    heketi_volume_list_by_name_prefix,
 )
 from openshiftstoragelibs.node_ops import (
     attach_existing_vmdk_from_vmstore,
@@ -59,13 +57,13 @@ from openshiftstoragelibs.openshift_ops import (
     get_pod_name_from_dc,
     get_pod_name_from_rc,
     get_pv_name_from_pvc,
-    match_pv_and_heketi_volumes,
-    match_pvc_and_pv,
     oc_create_app_dc_with_io,
-    oc_create_pvc,
+    oc_create_pvcs,
     oc_create_sc,
     oc_create_secret,
     oc_delete,
+    oc_delete_resources,
+    oc_get_all_pvs,
     oc_get_custom_resource,
     oc_get_pods,
     oc_label,
@@ -84,12 +82,15 @@ from openshiftstoragelibs.process_ops import (
     get_process_info_on_gluster_pod_or_node,
 )
 from openshiftstoragelibs.openshift_storage_libs import (
-    get_iscsi_block_devices_by_path,
-    get_iscsi_session,
-    get_mpath_name_from_device_name,
+    get_iscsi_sessions_devices_and_mpaths,
     validate_multipath_pod,
 )
 from openshiftstoragelibs.openshift_version import get_openshift_version
+from openshiftstoragelibs.reconciliation import (
+    reconcile,
+    StorageInventory,
+)
+from openshiftstoragelibs import utils
 from openshiftstoragelibs.waiter import Waiter
 
 HEKETI_VOLUME_REGEX = "Id:(.*).Cluster:(.*).Name:%s"
@@ -404,9 +405,12 @@ class BaseClass(unittest.TestCase):
     def create_and_wait_for_pvcs(
             self, pvc_size=1, pvc_name_prefix="autotests-pvc", pvc_amount=1,
             sc_name=None, label=None, timeout=600, wait_step=10,
-            skip_waiting=False, skip_cleanup=False):
+            skip_waiting=False, skip_cleanup=False, chunk_size=None):
         """Create multiple PVC's not waiting for it
 
+        PVCs get created using one 'List' manifest per 'chunk_size' of them
+        and get deleted by one cleanup.
+
         Args:
             pvc_size (int): size of PVC, default value is 1
             pvc_name_prefix (str): volume prefix for each PVC, default value is
@@ -419,6 +423,9 @@ class BaseClass(unittest.TestCase):
             wait_step (int): waiting time between each try of PVC status check
             skip_waiting (bool): boolean value which defines whether
                                  we need to wait for PVC creation or not.
+            chunk_size (int): max amount of PVC's created by one call,
+                              default is the 'oc_bulk_chunk_size' config
+                              option.
         Returns:
             List: list of PVC names
         """
@@ -432,15 +439,21 @@ class BaseClass(unittest.TestCase):
                 sc_name = self.create_storage_class(skip_cleanup=skip_cleanup)
 
         # Create PVCs
-        pvc_names = []
-        for i in range(pvc_amount):
-            pvc_name = oc_create_pvc(
-                node, sc_name, label=label, pvc_name_prefix=pvc_name_prefix,
-                pvc_size=pvc_size)
-            pvc_names.append(pvc_name)
+        pvc_names = [
+            "%s-%s" % (pvc_name_prefix, utils.get_random_str())
+            for i in range(pvc_amount)]
         if not skip_cleanup:
             self.addCleanup(
                 wait_for_resources_absence, node, 'pvc', pvc_names)
+        try:
+            oc_create_pvcs(
+                node, pvc_names, sc_name, pvc_size=pvc_size, label=label,
+                chunk_size=chunk_size)
+        except Exception:
+            # NOTE: PVCs of the previous chunks are created already
+            if not skip_cleanup:
+                self.addCleanup(oc_delete_resources, node, 'pvc', pvc_names)
+            raise
 
         # Wait for PVCs to be in bound state
         try:
@@ -456,29 +469,30 @@ class BaseClass(unittest.TestCase):
                 reclaim_policy = oc_get_custom_resource(
                     node, 'sc', ':.reclaimPolicy', sc_name)[0]
 
-            for pvc_name in pvc_names:
-                if reclaim_policy == 'Retain':
-                    pv_name = get_pv_name_from_pvc(node, pvc_name)
-                    if not pv_name and skip_waiting:
+            if reclaim_policy == 'Retain':
+                # NOTE: get PVs of all the PVCs at once
+                pvc_name_set = set(pvc_names)
+                for pv in oc_get_all_pvs(node).get('items', []):
+                    claim_name = pv['spec'].get('claimRef', {}).get('name')
+                    if claim_name not in pvc_name_set:
                         continue
-                    self.addCleanup(oc_delete, node, 'pv', pv_name,
+                    self.addCleanup(oc_delete, node, 'pv',
+                                    pv['metadata']['name'],
                                     raise_on_absence=False)
-                    custom = (r':.metadata.annotations."gluster\.kubernetes'
-                              r'\.io\/heketi\-volume\-id"')
-                    vol_id = oc_get_custom_resource(
-                        node, 'pv', custom, pv_name)[0]
+                    annotations = pv['metadata'].get('annotations', {})
                     if self.sc.get('provisioner') == "kubernetes.io/glusterfs":
-                        self.addCleanup(heketi_volume_delete,
-                                        self.heketi_client_node,
-                                        self.heketi_server_url, vol_id,
-                                        raise_on_error=False)
+                        self.addCleanup(
+                            heketi_volume_delete, self.heketi_client_node,
+                            self.heketi_server_url, annotations.get(
+                                'gluster.kubernetes.io/heketi-volume-id'),
+                            raise_on_error=False)
                     else:
-                        self.addCleanup(heketi_blockvolume_delete,
-                                        self.heketi_client_node,
-                                        self.heketi_server_url, vol_id,
-                                        raise_on_error=False)
-                self.addCleanup(oc_delete, node, 'pvc', pvc_name,
-                                raise_on_absence=False)
+                        self.addCleanup(
+                            heketi_blockvolume_delete, self.heketi_client_node,
+                            self.heketi_server_url, annotations.get(
+                                'gluster.org/volume-id'),
+                            raise_on_error=False)
+            self.addCleanup(oc_delete_resources, node, 'pvc', pvc_names)
         return pvc_names
 
     def create_and_wait_for_pvc(
@@ -1048,16 +1062,19 @@ class BaseClass(unittest.TestCase):
 
     def validate_file_volumes_count(self, h_node, h_server, node_ip):
 
-        # check volume count from heketi and gluster are same
-        heketi_topology_info(h_node, h_server, json=True)
-        h_volume_list = heketi_volume_list(h_node, h_server, json=True)
+        # check volumes from heketi and gluster are same
+        topology = HeketiTopology.get(h_node, h_server)
+        h_vol_names = set(
+            volume["name"] for volume in topology.volumes.values())
         vol_list = get_volume_list(node_ip)
         self.assertIsNotNone(
             vol_list, "Failed to get volumes list")
         self.assertEqual(
-            len(h_volume_list['volumes']), len(vol_list),
-            "Failed to verify volume count Expected:'{}', Actual:'{}'".format(
-                len(h_volume_list['volumes']), len(vol_list)))
+            len(h_vol_names), len(vol_list),
+            "Failed to verify volume count Expected:'{}', Actual:'{}', "
+            "Difference: {}".format(
+                len(h_vol_names), len(vol_list),
+                h_vol_names.symmetric_difference(vol_list)))
 
     def match_volume_by_prefix(self, prefix):
         """Match PVC, PV, Heketi and Gluster volume
@@ -1065,18 +1082,10 @@ class BaseClass(unittest.TestCase):
         Args:
             prefix (str): Start of the unique string.
         """
-
-        match_pvc_and_pv(self.h_node, prefix)
-        h_vols = heketi_volume_list_by_name_prefix(
-            self.heketi_client_node, self.heketi_server_url,
-            prefix, json=True)
-        h_vol_ids = sorted([v[0] for v in h_vols])
-        match_pv_and_heketi_volumes(
-            self.heketi_client_node, h_vol_ids, prefix)
-        h_vol_names = sorted([
-            v[2].replace("{}_".format(prefix), "") for v in h_vols])
-        match_heketi_and_gluster_volumes_by_prefix(
-            h_vol_names, "{}_".format(prefix))
+        inventory = StorageInventory.collect(
+            self.ocp_client[0], self.heketi_client_node,
+            self.heketi_server_url, block=False)
+        reconcile(inventory, pvc_prefixes=[prefix]).assert_consistent()
 
 
 class GlusterBlockBaseClass(BaseClass):
@@ -1141,8 +1150,9 @@ class GlusterBlockBaseClass(BaseClass):
 
         node = pod_info[pod_name]['node']
 
-        # Get the iscsi sessions info from the node
-        iscsi = get_iscsi_session(node, iqn)
+        # Get the iscsi sessions, paths and mpaths info from the node
+        iscsi, devices, device_mpaths = get_iscsi_sessions_devices_and_mpaths(
+            node, iqn)
         msg = ('Only %s iscsi sessions are present on node %s, expected %s.'
                % (iscsi, node, hacount))
         self.assertEqual(hacount, len(iscsi), msg)
@@ -1152,16 +1162,13 @@ class GlusterBlockBaseClass(BaseClass):
                    gluster_ips, iscsi, node))
         self.assertEqual(set(iscsi), (set(gluster_ips) & set(iscsi)), msg)
 
-        # Get the paths info from the node
-        devices = get_iscsi_block_devices_by_path(node, iqn)
+        # Verify the paths info from the node
         msg = ("Only %s devices are present on Node %s, expected %s" % (
             devices, node, hacount,))
         self.assertEqual(hacount, len(devices), msg)
 
         # Get mpath names and verify that only one mpath is there
-        mpaths = set()
-        for device in devices.keys():
-            mpaths.add(get_mpath_name_from_device_name(node, device))
+        mpaths = set(device_mpaths.values())
         msg = ("Only one mpath was expected on Node %s, but got %s" % (
             node, mpaths))
         self.assertEqual(1, len(mpaths), msg)
@@ -1304,7 +1311,8 @@ class ScaleUpBaseClass(GlusterBlockBaseClass):
         Args:
             sc_name(str): Name of the storage class.
             pvc_count(int): Count of PVC's to be create.
-            batch_amount(int): Amount of PVC's to be create in one batch.
+            batch_amount(int): Amount of PVC's to be created by one
+                               'List' manifest.
             pvc_name_prefix(str): Name prefix for PVC's.
             label (dic): label for PVC's.
             timeout (int): timeout for one batch
@@ -1314,20 +1322,14 @@ class ScaleUpBaseClass(GlusterBlockBaseClass):
         Returns:
             list: list of PVC's
         """
-        pvcs = []
-
-        while pvc_count > 0:
-            # Change batch_amount if pvc_count < batch_amount
-            if pvc_count < batch_amount:
-                batch_amount = pvc_count
-            # Create PVC's
-            pvcs += self.create_and_wait_for_pvcs(
-                sc_name=sc_name, pvc_amount=batch_amount,
-                pvc_name_prefix=pvc_name_prefix, timeout=timeout,
-                wait_step=wait_step, skip_cleanup=skip_cleanup)
-            pvc_count -= batch_amount
-
-        return pvcs
+        # NOTE: all the PVCs get created using one 'List' manifest per
+        # batch and then get waited for at once.
+        batches = -(-pvc_count // batch_amount)
+        return self.create_and_wait_for_pvcs(
+            sc_name=sc_name, pvc_amount=pvc_count,
+            pvc_name_prefix=pvc_name_prefix, label=label,
+            timeout=timeout * batches, wait_step=wait_step,
+            skip_cleanup=skip_cleanup, chunk_size=batch_amount)
 
     def create_app_pods_in_batch(
             self, pvcs, pod_count, batch_amount=5,
@@ -1392,17 +1394,16 @@ class ScaleUpBaseClass(GlusterBlockBaseClass):
 
     def check_vol_status(self):
         # Check status of all vols
-        status = get_gluster_vol_status('all')
-
         pids = defaultdict(int)
         down_bricks = 0
-        for vol in status.keys():
-            for host in status[vol].keys():
-                for brick_or_shd in status[vol][host].keys():
-                    if status[vol][host][brick_or_shd]['status'] != "1":
-                        down_bricks += 1
-                    pid = status[vol][host][brick_or_shd]['pid']
-                    pids[pid] += 1
+        for brick in iter_gluster_vol_status('all'):
+            if brick.status != "1":
+                down_bricks += 1
+            # NOTE: self-heal daemon is listed for each volume,
+            # but it is not a brick process.
+            if brick.host == "Self-heal Daemon":
+                continue
+            pids[brick.pid] += 1
 
         # Get Pids which are running more than 250 bricks and raise exception
         exhausted_pids = [pd for pd in pids.keys() if pids[pd] > 250]
@@ -1453,7 +1454,7 @@ class ScaleUpBaseClass(GlusterBlockBaseClass):
         """
         # Cmd to fetch the pid and memory usage
         get_glusterfsd_pid = "pgrep glusterfsd"
-        get_mem_usage = "pmap -x {} | tail -1"
+        get_mem_usage = "pmap -x {} | grep '^total'"
 
         # Fetch gluster node/pod list
         for gluster_node in self.gluster_servers:
@@ -1465,15 +1466,17 @@ class ScaleUpBaseClass(GlusterBlockBaseClass):
                 "{}".format(gluster_node))
             pid_list = out.split("\n")
 
-            # Fetch the memory usage for each pid
-            for pid in pid_list:
-                out = cmd_run_on_gluster_pod_or_node(
-                    self.ocp_master_node[0],
-                    get_mem_usage.format(pid), gluster_node)
-                self.assertTrue(
-                    out, "Failed to fetch the memory used for glusterfsd"
-                    " process from the node/pod {}".format(gluster_node))
-                memory_used = int(out.split()[-2])
+            # Fetch the memory usage for all the pids using one call
+            out = cmd_run_on_gluster_pod_or_node(
+                self.ocp_master_node[0],
+                get_mem_usage.format(" ".join(pid_list)), gluster_node)
+            mem_usage_list = out.split("\n") if out else []
+            self.assertEqual(
+                len(pid_list), len(mem_usage_list),
+                "Failed to fetch the memory used for glusterfsd"
+                " process from the node/pod {}".format(gluster_node))
+            for mem_usage in mem_usage_list:
+                memory_used = int(mem_usage.split()[-2])
                 self.assertLess(
                     memory_used, size_limit,
                     "Failed memory used  of glusterfsd {} is greater than the"
@@ -1633,31 +1636,14 @@ class ScaleUpBaseClass(GlusterBlockBaseClass):
         # Wait for heal
         wait_to_heal_complete(timeout=timeout, wait_step=wait_step)
 
-        # Check mismatch of volumes with PV, heketi and gluster
+        # Check mismatch of PVCs, PVs, heketi and gluster volumes
         match = (
             'auto-scale-pvc-file-{}'.format(prefix),
             'auto-scale-pvc-arbiter-{}'.format(prefix),
             'auto-scale-pvc-block-{}'.format(prefix))
-
-        h_vol_list = heketi_volume_list(
-            self.heketi_client_node, self.heketi_server_url)
-        h_vol_list = [
-            vol.split('Name:')[1] for vol in h_vol_list.split('\n')
-            if any(m in vol for m in match)]
-
-        g_vol_list = get_volume_list('auto_get_gluster_endpoint')
-        g_vol_list = [
-            gvol for gvol in g_vol_list if any(m in gvol for m in match)]
-
-        pv_vols = oc_get_custom_resource(
-            self.ocp_master_node[0], 'pv', ':.spec.glusterfs.path')
-        pv_vols = [
-            vol[0] for vol in pv_vols
-            if vol[0] != '<none>' and any(m in vol[0] for m in match)]
-
-        self.assertTrue(
-            (h_vol_list.sort() == g_vol_list.sort() == pv_vols.sort()),
-            'Mismatch b/w heketi, gluster and pv volumes {}\n{}\n{}\n'.format(
-                h_vol_list, g_vol_list, pv_vols))
+        inventory = StorageInventory.collect(
+            self.ocp_master_node[0], self.heketi_client_node,
+            self.heketi_server_url)
+        reconcile(inventory, pvc_prefixes=match).assert_consistent()
 
         self.verify_pods_are_running()
@@ -1,22 +1,60 @@
+import re
+
 from glusto.core import Glusto as g
+import six
 
+from openshiftstoragelibs.command_metrics import COMMAND_METRICS
+from openshiftstoragelibs import utils
 
-def cmd_run(cmd, hostname, raise_on_error=True):
-    """Glusto's command runner wrapper.
+
+def cmd_run_with_status(cmd, hostname):
+    """Run command reconnecting once if SSH connection is broken.
 
     Args:
         cmd (str): Shell command to run on the specified hostname.
         hostname (str): hostname where Glusto should run specified command.
-        raise_on_error (bool): defines whether we should raise exception
-                               in case command execution failed.
     Returns:
-        str: Stripped shell command's stdout value if not None.
+        tuple: return code, stdout and stderr of the command.
     """
     ret, out, err = g.run(hostname, cmd, "root")
     if ("no ssh connection" in err.lower()
             or "tls handshake timeout" in err.lower()):
         g.ssh_close_connection(hostname)
+        g.ssh_pool_close_connections(hostname, "root")
+        COMMAND_METRICS.record_retry(hostname, cmd)
+        COMMAND_METRICS.record_reconnect(hostname)
         ret, out, err = g.run(hostname, cmd, "root")
+    return ret, out, err
+
+
+def cmd_run(cmd, hostname, raise_on_error=True):
+    """Glusto's command runner wrapper.
+
+    Args:
+        cmd (str): Shell command to run on the specified hostname.
+        hostname (str): hostname where Glusto should run specified command.
+        raise_on_error (bool): defines whether we should raise exception
+                               in case command execution failed.
+    Returns:
+        str: Stripped shell command's stdout value if not None.
+    """
+    return check_cmd_result(
+        cmd, hostname, cmd_run_with_status(cmd, hostname), raise_on_error)
+
+
+def check_cmd_result(cmd, hostname, result, raise_on_error=True):
+    """Check result of the command run by 'cmd_run_with_status'.
+
+    Args:
+        cmd (str): Shell command which was run.
+        hostname (str): hostname where the command was run.
+        result (tuple): return code, stdout and stderr of the command.
+        raise_on_error (bool): defines whether we should raise exception
+                               in case command execution failed.
+    Returns:
+        str: Stripped shell command's stdout value if not None.
+    """
+    ret, out, err = result
     msg = ("Failed to execute command '%s' on '%s' node. Got non-zero "
            "return code '%s'. Err: %s" % (cmd, hostname, ret, err))
     if int(ret) != 0:
@@ -27,3 +65,100 @@ def cmd_run(cmd, hostname, raise_on_error=True):
     out = out.strip() if out else out
 
     return out
+
+
+def is_pod_not_found_error(error, pod_name):
+    """Check whether error of 'oc exec' or 'oc rsh' means absence of POD.
+
+    Args:
+        error (str): stderr of the command or text of its exception.
+        pod_name (str): name of the POD the command was run in.
+    Returns:
+        bool: True if the error is the 'NotFound' one of the POD.
+    """
+    return 'pods "%s" not found' % pod_name in (error or "")
+
+
+def _split_framed_output(output, marker, cmd_amount):
+    """Split output of a batch script using 'marker:<index>:<rc>' lines."""
+    frame_re = re.compile(r"\n%s:(\d+):(\d*)\n" % re.escape(marker))
+    results, start = {}, 0
+    for match in frame_re.finditer(output or ''):
+        index = int(match.group(1))
+        if index < cmd_amount and index not in results:
+            results[index] = (match.group(2), output[start:match.start()])
+        start = match.end()
+    return results
+
+
+def cmd_run_many(hostname, cmds, raise_on_error=True):
+    """Run several shell commands on a node using one remote call.
+
+    Commands get executed sequentially, each of them in its own subshell,
+    so failure of one of them does not stop execution of the next ones.
+    Stdout and stderr of each command get separated using unique markers.
+
+    Args:
+        hostname (str): hostname where Glusto should run specified commands.
+        cmds (list): list of shell commands (str or list) to run.
+        raise_on_error (bool|list): defines whether we should raise exception
+            in case command execution failed. May be provided per command
+            as a list of bool values of the same length as 'cmds'.
+    Returns:
+        list: list of tuples with return code, stripped stdout and
+            stripped stderr of each command in the order of 'cmds'.
+    """
+    if not cmds:
+        return []
+    cmds = [
+        cmd if isinstance(cmd, six.string_types) else ' '.join(cmd)
+        for cmd in cmds]
+    if isinstance(raise_on_error, (list, tuple)):
+        assert len(raise_on_error) == len(cmds), (
+            "Amount of 'raise_on_error' values (%s) does not match amount "
+            "of commands (%s)." % (len(raise_on_error), len(cmds)))
+    else:
+        raise_on_error = [raise_on_error] * len(cmds)
+
+    marker = "__ocs_cmd_frame_%s" % utils.get_random_str(16)
+    script = " ; ".join(
+        "( %s\n) ; __ocs_rc=$? ; echo ; echo %s:%d:$__ocs_rc ; "
+        "echo >&2 ; echo %s:%d: >&2" % (cmd, marker, i, marker, i)
+        for i, cmd in enumerate(cmds))
+
+    ret, out, err = g.run(hostname, script, "root")
+    if ("no ssh connection" in err.lower()
+            or "tls handshake timeout" in err.lower()):
+        g.ssh_close_connection(hostname)
+        g.ssh_pool_close_connections(hostname, "root")
+        COMMAND_METRICS.record_retry(hostname, script)
+        COMMAND_METRICS.record_reconnect(hostname)
+        ret, out, err = g.run(hostname, script, "root")
+    outs = _split_framed_output(out, marker, len(cmds))
+    errs = _split_framed_output(err, marker, len(cmds))
+
+    results, failures = [], []
+    for i, cmd in enumerate(cmds):
+        if i in outs:
+            cmd_ret, cmd_out = int(outs[i][0]), outs[i][1]
+            cmd_err = errs.get(i, ('', ''))[1]
+        else:
+            # NOTE: the batch got interrupted before the command finished,
+            # so the whole remote call result is the only info we have.
+            cmd_ret, cmd_out = int(ret) or 1, ''
+            cmd_err = "Command was not completed as part of the batch. %s" % (
+                err)
+        cmd_out = cmd_out.strip() if cmd_out else cmd_out
+        cmd_err = cmd_err.strip() if cmd_err else cmd_err
+        if cmd_ret != 0:
+            msg = ("Failed to execute command '%s' on '%s' node. Got non-zero "
+                   "return code '%s'. Err: %s" % (
+                       cmd, hostname, cmd_ret, cmd_err))
+            g.log.error(msg)
+            if raise_on_error[i]:
+                failures.append(msg)
+        results.append((cmd_ret, cmd_out, cmd_err))
+
+    assert not failures, "\n".join(failures)
+
+    return results
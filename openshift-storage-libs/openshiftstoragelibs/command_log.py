@@ -0,0 +1,180 @@
+"""Bounded logging of the commands run using 'g.run' and their outputs.
+
+Outputs of commands like 'oc get pv -o yaml' or 'heketi-cli topology info'
+are megabytes on large clusters, so logging them as is makes log files
+huge and spends noticeable time on string formatting. Outputs longer than
+the 'command_output_log_limit' config option get logged with their head
+and tail only. If 'command_output_spill_dir' option is set, then full
+outputs of the truncated ones get appended to gzip-compressed file of the
+current test case in that directory, and the log refers to them by index.
+
+Nothing gets formatted, truncated or spilled if the log level used for
+the command results is not enabled.
+
+Example of the log records:
+    STDOUT (root@master)...
+    apiVersion: v1
+    ...
+    ... 1048576 characters truncated, see #7 in /tmp/spill/test_a.log.gz ...
+    ...
+    kind: List
+"""
+
+import gzip
+import logging
+import os
+import re
+import threading
+import time
+
+from glusto.core import Glusto as g
+import six
+
+
+DEFAULT_LOG_LIMIT = 65536
+
+
+def _get_log_level(log_level):
+    if log_level is None:
+        return logging.INFO
+    if isinstance(log_level, six.string_types):
+        level = logging.getLevelName(log_level.upper())
+        return level if isinstance(level, int) else logging.INFO
+    return log_level
+
+
+class _TruncatedText(object):
+    """Text which gets cut to head and tail only when it gets formatted."""
+
+    def __init__(self, text, limit, note=""):
+        self.text, self.limit, self.note = text, limit, note
+
+    def __str__(self):
+        if not self.limit or len(self.text) <= self.limit:
+            return self.text
+        head = self.limit // 2
+        tail = self.limit - head
+        return "%s\n... %d characters truncated%s ...\n%s" % (
+            self.text[:head], len(self.text) - self.limit, self.note,
+            self.text[-tail:])
+
+    __unicode__ = __str__
+
+
+class CommandOutputLogger(object):
+    """Logger of the run commands and their results.
+
+    Args:
+        limit (int): max amount of characters of each of the stdout and
+            stderr to be logged. Zero disables truncation. If None, then
+            'command_output_log_limit' config option is used.
+        spill_dir (str): directory for the full outputs of the truncated
+            ones. If None, then 'command_output_spill_dir' config option
+            is used. Empty value disables spilling.
+    """
+
+    def __init__(self, limit=None, spill_dir=None):
+        self._limit, self._spill_dir = limit, spill_dir
+        self._lock = threading.Lock()
+        self._test_name = None
+        self._spilled = {}
+
+    @property
+    def limit(self):
+        if self._limit is None:
+            return int(g.config.get("common", {}).get(
+                "command_output_log_limit", DEFAULT_LOG_LIMIT) or 0)
+        return self._limit
+
+    @property
+    def spill_dir(self):
+        if self._spill_dir is None:
+            return g.config.get("common", {}).get("command_output_spill_dir")
+        return self._spill_dir
+
+    def set_test_name(self, test_name):
+        """Set name of the test case which gets full outputs spilled.
+
+        Args:
+            test_name (str): name of the current test case. If None, then
+                outputs get spilled to the 'session' file.
+        """
+        with self._lock:
+            self._test_name = test_name
+
+    def get_spill_path(self, test_name=None):
+        """Get path of the file with full outputs of the test case."""
+        name = re.sub(
+            r"[^\w.-]+", "_", test_name or self._test_name or "session")
+        return os.path.join(self.spill_dir, "%s.log.gz" % name.strip("_"))
+
+    def _spill(self, identifier, command, stream, text):
+        path = self.get_spill_path()
+        with self._lock:
+            index = self._spilled.get(path, 0) + 1
+            try:
+                if index == 1 and not os.path.isdir(self.spill_dir):
+                    os.makedirs(self.spill_dir)
+                # NOTE: each record is a separate gzip member, what is valid
+                # gzip file which does not require to keep it open.
+                record = "==> #%d %s %s (%s): %s <==\n%s\n" % (
+                    index, time.strftime("%Y-%m-%d %H:%M:%S"), identifier,
+                    stream, command, text)
+                if isinstance(record, six.text_type):
+                    record = record.encode("utf-8", "replace")
+                with gzip.open(path, "ab") as f:
+                    f.write(record)
+            except (IOError, OSError) as e:
+                g.log.error(
+                    "Failed to spill command output to '%s': %s" % (path, e))
+                return ""
+            self._spilled[path] = index
+        return ", see #%d in %s" % (index, path)
+
+    def log_command(self, identifier, command, log_level=None):
+        """Log command to be run.
+
+        Args:
+            identifier (str): 'user@host' string.
+            command (str|list): command to be logged.
+            log_level (str|int): log level name or number, INFO by default.
+        """
+        level = _get_log_level(log_level)
+        if not g.log.isEnabledFor(level):
+            return
+        if not isinstance(command, six.string_types):
+            command = " ".join(command)
+        g.log.log(level, "%s: %s", identifier, _TruncatedText(
+            command, self.limit))
+
+    def log_results(self, identifier, retcode, stdout, stderr,
+                    log_level=None, command=None):
+        """Log results of the command truncating too long outputs.
+
+        Args:
+            identifier (str): 'user@host' string.
+            retcode (int): return code of the command.
+            stdout (str): stdout of the command.
+            stderr (str): stderr of the command.
+            log_level (str|int): log level name or number, INFO by default.
+            command (str|list): the command itself to be saved along with
+                spilled outputs.
+        """
+        level = _get_log_level(log_level)
+        if not g.log.isEnabledFor(level):
+            return
+        g.log.log(level, "RETCODE (%s): %s", identifier, retcode)
+        limit = self.limit
+        for stream, text in (("STDOUT", stdout), ("STDERR", stderr)):
+            if not text:
+                continue
+            note = ""
+            if limit and len(text) > limit and self.spill_dir:
+                if not isinstance(command, six.string_types):
+                    command = " ".join(command or ())
+                note = self._spill(identifier, command, stream, text)
+            g.log.log(level, "%s (%s)...\n%s", stream, identifier,
+                      _TruncatedText(text, limit, note))
+
+
+COMMAND_OUTPUT_LOGGER = CommandOutputLogger()
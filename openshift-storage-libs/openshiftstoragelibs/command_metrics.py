@@ -0,0 +1,356 @@
+"""Latency and volume metrics of the commands run using 'g.run'.
+
+Each command run by 'g.run' or 'g.run_async' gets accounted per host and
+per command family. Family is the program name followed by the first
+sub-command of the 'oc', 'heketi-cli' and 'gluster' programs, such as
+'oc get', 'heketi-cli volume' or 'gluster volume'. Wrappers like
+'timeout 120', 'oc exec <pod> --' and 'oc rsh <pod>' are skipped, so
+commands run inside of pods are accounted by the program they run.
+
+Collected metrics are latency histograms, amount of sent and received
+bytes, amount of failures, retries and SSH reconnects. They may be
+exported in the Prometheus text format, for example, to a file read by
+the 'textfile' collector of the node exporter, or summarized for a period
+of time, such as a single test case.
+
+Example:
+    >>> snapshot = COMMAND_METRICS.snapshot()
+    >>> heketi_ops.heketi_volume_list(h_node, h_url, json=True)
+    >>> COMMAND_METRICS.get_summary(since=snapshot)
+    {'heketi-cli volume': {'count': 1, 'duration': 0.4, ...}}
+"""
+
+import bisect
+import copy
+import os
+import tempfile
+import threading
+
+import six
+
+
+LATENCY_BUCKETS = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+METRIC_PREFIX = "glusto_command"
+
+_FAMILY_PROGRAMS = ("oc", "heketi-cli", "gluster")
+_WRAPPER_PROGRAMS = ("sudo", "env", "(")
+_OPTIONS_WITH_VALUE = (
+    "-s", "--server", "--user", "--secret", "-n", "--namespace",
+    "-c", "--container", "--config", "--kubeconfig", "--context",
+    "-o", "--output", "-l", "--selector", "--mode")
+_SUB_COMMAND_ALIASES = {"v": "volume", "vol": "volume"}
+
+
+def _get_program_family(tokens):
+    i = 0
+    while i < len(tokens):
+        program = tokens[i].rsplit("/", 1)[-1]
+        if program == "timeout":
+            i += 1
+            while i < len(tokens) and tokens[i].startswith("-"):
+                i += 1
+            i += 1
+        elif program in _WRAPPER_PROGRAMS or "=" in program:
+            i += 1
+        else:
+            break
+    else:
+        return None
+    if program not in _FAMILY_PROGRAMS:
+        return program
+
+    sub_command, i = None, i + 1
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if token in _OPTIONS_WITH_VALUE:
+            i += 1
+        elif not token.startswith("-"):
+            sub_command = _SUB_COMMAND_ALIASES.get(token, token)
+            break
+    if sub_command is None:
+        return program
+    if program == "oc" and sub_command in ("exec", "rsh"):
+        # NOTE: skip pod name and options to get the command run in the pod
+        if "--" in tokens[i:]:
+            i = tokens.index("--", i) + 1
+        else:
+            while i < len(tokens) and tokens[i].startswith("-"):
+                i += 2 if tokens[i] in _OPTIONS_WITH_VALUE else 1
+            i += 1
+        return _get_program_family(tokens[i:]) or "oc %s" % sub_command
+    return "%s %s" % (program, sub_command)
+
+
+def get_command_family(command):
+    """Get family of a command used as its metrics label.
+
+    Args:
+        command (str|list): command run using 'g.run'.
+    Returns:
+        str: family of the command, like 'oc get', 'heketi-cli volume',
+            'gluster volume' or just the program name for other programs.
+    """
+    if not isinstance(command, six.string_types):
+        command = " ".join(command)
+    families = [
+        _get_program_family(segment.split())
+        for segment in command.split("|")]
+    for family in families:
+        if family and family.split(" ", 1)[0] in _FAMILY_PROGRAMS:
+            return family
+    return next((family for family in families if family), "unknown")
+
+
+def _get_size(value):
+    if not value:
+        return 0
+    if isinstance(value, six.text_type):
+        try:
+            return len(value.encode("utf-8"))
+        except UnicodeError:
+            return len(value)
+    return len(value)
+
+
+def _escape_label(value):
+    return value.replace(
+        "\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return "%d" % value
+
+
+class CommandMetrics(object):
+    """Thread-safe registry of the metrics of the run commands.
+
+    Args:
+        buckets (tuple): upper bounds of the latency histogram buckets
+            in seconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._commands = {}
+        self._reconnects = {}
+
+    def _get_entry(self, key):
+        entry = self._commands.get(key)
+        if entry is None:
+            entry = self._commands[key] = {
+                "count": 0,
+                "failures": 0,
+                "retries": 0,
+                "duration": 0.0,
+                "sent_bytes": 0,
+                "stdout_bytes": 0,
+                "stderr_bytes": 0,
+                "buckets": [0] * (len(self.buckets) + 1),
+            }
+        return entry
+
+    def record(self, host, command, duration, retcode=0, stdout=None,
+               stderr=None):
+        """Account one completed command.
+
+        Args:
+            host (str): host the command was run on.
+            command (str|list): the command itself.
+            duration (float): seconds the command took.
+            retcode (int): return code of the command. None means that
+                the command failed without getting the return code.
+            stdout (str): stdout of the command.
+            stderr (str): stderr of the command.
+        """
+        if not isinstance(command, six.string_types):
+            command = " ".join(command)
+        key = (host, get_command_family(command))
+        sizes = (_get_size(command), _get_size(stdout), _get_size(stderr))
+        bucket = bisect.bisect_left(self.buckets, duration)
+        with self._lock:
+            entry = self._get_entry(key)
+            entry["count"] += 1
+            entry["failures"] += int(retcode is None or int(retcode) != 0)
+            entry["duration"] += duration
+            entry["sent_bytes"] += sizes[0]
+            entry["stdout_bytes"] += sizes[1]
+            entry["stderr_bytes"] += sizes[2]
+            entry["buckets"][bucket] += 1
+
+    def record_retry(self, host, command):
+        """Account one more attempt to run the command."""
+        key = (host, get_command_family(command))
+        with self._lock:
+            self._get_entry(key)["retries"] += 1
+
+    def record_reconnect(self, host):
+        """Account recreation of the broken connection to the host."""
+        with self._lock:
+            self._reconnects[host] = self._reconnects.get(host, 0) + 1
+
+    def reset(self):
+        """Drop all the collected metrics."""
+        with self._lock:
+            self._commands, self._reconnects = {}, {}
+
+    def snapshot(self):
+        """Get copy of the current metrics to summarize them later.
+
+        Returns:
+            dict: with 'commands' and 'reconnects' keys.
+        """
+        with self._lock:
+            return {
+                "commands": copy.deepcopy(self._commands),
+                "reconnects": dict(self._reconnects),
+            }
+
+    def get_summary(self, since=None, by_host=False):
+        """Summarize metrics collected so far or since the snapshot.
+
+        Args:
+            since (dict): result of the 'snapshot' method. If provided,
+                then only commands run after it are summarized.
+            by_host (bool): if True, then summary is grouped by
+                '(host, family)' tuples instead of families.
+        Returns:
+            dict: 'family' or '(host, family)' keys and dict values with
+                'count', 'failures', 'retries', 'duration', 'sent_bytes',
+                'stdout_bytes' and 'stderr_bytes' keys. Special 'ssh'
+                family (or '(host, "ssh")' key) has 'reconnects' key.
+        """
+        current = self.snapshot()
+        since = since or {"commands": {}, "reconnects": {}}
+        summary = {}
+        for (host, family), entry in current["commands"].items():
+            old_entry = since["commands"].get((host, family), {})
+            delta = dict(
+                (name, value - old_entry.get(name, 0))
+                for name, value in entry.items()
+                if name != "buckets")
+            if not (delta["count"] or delta["retries"]):
+                continue
+            item = summary.setdefault(
+                (host, family) if by_host else family,
+                dict((name, 0) for name in delta))
+            for name, value in delta.items():
+                item[name] += value
+        for host, reconnects in current["reconnects"].items():
+            reconnects -= since["reconnects"].get(host, 0)
+            if reconnects:
+                item = summary.setdefault(
+                    (host, "ssh") if by_host else "ssh", {"reconnects": 0})
+                item["reconnects"] += reconnects
+        return summary
+
+    def get_junit_properties(self, since=None):
+        """Get summary of the metrics as JUnit test case properties.
+
+        Args:
+            since (dict): result of the 'snapshot' method taken at the
+                beginning of the test case.
+        Returns:
+            list: sorted list of '(name, value)' tuples.
+        """
+        properties = []
+        for family, item in sorted(self.get_summary(since=since).items()):
+            if family == "ssh":
+                value = "reconnects=%d" % item["reconnects"]
+            else:
+                value = (
+                    "count=%d duration=%.3fs failures=%d retries=%d "
+                    "sent_bytes=%d stdout_bytes=%d stderr_bytes=%d" % (
+                        item["count"], item["duration"], item["failures"],
+                        item["retries"], item["sent_bytes"],
+                        item["stdout_bytes"], item["stderr_bytes"]))
+            properties.append(("commands[%s]" % family, value))
+        return properties
+
+    def render_prometheus(self):
+        """Render all the collected metrics in the Prometheus text format.
+
+        Returns:
+            str: metrics in the Prometheus exposition format.
+        """
+        current = self.snapshot()
+        commands = sorted(current["commands"].items())
+        lines = []
+
+        def add_metric(name, metric_type, description, samples):
+            lines.append("# HELP %s %s" % (name, description))
+            lines.append("# TYPE %s %s" % (name, metric_type))
+            for suffix, labels, value in samples:
+                lines.append("%s%s{%s} %s" % (
+                    name, suffix, ",".join(
+                        '%s="%s"' % (label, _escape_label(label_value))
+                        for label, label_value in labels),
+                    _format_value(value)))
+
+        samples = []
+        for (host, family), entry in commands:
+            labels = (("host", host), ("family", family))
+            total = 0
+            for bound, count in zip(
+                    self.buckets + ("+Inf",), entry["buckets"]):
+                total += count
+                samples.append((
+                    "_bucket", labels + (("le", "%s" % bound),), total))
+            samples.append(("_sum", labels, entry["duration"]))
+            samples.append(("_count", labels, entry["count"]))
+        add_metric(
+            "%s_duration_seconds" % METRIC_PREFIX, "histogram",
+            "Duration of the commands.", samples)
+
+        for name, description in (
+                ("failures", "Commands completed with non-zero return code."),
+                ("retries", "Commands rerun because of connection issues.")):
+            add_metric(
+                "%s_%s_total" % (METRIC_PREFIX, name), "counter", description,
+                [("", (("host", host), ("family", family)), entry[name])
+                 for (host, family), entry in commands])
+
+        samples = []
+        for (host, family), entry in commands:
+            for stream, name in (
+                    ("command", "sent_bytes"), ("stdout", "stdout_bytes"),
+                    ("stderr", "stderr_bytes")):
+                samples.append((
+                    "", (("host", host), ("family", family),
+                         ("stream", stream)), entry[name]))
+        add_metric(
+            "%s_bytes_total" % METRIC_PREFIX, "counter",
+            "Bytes of the commands and their outputs.", samples)
+
+        add_metric(
+            "%s_ssh_reconnects_total" % METRIC_PREFIX, "counter",
+            "Recreations of the broken SSH connections.",
+            [("", (("host", host),), value)
+             for host, value in sorted(current["reconnects"].items())])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_file(self, path):
+        """Atomically write metrics in the Prometheus text format to a file.
+
+        Args:
+            path (str): path of the file to write metrics to. File gets
+                replaced atomically, so it may be read at any time.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=".%s." % os.path.basename(path))
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render_prometheus())
+            os.chmod(tmp_path, 0o644)
+            os.rename(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+
+COMMAND_METRICS = CommandMetrics()
@@ -29,3 +29,31 @@ class CloudProviderError(Exception):
 
     For example, unable to find a vm in vsphere client.
     '''
+
+
+class HeketiClientError(AssertionError):
+    '''
+    Custom exception thrown when request to the Heketi REST API fails.
+
+    It is subclass of AssertionError to be handled the same way as failures
+    of the 'heketi-cli' commands. HTTP status code is stored as 'status'
+    attribute if available.
+    '''
+
+    def __init__(self, msg, status=None):
+        super(HeketiClientError, self).__init__(msg)
+        self.status = status
+
+
+class KubeAPIError(AssertionError):
+    '''
+    Custom exception thrown when request to the Kubernetes API server fails.
+
+    It is subclass of AssertionError to be handled the same way as failures
+    of the 'oc' commands. HTTP status code is stored as 'status' attribute.
+    If it is None, then API server was not reachable.
+    '''
+
+    def __init__(self, msg, status=None):
+        super(KubeAPIError, self).__init__(msg)
+        self.status = status
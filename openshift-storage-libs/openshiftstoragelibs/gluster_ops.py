@@ -8,13 +8,13 @@ try:
     import xml.etree.cElementTree as etree
 except ImportError:
     import xml.etree.ElementTree as etree
+import collections
+import io
 import re
 import six
 import time
 
 from glusto.core import Glusto as g
-from glustolibs.gluster.block_ops import block_list
-from glustolibs.gluster.heal_libs import is_heal_complete
 from glustolibs.gluster.volume_ops import (
     get_volume_status,
     get_volume_list,
@@ -24,26 +24,407 @@ from glustolibs.gluster.volume_ops import (
 )
 
 from openshiftstoragelibs import exceptions
-from openshiftstoragelibs.heketi_ops import heketi_blockvolume_info
+from openshiftstoragelibs.heketi_ops import (
+    heketi_blockvolume_info,
+    map_parallel,
+)
 from openshiftstoragelibs.openshift_ops import (
     cmd_run_on_gluster_pod_or_node,
-    get_ocp_gluster_pod_details,
+    GLUSTER_TOPOLOGY,
 )
 from openshiftstoragelibs import podcmd
+from openshiftstoragelibs import utils
 from openshiftstoragelibs import waiter
 
 
+def _get_gluster_endpoints(g_node):
+    """Get all the Gluster PODs or nodes if endpoint is not specified."""
+    if g_node != "auto_get_gluster_endpoint":
+        return [g_node]
+    ocp_client_node = list(g.config['ocp_servers']['client'].keys())[0]
+    gluster_pods = GLUSTER_TOPOLOGY.get_pods(ocp_client_node)
+    if gluster_pods:
+        return [
+            podcmd.Pod(ocp_client_node, pod["pod_name"])
+            for pod in gluster_pods]
+    return list(g.config.get("gluster_servers", {}).keys())
+
+
+def _is_heal_info_complete(xml_output):
+    try:
+        root = etree.XML(xml_output)
+    except etree.ParseError:
+        return False
+    # NOTE: failed heal info has no bricks, so it must not be treated as
+    # complete heal.
+    bricks = root.findall("healInfo/bricks/brick")
+    if root.findtext("opRet") != "0" or not bricks:
+        return False
+    return all(brick.findtext("numberOfEntries") == "0" for brick in bricks)
+
+
+def _iter_per_volume_outputs(g_node, vol_names, command, batch_size=None):
+    """Run Gluster command for each of the volumes in batches.
+
+    Args:
+        g_node (str|podcmd.Pod): Gluster node or POD to run commands on.
+        vol_names (list): names of the Gluster volumes.
+        command (str): command with '%s' placeholder for the volume name.
+        batch_size (int): amount of volumes processed per one remote call.
+            Defaults to the 'gluster_volume_batch_size' config option.
+    Yields:
+        tuple: volume name and output of the command run for it.
+    """
+    if batch_size is None:
+        batch_size = g.config.get("common", {}).get(
+            "gluster_volume_batch_size", 100)
+    marker = "__ocs_vol_output_%s" % utils.get_random_str(16)
+    for i in range(0, len(vol_names), batch_size):
+        script = " ; ".join(
+            "echo %s:%s ; %s" % (
+                marker, vol_name, command % six.moves.shlex_quote(vol_name))
+            for vol_name in vol_names[i:i + batch_size])
+        ret, out, err = podcmd.run(
+            g_node, "sh -c %s" % six.moves.shlex_quote(script),
+            log_level='DEBUG')
+        for output in (out or "").split("%s:" % marker)[1:]:
+            vol_name, _, vol_output = output.partition("\n")
+            yield vol_name.strip(), vol_output
+
+
+def get_heal_pending_volumes(g_node, vol_names, batch_size=None):
+    """Get volumes which have entries to be healed.
+
+    Heal info of several volumes is got using one remote call per batch
+    of volumes.
+
+    Args:
+        g_node (str|podcmd.Pod): Gluster node or POD to run commands on.
+        vol_names (list): names of the Gluster volumes to be checked.
+        batch_size (int): amount of volumes checked per one remote call.
+            Defaults to the 'gluster_volume_batch_size' config option.
+    Returns:
+        list: names of the volumes which heal is not complete or which
+            heal info was not got, in the order of 'vol_names'.
+    """
+    healed = set(
+        vol_name for vol_name, xml_output in _iter_per_volume_outputs(
+            g_node, vol_names, "gluster volume heal %s info --xml",
+            batch_size)
+        if _is_heal_info_complete(xml_output))
+    return [vol_name for vol_name in vol_names if vol_name not in healed]
+
+
+def _parse_heal_count_output(output):
+    """Parse output of the 'gluster volume heal <vol> statistics heal-count'.
+
+    Returns:
+        collections.OrderedDict: brick names as keys and amounts of entries
+            to be healed as values. Value is None for the bricks which
+            count was not gathered, i.e. which are down.
+    """
+    bricks = collections.OrderedDict()
+    brick = None
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("Brick "):
+            brick = line[len("Brick "):]
+            bricks[brick] = None
+        elif brick and line.startswith("Number of entries:"):
+            try:
+                bricks[brick] = int(line.split(":", 1)[1])
+            except ValueError:
+                pass
+    return bricks
+
+
+def get_heal_entries_counts(g_node, vol_names, batch_size=None):
+    """Get amounts of entries to be healed on each brick of the volumes.
+
+    Counts are got using 'gluster volume heal <vol> statistics heal-count'
+    command which reads sizes of the brick indexes and is much cheaper
+    than the 'heal info' one. Several volumes get checked by one remote
+    call per batch of volumes.
+
+    Args:
+        g_node (str|podcmd.Pod): Gluster node or POD to run commands on.
+        vol_names (list): names of the Gluster volumes to be checked.
+        batch_size (int): amount of volumes checked per one remote call.
+            Defaults to the 'gluster_volume_batch_size' config option.
+    Returns:
+        dict: volume names as keys and values returned by the
+            '_parse_heal_count_output' function. Volumes which counts were
+            not got have empty dicts as values.
+    """
+    counts = dict((vol_name, collections.OrderedDict())
+                  for vol_name in vol_names)
+    for vol_name, output in _iter_per_volume_outputs(
+            g_node, vol_names, "gluster volume heal %s statistics heal-count",
+            batch_size):
+        counts[vol_name] = _parse_heal_count_output(output)
+    return counts
+
+
+def _split_between_endpoints(g_nodes, vol_names):
+    return [
+        (node, vol_names[i::len(g_nodes)])
+        for i, node in enumerate(g_nodes)
+        if vol_names[i::len(g_nodes)]]
+
+
+HealSample = collections.namedtuple(
+    "HealSample", ("timestamp", "volume", "brick", "entries"))
+
+
+class HealProgressTracker(object):
+    """Tracker of the self-heal progress of Gluster volumes.
+
+    Each sample gets amounts of entries to be healed on each brick of the
+    volumes which are not healed yet. Samples make a time series which is
+    used to calculate heal rate and ETA of each volume, to detect volumes
+    which heal is stalled and which may be saved to compare heal speed of
+    different builds.
+
+    Args:
+        vol_names (list): names of the Gluster volumes to be tracked.
+            If not provided, then all the Gluster volumes are tracked.
+        g_node (str): Gluster node or POD to run commands on. Default
+            'auto_get_gluster_endpoint' value means that volumes get split
+            between all the Gluster PODs or nodes sampled concurrently.
+        stall_samples (int): amount of consecutive samples without
+            decrease of the entries after which heal of a volume is
+            considered to be stalled. If not provided, then
+            'gluster_heal_stall_samples' config option is used with default
+            value of 5. Zero disables stall detection.
+        rate_samples (int): amount of the last samples the heal rate gets
+            calculated by.
+
+    Example:
+        >>> tracker = HealProgressTracker()
+        >>> tracker.wait(timeout=600, interval=10)
+        >>> tracker.write_time_series("/tmp/heal-progress.csv")
+    """
+
+    def __init__(self, vol_names=None, g_node="auto_get_gluster_endpoint",
+                 stall_samples=None, rate_samples=5):
+        self.g_node = g_node
+        self.vol_names = list(vol_names or [])
+        if stall_samples is None:
+            stall_samples = g.config.get("common", {}).get(
+                "gluster_heal_stall_samples", 5)
+        self.stall_samples = stall_samples
+        self.rate_samples = max(rate_samples, 2)
+        self.samples = []
+        # NOTE: '(timestamp, total entries)' tuples of each volume and
+        # amount of the last samples without progress.
+        self._history = collections.defaultdict(list)
+        self._no_progress = collections.defaultdict(int)
+        self._pending = None
+
+    @podcmd.GlustoPod()
+    def _get_vol_names(self):
+        vol_names = get_volume_list(self.g_node)
+        if not vol_names:
+            raise AssertionError("failed to get gluster volume list")
+        return vol_names
+
+    def get_pending_volumes(self):
+        """Get volumes which were not healed on the last sample.
+
+        Returns:
+            list: volume names. Volumes with bricks which counts were not
+                gathered are considered to be pending.
+        """
+        if self._pending is None:
+            if not self.vol_names:
+                self.vol_names = self._get_vol_names()
+            self._pending = list(self.vol_names)
+        return list(self._pending)
+
+    def sample(self):
+        """Get amounts of entries to be healed of the pending volumes.
+
+        Returns:
+            dict: volume names as keys and total amounts of entries to be
+                healed as values. Value is None if count of some brick of
+                the volume was not got.
+        """
+        pending = self.get_pending_volumes()
+        if not pending:
+            return {}
+        g_nodes = _get_gluster_endpoints(self.g_node)
+        groups = _split_between_endpoints(g_nodes, pending)
+        counts = {}
+        for group_counts in map_parallel(
+                lambda group: get_heal_entries_counts(*group),
+                groups, max_workers=len(groups)):
+            counts.update(group_counts)
+
+        now, totals = time.time(), {}
+        for vol_name in pending:
+            bricks = counts.get(vol_name) or {None: None}
+            for brick, entries in bricks.items():
+                self.samples.append(HealSample(now, vol_name, brick, entries))
+            total = (
+                None if None in bricks.values() else sum(bricks.values()))
+            totals[vol_name] = total
+
+            history = self._history[vol_name]
+            if total is not None and history and history[-1][1] is not None:
+                if total < history[-1][1]:
+                    self._no_progress[vol_name] = 0
+                else:
+                    self._no_progress[vol_name] += 1
+            history.append((now, total))
+        self._pending = [
+            vol_name for vol_name in pending if totals[vol_name] != 0]
+        return totals
+
+    def get_entries(self, vol_name):
+        """Get total amount of entries of the volume on the last sample."""
+        history = self._history.get(vol_name)
+        return history[-1][1] if history else None
+
+    def get_rate(self, vol_name):
+        """Get heal rate of the volume by its last samples.
+
+        Returns:
+            float: amount of entries healed per second, negative if entries
+                are added faster than healed. None if there are not enough
+                samples.
+        """
+        history = [
+            item for item in self._history.get(vol_name, [])[
+                -self.rate_samples:]
+            if item[1] is not None]
+        if len(history) < 2 or history[-1][0] <= history[0][0]:
+            return None
+        return float(history[0][1] - history[-1][1]) / (
+            history[-1][0] - history[0][0])
+
+    def get_eta(self, vol_name):
+        """Get estimated amount of seconds left till the volume is healed.
+
+        Returns:
+            float: seconds left, zero for the healed volumes. None if heal
+                rate is unknown or not positive.
+        """
+        entries = self.get_entries(vol_name)
+        if entries == 0:
+            return 0.0
+        rate = self.get_rate(vol_name)
+        if entries is None or not rate or rate < 0:
+            return None
+        return entries / rate
+
+    def get_stalled_volumes(self):
+        """Get pending volumes which entries did not decrease for
+        'stall_samples' consecutive samples.
+        """
+        if not self.stall_samples:
+            return []
+        return [
+            vol_name for vol_name in self.get_pending_volumes()
+            if self._no_progress[vol_name] >= self.stall_samples]
+
+    def get_report(self, limit=20):
+        """Get human readable progress of the pending volumes.
+
+        Args:
+            limit (int): max amount of the volumes to be reported.
+        Returns:
+            str: line per volume with its entries, heal rate and ETA.
+        """
+        pending = self.get_pending_volumes()
+        lines = []
+        for vol_name in pending[:limit]:
+            entries = self.get_entries(vol_name)
+            rate, eta = self.get_rate(vol_name), self.get_eta(vol_name)
+            lines.append("%s: %s entries, rate %s entries/s, ETA %s" % (
+                vol_name, "unknown" if entries is None else entries,
+                "unknown" if rate is None else "%.2f" % rate,
+                "unknown" if eta is None else "%ds" % eta))
+        if len(pending) > limit:
+            lines.append("... and %d more volumes" % (len(pending) - limit))
+        return "\n".join(lines)
+
+    def get_time_series(self):
+        """Get all the samples as list of dicts with the 'HealSample'
+        fields and 'elapsed' seconds since the first sample.
+        """
+        if not self.samples:
+            return []
+        start = self.samples[0].timestamp
+        return [
+            dict(sample._asdict(), elapsed=round(sample.timestamp - start, 3))
+            for sample in self.samples]
+
+    def write_time_series(self, path):
+        """Write all the samples to the CSV file.
+
+        Columns are 'elapsed', 'timestamp', 'volume', 'brick' and
+        'entries'. Empty 'entries' means that the count was not gathered.
+        """
+        fields = ("elapsed",) + HealSample._fields
+        with open(path, "w") as f:
+            f.write(",".join(fields) + "\n")
+            for item in self.get_time_series():
+                f.write(",".join(
+                    "" if item[field] is None else "%s" % item[field]
+                    for field in fields) + "\n")
+
+    def wait(self, timeout=300, interval=5):
+        """Sample heal progress till all the volumes are healed.
+
+        Args:
+            timeout (int): seconds to wait for heal to complete.
+            interval (int): seconds between samples.
+        Raises:
+            AssertionError: if heal of some volume is stalled or is not
+                complete in time. Message has the progress report.
+        """
+        for w in waiter.Waiter(timeout=timeout, interval=interval):
+            self.sample()
+            pending = self.get_pending_volumes()
+            if not pending:
+                return
+            stalled = self.get_stalled_volumes()
+            if stalled:
+                err_msg = (
+                    "heal of %d gluster volumes is stalled for %d samples: "
+                    "%s\n%s" % (
+                        len(stalled), self.stall_samples,
+                        ", ".join(stalled[:20]), self.get_report()))
+                g.log.error(err_msg)
+                raise AssertionError(err_msg)
+            g.log.info(
+                "Heal progress of %d gluster volumes:\n%s" % (
+                    len(pending), self.get_report()))
+
+        if w.expired:
+            err_msg = (
+                "reached timeout waiting for all the gluster volumes to "
+                "reach the 'healed' state. %d volumes are not healed:\n%s" % (
+                    len(self.get_pending_volumes()), self.get_report()))
+            g.log.error(err_msg)
+            raise AssertionError(err_msg)
+
+
 @podcmd.GlustoPod()
 def wait_to_heal_complete(
         vol_name=None, g_node="auto_get_gluster_endpoint",
         timeout=300, wait_step=5):
     """Monitors heal for volumes on gluster
 
+    Volumes get split between all the Gluster PODs or nodes which check
+    heal info of their volumes concurrently. Each next check includes only
+    volumes which heal was not complete on the previous one.
+
     Args:
         vol_name (str): Name of the gluster volume else default is None and
             will check for all the volumes
         g_node (str): Name of the gluster node else default is
-            auto_get_gluster_endpoint
+            auto_get_gluster_endpoint what means all the gluster endpoints
         timeout (int): Time to wait for heal check to complete default is 300
         wait_step (int): Time to trigger heal check command for next iteration
     Raises:
@@ -56,18 +437,25 @@ def wait_to_heal_complete(
     else:
         gluster_vol_list = [vol_name]
 
-    _waiter = waiter.Waiter(timeout=timeout, interval=wait_step)
-    for gluster_vol in gluster_vol_list:
-        for w in _waiter:
-            if is_heal_complete(g_node, gluster_vol):
-                # NOTE(vponomar): Reset attempts for waiter to avoid redundant
-                # sleep equal to 'interval' on the next usage.
-                _waiter._attempt = 0
-                break
+    g_nodes = _get_gluster_endpoints(g_node)
+    pending_vols = list(gluster_vol_list)
+    for w in waiter.Waiter(timeout=timeout, interval=wait_step):
+        groups = _split_between_endpoints(g_nodes, pending_vols)
+        pending_vols = sum(map_parallel(
+            lambda group: get_heal_pending_volumes(*group),
+            groups, max_workers=len(groups)), [])
+        if not pending_vols:
+            break
 
     if w.expired:
+        # NOTE: get amounts of entries of the not healed volumes to know
+        # how far they are from being healed.
+        tracker = HealProgressTracker(pending_vols[:20], g_node=g_node)
+        tracker.sample()
         err_msg = ("reached timeout waiting for all the gluster volumes "
-                   "to reach the 'healed' state.")
+                   "to reach the 'healed' state. %d volumes are not healed, "
+                   "entries of some of them:\n%s" % (
+                       len(pending_vols), tracker.get_report()))
         g.log.error(err_msg)
         raise AssertionError(err_msg)
 
@@ -92,6 +480,102 @@ def get_gluster_vol_status(file_vol, is_detail=False):
     return gluster_volume_status
 
 
+GlusterBrickStatus = collections.namedtuple(
+    'GlusterBrickStatus', 'volume host path pid status port')
+
+
+def iter_gluster_vol_status_xml(xml_output):
+    """Parse 'gluster volume status --xml' output without building a DOM.
+
+    Elements get dropped right after being parsed, so only one volume
+    element is kept in memory at a time.
+
+    Args:
+        xml_output (str): output of the 'gluster volume status --xml'
+            command for one or all the volumes.
+    Yields:
+        GlusterBrickStatus: record per each brick and daemon of the
+            volumes. Self-heal and other daemons have their name as 'host'
+            and their node as 'path', the same as in 'get_volume_status'.
+    Raises:
+        exceptions.ExecutionError: if command failed.
+    """
+    if isinstance(xml_output, six.text_type):
+        xml_output = xml_output.encode('utf-8')
+    parents, vol_name, op_ret = [], None, None
+    for event, element in etree.iterparse(
+            io.BytesIO(xml_output), events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == 'opRet':
+            op_ret = element.text
+        elif element.tag == 'opErrstr' and op_ret not in (None, '0'):
+            raise exceptions.ExecutionError(
+                "Failed to get volume status: %s" % element.text)
+        elif element.tag == 'volName':
+            vol_name = element.text
+        elif element.tag == 'node':
+            port = element.findtext('port')
+            if port in (None, 'N/A'):
+                port = element.findtext('ports/tcp', port)
+            yield GlusterBrickStatus(
+                vol_name, element.findtext('hostname'),
+                element.findtext('path'), element.findtext('pid'),
+                element.findtext('status'), port)
+        if element.tag in ('node', 'volume') and parents:
+            element.clear()
+            parents[-1].remove(element)
+
+
+def iter_gluster_vol_status(
+        vol_name='all', g_node='auto_get_gluster_endpoint'):
+    """Get brick records of the 'gluster volume status' one by one.
+
+    Args:
+        vol_name (str): name of the volume or 'all' for all the volumes.
+        g_node (str): gluster node or POD to run the command on.
+    Yields:
+        GlusterBrickStatus: record per each brick and daemon of the volumes.
+    Raises:
+        exceptions.ExecutionError: if command failed.
+    """
+    ret, out, err = podcmd.run(
+        g_node, 'gluster volume status %s --xml' % vol_name,
+        log_level='DEBUG')
+    if ret:
+        raise exceptions.ExecutionError(
+            "Failed to get status of the '%s' gluster volume on '%s': "
+            "%s" % (vol_name, g_node, err))
+    for brick in iter_gluster_vol_status_xml(out):
+        yield brick
+
+
+def get_gluster_vol_names(g_node="auto_get_gluster_endpoint"):
+    """Get names of all the Gluster volumes.
+
+    Unlike 'get_volume_list' of glustolibs, it doesn't require 'g.run'
+    to be patched by 'podcmd.GlustoPod', so it may be called concurrently
+    with other commands.
+
+    Args:
+        g_node (str): gluster node or POD to run the command on.
+    Returns:
+        list: names of the volumes.
+    Raises:
+        exceptions.ExecutionError: if command failed.
+    """
+    ret, out, err = podcmd.run(
+        g_node, 'gluster volume list --xml', log_level='DEBUG')
+    if ret:
+        raise exceptions.ExecutionError(
+            "Failed to get list of the gluster volumes on '%s': %s" % (
+                g_node, err))
+    return [
+        volume.text for volume in etree.XML(out).findall("volList/volume")]
+
+
 @podcmd.GlustoPod()
 def get_gluster_vol_hosting_nodes(file_vol):
     """Get Gluster vol hosting nodes.
@@ -222,6 +706,64 @@ def restart_file_volume(file_vol, sleep_time=120):
 
 
 @podcmd.GlustoPod()
+def get_block_volumes_by_bhv(
+        vol_names=None, g_node="auto_get_gluster_endpoint", batch_size=None):
+    """Get names of the block volumes of each block hosting volume.
+
+    Volumes get split between all the Gluster PODs or nodes which run
+    'gluster-block list' for batches of their volumes concurrently.
+
+    Args:
+        vol_names (list): names of the block hosting volumes. If not
+            provided, then all the Gluster volumes except the
+            'heketidbstorage' one are used.
+        g_node (str): Gluster node or POD to run commands on. Default
+            'auto_get_gluster_endpoint' value means all the Gluster PODs
+            or nodes.
+        batch_size (int): amount of volumes listed per one remote call.
+            Defaults to the 'gluster_volume_batch_size' config option.
+    Returns:
+        dict: block hosting volume names as keys and lists of the names
+            of their block volumes as values.
+    Raises:
+        AssertionError: if block volumes of some volume were not listed.
+    """
+    if vol_names is None:
+        vol_names = [
+            vol_name for vol_name in get_volume_list(g_node) or []
+            if vol_name != "heketidbstorage"]
+
+    def list_blocks(group):
+        node, group_vol_names = group
+        return list(_iter_per_volume_outputs(
+            node, group_vol_names, "gluster-block list %s --json",
+            batch_size))
+
+    groups = _split_between_endpoints(
+        _get_gluster_endpoints(g_node), list(vol_names))
+    outputs = dict(sum(
+        map_parallel(list_blocks, groups, max_workers=len(groups)), []))
+
+    blocks, errors = {}, []
+    for vol_name in vol_names:
+        try:
+            result = json.loads(outputs[vol_name])
+        except (KeyError, ValueError):
+            errors.append("%s: %s" % (
+                vol_name, outputs.get(vol_name) or "no output"))
+            continue
+        if result.get("RESULT") == "FAIL":
+            errors.append("%s: %s" % (vol_name, result.get("errMsg")))
+            continue
+        blocks[vol_name] = result.get("blocks", [])
+    if errors:
+        err_msg = "failed to get block volume list of %d volumes:\n%s" % (
+            len(errors), "\n".join(errors[:20]))
+        g.log.error(err_msg)
+        raise AssertionError(err_msg)
+    return blocks
+
+
 def match_heketi_and_gluster_block_volumes_by_prefix(
         heketi_block_volumes, block_vol_prefix):
     """Match block volumes from heketi and gluster. This function can't
@@ -234,25 +776,11 @@ def match_heketi_and_gluster_block_volumes_by_prefix(
         block_vol_prefix (str): block volume prefix by which the block
                                 volumes needs to be filtered
     """
-    gluster_vol_list = get_volume_list("auto_get_gluster_endpoint")
-
-    gluster_vol_block_list = []
-    for gluster_vol in gluster_vol_list[1:]:
-        ret, out, err = block_list("auto_get_gluster_endpoint", gluster_vol)
-        try:
-            if ret != 0 and json.loads(out)["RESULT"] == "FAIL":
-                msg = "failed to get block volume list with error: %s" % err
-                g.log.error(msg)
-                raise AssertionError(msg)
-        except Exception as e:
-            g.log.error(e)
-            raise
-
-        gluster_vol_block_list.extend([
-            block_vol.replace(block_vol_prefix, "")
-            for block_vol in json.loads(out)["blocks"]
-            if block_vol.startswith(block_vol_prefix)
-        ])
+    gluster_vol_block_list = [
+        block_vol.replace(block_vol_prefix, "")
+        for block_vols in get_block_volumes_by_bhv().values()
+        for block_vol in block_vols
+        if block_vol.startswith(block_vol_prefix)]
 
     vol_difference = set(gluster_vol_block_list) ^ set(heketi_block_volumes)
     if vol_difference:
@@ -367,7 +895,7 @@ def _get_gluster_cmd(target, command):
     if isinstance(command, six.string_types):
         command = [command]
     ocp_client_node = list(g.config['ocp_servers']['client'].keys())[0]
-    gluster_pods = get_ocp_gluster_pod_details(ocp_client_node)
+    gluster_pods = GLUSTER_TOPOLOGY.get_pods(ocp_client_node)
 
     if target == 'auto_get_gluster_endpoint':
         if gluster_pods:
@@ -432,10 +960,10 @@ def get_peer_status(mnode):
     peer_status_list = []
     for peer in root.findall("peerStatus/peer"):
         peer_dict = {}
-        for element in peer.getchildren():
+        for element in peer:
             if element.tag == "hostnames":
                 hostnames_list = []
-                for hostname in element.getchildren():
+                for hostname in element:
                     hostnames_list.append(hostname.text)
                 element.text = hostnames_list
             peer_dict[element.tag] = element.text
@@ -0,0 +1,370 @@
+"""Client for the Heketi REST API.
+
+It allows to talk to Heketi directly from the test runner instead of
+running 'heketi-cli' binary on a remote node. Requests get signed using JWT
+with the same user and key which are used by 'heketi-cli', HTTP connections
+are kept alive between requests and async operations get polled using the
+'Location' header the same way as the Go client of Heketi does.
+
+Example:
+    >>> client = HeketiClient(
+    ...     "http://heketi-storage.example.com", "admin", "secret")
+    >>> vol = client.volume_create({"size": 1, "name": "autotests-vol"})
+    >>> client.volume_delete(vol["id"])
+"""
+
+import base64
+import hashlib
+import hmac
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import socket
+import threading
+import time
+
+from glusto.core import Glusto as g
+import six
+from six.moves import http_client
+from six.moves.urllib import parse as urlparse
+
+from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import utils
+
+
+HEKETI_TOKEN_TTL = 300
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def get_heketi_jwt(user, key, method, path, now=None):
+    """Create JWT token for the Heketi API request.
+
+    Args:
+        user (str): Heketi user, used as 'iss' claim.
+        key (str): Heketi user key used for signing the token.
+        method (str): HTTP method of the request.
+        path (str): URL path of the request without query part.
+        now (int): optional. Unix time to be used as 'iat' claim.
+    Returns:
+        str: signed JWT token.
+    """
+    now = int(time.time() if now is None else now)
+    header = {"alg": "HS256", "typ": "JWT"}
+    claims = {
+        "iss": user,
+        "iat": now,
+        "exp": now + HEKETI_TOKEN_TTL,
+        "qsh": hashlib.sha256(
+            six.b("%s&%s" % (method.upper(), path))).hexdigest(),
+    }
+    signing_input = b".".join((
+        _b64url(six.b(json.dumps(header, separators=(",", ":")))),
+        _b64url(six.b(json.dumps(claims, separators=(",", ":")))),
+    ))
+    signature = hmac.new(
+        six.b(key or ""), signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("ascii")
+
+
+class HeketiClient(object):
+    """Thread-safe client for the Heketi REST API.
+
+    Args:
+        server_url (str): Heketi server URL, like 'http://heketi:8080'.
+        user (str): Heketi user. If not set, then requests are not signed.
+        key (str): Heketi user key.
+        timeout (int): seconds to wait for each of the HTTP requests and
+            for the async operations to be finished.
+        poll_interval (float): seconds between checks of async operations.
+        max_connections (int): amount of idle keep-alive connections
+            to be kept for reuse.
+    """
+
+    def __init__(self, server_url, user=None, key=None, timeout=120,
+                 poll_interval=1, max_connections=8):
+        parsed_url = urlparse.urlsplit(server_url)
+        if parsed_url.scheme not in ("http", "https"):
+            raise exceptions.ConfigError(
+                "Unsupported scheme of the Heketi server URL '%s'." % (
+                    server_url))
+        self.server_url = server_url
+        self.user = user
+        self.key = key
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_connections = max_connections
+        self._scheme = parsed_url.scheme
+        self._netloc = parsed_url.netloc
+        self._base_path = parsed_url.path.rstrip("/")
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _new_connection(self):
+        conn_class = (
+            http_client.HTTPSConnection if self._scheme == "https"
+            else http_client.HTTPConnection)
+        return conn_class(self._netloc, timeout=self.timeout)
+
+    def _get_connection(self):
+        with self._lock:
+            if self._connections:
+                return self._connections.pop(), True
+        return self._new_connection(), False
+
+    def _put_connection(self, conn):
+        with self._lock:
+            if len(self._connections) < self.max_connections:
+                self._connections.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close all the idle connections."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def _get_headers(self, method, path, body):
+        headers = {"Connection": "keep-alive"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        if self.user:
+            token = get_heketi_jwt(
+                self.user, self.key, method, path.split("?")[0])
+            headers["Authorization"] = "bearer %s" % token
+        return headers
+
+    def _send(self, method, path, body=None):
+        """Send HTTP request reusing keep-alive connection if possible.
+
+        Returns:
+            tuple: status code, dict of lower-cased headers and body str.
+        """
+        data = json.dumps(body) if body is not None else None
+        headers = self._get_headers(method, path, body)
+        conn, is_reused = self._get_connection()
+        while True:
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                content = response.read()
+                break
+            except (http_client.HTTPException, socket.error) as e:
+                conn.close()
+                # NOTE: server may close idle keep-alive connection at any
+                # time, so retry once using new connection in such case.
+                # Other errors, like timeouts, are not retried, because
+                # request may be already processed by the server.
+                if not (is_reused and utils.is_closed_connection_error(e)):
+                    msg = "Heketi API request '%s %s' failed: %s" % (
+                        method, path, e)
+                    g.log.error(msg)
+                    raise exceptions.HeketiClientError(msg)
+                conn, is_reused = self._new_connection(), False
+        response_headers = dict(
+            (k.lower(), v) for k, v in response.getheaders())
+        if response_headers.get("connection", "").lower() == "close":
+            conn.close()
+        else:
+            self._put_connection(conn)
+        if isinstance(content, six.binary_type):
+            content = content.decode("utf-8", "replace")
+        return response.status, response_headers, content
+
+    def _raise_for_status(self, method, path, status, content):
+        msg = ("Heketi API request '%s %s' failed with '%s' status code. "
+               "Error: %s" % (method, path, status, content.strip()))
+        g.log.error(msg)
+        raise exceptions.HeketiClientError(msg, status)
+
+    @staticmethod
+    def _get_location_path(location):
+        parsed_location = urlparse.urlsplit(location)
+        if parsed_location.query:
+            return "%s?%s" % (parsed_location.path, parsed_location.query)
+        return parsed_location.path
+
+    def _wait_for_operation(self, location, timeout=None):
+        """Poll async operation until it gets finished.
+
+        Returns:
+            str: body of the operation result or None if it has no body.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        location = self._get_location_path(location)
+        while True:
+            status, headers, content = self._send("GET", location)
+            if status == 200 and headers.get("x-pending") == "true":
+                if time.time() > deadline:
+                    msg = ("Heketi operation '%s' was not finished in %s "
+                           "seconds." % (location, timeout))
+                    g.log.error(msg)
+                    raise exceptions.HeketiClientError(msg)
+                time.sleep(self.poll_interval)
+                continue
+            if status == 303:
+                location = self._get_location_path(headers["location"])
+                status, headers, content = self._send("GET", location)
+            if status == 204:
+                return None
+            if status != 200:
+                self._raise_for_status("GET", location, status, content)
+            return content
+
+    def request(self, method, path, body=None, timeout=None, raw=False):
+        """Make Heketi API request waiting for async operation if needed.
+
+        Args:
+            method (str): HTTP method.
+            path (str): URL path of the API resource, like '/volumes'.
+            body (dict): optional. Request data to be sent as JSON.
+            timeout (int): optional. Seconds to wait for async operation.
+            raw (bool): if True, then response body is returned as is,
+                otherwise it gets parsed as JSON.
+        Returns:
+            Parsed response body or None if response has no body.
+        Raises:
+            exceptions.HeketiClientError: if request fails.
+        """
+        path = self._base_path + path
+        status, headers, content = self._send(method, path, body)
+        if status == 202 and headers.get("location"):
+            content = self._wait_for_operation(headers["location"], timeout)
+        elif status == 204:
+            content = None
+        elif status not in (200, 201):
+            self._raise_for_status(method, path, status, content)
+        if raw or not content:
+            return content
+        return json.loads(content)
+
+    def hello(self):
+        return self.request("GET", "/hello", raw=True)
+
+    def metrics(self):
+        return self.request("GET", "/metrics", raw=True)
+
+    def db_check(self):
+        return self.request("GET", "/db/check")
+
+    def cluster_create(self, file=True, block=True):
+        return self.request(
+            "POST", "/clusters", {"file": file, "block": block})
+
+    def cluster_info(self, cluster_id):
+        return self.request("GET", "/clusters/%s" % cluster_id)
+
+    def cluster_list(self):
+        return self.request("GET", "/clusters")
+
+    def cluster_delete(self, cluster_id):
+        return self.request("DELETE", "/clusters/%s" % cluster_id)
+
+    def node_add(self, req):
+        return self.request("POST", "/nodes", req)
+
+    def node_info(self, node_id):
+        return self.request("GET", "/nodes/%s" % node_id)
+
+    def node_delete(self, node_id):
+        return self.request("DELETE", "/nodes/%s" % node_id)
+
+    def node_set_state(self, node_id, state):
+        return self.request(
+            "POST", "/nodes/%s/state" % node_id, {"state": state})
+
+    def device_add(self, req):
+        return self.request("POST", "/devices", req)
+
+    def device_info(self, device_id):
+        return self.request("GET", "/devices/%s" % device_id)
+
+    def device_delete(self, device_id):
+        return self.request("DELETE", "/devices/%s" % device_id)
+
+    def device_set_state(self, device_id, state):
+        return self.request(
+            "POST", "/devices/%s/state" % device_id, {"state": state})
+
+    def volume_create(self, req, timeout=None):
+        return self.request("POST", "/volumes", req, timeout=timeout)
+
+    def volume_info(self, volume_id):
+        return self.request("GET", "/volumes/%s" % volume_id)
+
+    def volume_list(self):
+        return self.request("GET", "/volumes")
+
+    def volume_expand(self, volume_id, expand_size):
+        return self.request(
+            "POST", "/volumes/%s/expand" % volume_id,
+            {"expand_size": int(expand_size)})
+
+    def volume_delete(self, volume_id):
+        return self.request("DELETE", "/volumes/%s" % volume_id)
+
+    def blockvolume_create(self, req):
+        return self.request("POST", "/blockvolumes", req)
+
+    def blockvolume_info(self, blockvolume_id):
+        return self.request("GET", "/blockvolumes/%s" % blockvolume_id)
+
+    def blockvolume_list(self):
+        return self.request("GET", "/blockvolumes")
+
+    def blockvolume_expand(self, blockvolume_id, new_size):
+        return self.request(
+            "POST", "/blockvolumes/%s/expand" % blockvolume_id,
+            {"new_size": int(new_size)})
+
+    def blockvolume_delete(self, blockvolume_id):
+        return self.request("DELETE", "/blockvolumes/%s" % blockvolume_id)
+
+    def node_list(self):
+        """Get IDs of all the nodes from all the clusters."""
+        node_ids = []
+        for cluster_id in self.cluster_list()["clusters"]:
+            node_ids.extend(self.cluster_info(cluster_id)["nodes"])
+        return node_ids
+
+    def topology_info(self):
+        """Get topology info in the format of 'heketi-cli topology info'."""
+        clusters = []
+        for cluster_id in self.cluster_list()["clusters"]:
+            cluster = self.cluster_info(cluster_id)
+            clusters.append({
+                "id": cluster_id,
+                "file": cluster.get("file"),
+                "block": cluster.get("block"),
+                "volumes": [
+                    self.volume_info(vol_id)
+                    for vol_id in cluster.get("volumes") or []],
+                "nodes": [
+                    self.node_info(node_id)
+                    for node_id in cluster.get("nodes") or []],
+            })
+        return {"clusters": clusters}
+
+
+_HEKETI_CLIENTS = {}
+_HEKETI_CLIENTS_LOCK = threading.Lock()
+
+
+def get_heketi_client(server_url, user=None, key=None):
+    """Get shared Heketi client for the server URL and credentials."""
+    client_key = (server_url, user, key)
+    with _HEKETI_CLIENTS_LOCK:
+        if client_key not in _HEKETI_CLIENTS:
+            _HEKETI_CLIENTS[client_key] = HeketiClient(
+                server_url, user, key,
+                timeout=g.config.get("common", {}).get(
+                    "heketi_command_timeout", 120))
+        return _HEKETI_CLIENTS[client_key]
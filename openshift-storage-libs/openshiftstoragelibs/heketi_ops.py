@@ -5,7 +5,10 @@ except ImportError:
     # py2
     import json
 
+import collections
+import functools
 import re
+import threading
 import time
 
 from glusto.core import Glusto as g
@@ -13,6 +16,7 @@ import six
 
 from openshiftstoragelibs import command
 from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import heketi_client
 from openshiftstoragelibs import heketi_version
 from openshiftstoragelibs.utils import parse_prometheus_data
 from openshiftstoragelibs import waiter
@@ -35,43 +39,254 @@ GET_HEKETI_PODNAME_CMD = (
 TIMEOUT_PREFIX = "timeout %s " % HEKETI_COMMAND_TIMEOUT
 
 
+def _is_heketi_route_error(error):
+    error = six.text_type(error).lower()
+    return 'connection refused' in error or 'operation timed out' in error
+
+
+class HeketiEndpointResolver(object):
+    """Cache of the way Heketi is reachable from the test nodes.
+
+    Heketi commands get run either on a client node using Heketi's external
+    URL or inside of the Heketi POD. The route which worked last time and
+    the Heketi POD name get remembered, so next commands go straight to the
+    working route instead of probing the unavailable one first.
+    The URL route gets checked again after 'heketi_route_recheck_interval'
+    seconds of using the POD route. Cache must be invalidated on Heketi DC
+    rollouts, but outdated POD name also gets refreshed lazily.
+    """
+
+    ROUTE_URL = "url"
+    ROUTE_POD = "pod"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pod_name = None
+        self._route = None
+        self._route_time = 0
+
+    @property
+    def route(self):
+        with self._lock:
+            return self._route
+
+    def _set_route(self, route):
+        with self._lock:
+            if self._route != route:
+                g.log.info("Using '%s' route for Heketi commands." % route)
+            self._route, self._route_time = route, time.time()
+
+    def _use_pod_route(self):
+        recheck_interval = g.config.get("common", {}).get(
+            "heketi_route_recheck_interval", 60)
+        with self._lock:
+            return (self._route == self.ROUTE_POD
+                    and time.time() - self._route_time < recheck_interval)
+
+    def get_pod_name(self, refresh=False):
+        """Get name of the Heketi POD.
+
+        Args:
+            refresh (bool): if True, then cached POD name gets ignored.
+        Returns:
+            str: name of the Heketi POD.
+        """
+        with self._lock:
+            if self._pod_name and not refresh:
+                return self._pod_name
+        heketi_podname = command.cmd_run(
+            cmd=GET_HEKETI_PODNAME_CMD, hostname=MASTER_NODE).strip()
+        assert heketi_podname, (
+            "Heketi POD not found on '%s' node using following "
+            "command: \n%s" % (MASTER_NODE, GET_HEKETI_PODNAME_CMD))
+        with self._lock:
+            self._pod_name = heketi_podname
+        return heketi_podname
+
+    def invalidate(self, pod_name=None):
+        """Drop cached route and Heketi POD name.
+
+        Args:
+            pod_name (str): if set, then cache gets dropped only in case
+                it contains this Heketi POD name.
+        """
+        with self._lock:
+            if pod_name is None or pod_name == self._pod_name:
+                self._pod_name, self._route = None, None
+
+    def _is_pod_gone(self, pod_name):
+        return self.get_pod_name(refresh=True) != pod_name
+
+    def run_on_pod(self, cmd, raise_on_error=True):
+        """Run command inside of the Heketi POD.
+
+        Args:
+            cmd (str): command to run. If it is 'heketi-cli' command with
+                '--server' option, then the option gets redefined to use
+                Heketi server from within the POD.
+            raise_on_error (bool): whether or not to raise exception
+                in case of an error.
+        Returns:
+            str: stripped output of the command.
+        """
+        return self._run_on_pod(cmd, raise_on_error)
+
+    def _run_on_pod(self, cmd, raise_on_error, rerun=True):
+        heketi_podname = self.get_pod_name()
+        # NOTE(vponomar): we redefine '--server' option which is provided
+        # as part of the 'cmd' var.
+        if '--server=' in cmd and 'heketi-cli' in cmd:
+            cmd_with_podname_prefix = (
+                "oc exec %s -- %s --server=http://localhost:8080" % (
+                    heketi_podname, cmd))
+        else:
+            cmd_with_podname_prefix = "oc exec %s -- %s" % (
+                heketi_podname, cmd)
+        result = command.cmd_run_with_status(
+            cmd_with_podname_prefix, MASTER_NODE)
+
+        # NOTE: cached POD name may be outdated because of POD respin, so
+        # rerun the command once using new POD name in such case.
+        if (int(result[0]) != 0 and rerun
+                and command.is_pod_not_found_error(result[2], heketi_podname)
+                and self._is_pod_gone(heketi_podname)):
+            g.log.info(
+                "Heketi POD '%s' doesn't exist anymore, rerunning the "
+                "command using new Heketi POD." % heketi_podname)
+            return self._run_on_pod(cmd, raise_on_error, rerun=False)
+        return command.check_cmd_result(
+            cmd_with_podname_prefix, MASTER_NODE, result, raise_on_error)
+
+    def run(self, hostname, cmd, pod_cmd=None, raise_on_error=True):
+        """Run command using the Heketi route which worked last time.
+
+        Args:
+            hostname (str): node to run command on using Heketi URL.
+            cmd (str): command to run on the 'hostname' node.
+            pod_cmd (str): command to run inside of the Heketi POD if the
+                URL route is not available. Defaults to 'cmd'.
+            raise_on_error (bool): whether or not to raise exception
+                in case of an error.
+        Returns:
+            str: stripped output of the command.
+        """
+        pod_cmd = pod_cmd or cmd
+        if self._use_pod_route():
+            return self.run_on_pod(pod_cmd, raise_on_error=raise_on_error)
+        try:
+            out = command.cmd_run(
+                cmd=cmd, hostname=hostname, raise_on_error=raise_on_error)
+        except Exception as e:
+            g.log.error(
+                'Failed to run "%s" command on the "%s" host. '
+                'Got following error:\n%s' % (cmd, hostname, e))
+            if not _is_heketi_route_error(e):
+                raise
+            self._set_route(self.ROUTE_POD)
+            return self.run_on_pod(pod_cmd, raise_on_error=raise_on_error)
+        self._set_route(self.ROUTE_URL)
+        return out
+
+
+HEKETI_ENDPOINT = HeketiEndpointResolver()
+
+
 def cmd_run_on_heketi_pod(cmd, raise_on_error=True):
     """Autodetect Heketi podname and run specified command on it."""
-    heketi_podname = command.cmd_run(
-        cmd=GET_HEKETI_PODNAME_CMD, hostname=MASTER_NODE).strip()
-    # NOTE(vponomar): we redefine '--server' option which is provided
-    # as part of the 'cmd' var.
-    assert heketi_podname.strip(), (
-        "Heketi POD not found on '%s' node using following command: \n%s" % (
-            MASTER_NODE, GET_HEKETI_PODNAME_CMD))
-    if '--server=' in cmd and 'heketi-cli' in cmd:
-        cmd_with_podname_prefix = (
-            "oc exec %s -- %s --server=http://localhost:8080" % (
-                heketi_podname, cmd))
-    else:
-        cmd_with_podname_prefix = "oc exec %s -- %s" % (heketi_podname, cmd)
-    result = command.cmd_run(
-        cmd=cmd_with_podname_prefix, hostname=MASTER_NODE,
-        raise_on_error=raise_on_error)
-    return result
+    return HEKETI_ENDPOINT.run_on_pod(cmd, raise_on_error=raise_on_error)
 
 
 def heketi_cmd_run(hostname, cmd, raise_on_error=True):
     """Run Heketi client command from a node backing up with Heketi pod CLI."""
-    try:
-        out = command.cmd_run(
-            cmd=cmd, hostname=hostname, raise_on_error=raise_on_error)
-    except Exception as e:
-        g.log.error(
-            'Failed to run "%s" command on the "%s" host. '
-            'Got following error:\n%s' % (cmd, hostname, e))
-        if ('connection refused' in six.text_type(e).lower()
-                or 'operation timed out' in six.text_type(e).lower()):
-            time.sleep(1)
-            out = cmd_run_on_heketi_pod(cmd, raise_on_error=raise_on_error)
-        else:
-            raise
-    return out
+    return HEKETI_ENDPOINT.run(hostname, cmd, raise_on_error=raise_on_error)
+
+
+def map_parallel(fn, ids, max_workers=None, timeout=None,
+                 raise_on_error=True):
+    """Call function for each of the IDs using several threads.
+
+    Args:
+        fn (callable): function accepting one ID, for example,
+            'lambda node_id: heketi_node_info(h_node, h_url, node_id)'.
+        ids (iterable): IDs to call the function for.
+        max_workers (int): amount of calls run at the same time. Defaults
+            to the 'heketi_max_parallel_requests' config option.
+        timeout (float): seconds all the calls have to complete within.
+            Calls which were not completed in time are treated as failed
+            with 'exceptions.ExecutionError'. None means no limit.
+        raise_on_error (bool): if True, then the failure of the first
+            failed ID gets raised after all the calls are completed.
+            Otherwise, exceptions are returned in place of results,
+            except the ones which are not 'Exception' subclasses, like
+            'SystemExit', which are raised anyway.
+    Returns:
+        list: results of the function in the order of the IDs.
+    Raises:
+        exceptions raised by the function or exceptions.ExecutionError
+        on timeout if 'raise_on_error' is True.
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    if max_workers is None:
+        max_workers = g.config.get("common", {}).get(
+            "heketi_max_parallel_requests", 8)
+    max_workers = max(min(int(max_workers), len(ids)), 1)
+    deadline = None if timeout is None else time.time() + timeout
+    pending = collections.deque(enumerate(ids))
+    results, failures, cond = {}, {}, threading.Condition()
+
+    def worker():
+        while True:
+            try:
+                index, item = pending.popleft()
+            except IndexError:
+                return
+            try:
+                result = fn(item)
+            except BaseException as e:
+                # NOTE: failure must be recorded whatever it is, otherwise
+                # the caller waits for it forever.
+                with cond:
+                    failures[index] = e
+                    cond.notify()
+            else:
+                with cond:
+                    results[index] = result
+                    cond.notify()
+
+    # NOTE: threads are daemonic, so calls which exceed timeout do not
+    # block exit, but they keep running until their commands return.
+    for _ in range(max_workers):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+
+    with cond:
+        while len(results) + len(failures) < len(ids):
+            wait_time = None if deadline is None else deadline - time.time()
+            if wait_time is not None and wait_time <= 0:
+                pending.clear()
+                break
+            cond.wait(wait_time)
+        for index, item in enumerate(ids):
+            if index not in results and index not in failures:
+                failures[index] = exceptions.ExecutionError(
+                    "Call for '%s' did not complete within %s seconds." % (
+                        item, timeout))
+        results, failures = dict(results), dict(failures)
+
+    # NOTE: failures are expected by the caller if they are not raised.
+    log = g.log.error if raise_on_error else g.log.debug
+    for index in sorted(failures):
+        log("Call for '%s' failed: %s" % (
+            ids[index], six.text_type(failures[index])))
+    for index in sorted(failures):
+        if raise_on_error or not isinstance(failures[index], Exception):
+            raise failures[index]
+    return [
+        failures[index] if index in failures else results[index]
+        for index in range(len(ids))]
 
 
 def _set_heketi_global_flags(heketi_server_url, **kwargs):
@@ -99,6 +314,81 @@ def _set_heketi_global_flags(heketi_server_url, **kwargs):
     return (heketi_server_url, json_arg, secret_arg, user_arg)
 
 
+def _get_heketi_client(heketi_server_url, **kwargs):
+    """Get Heketi REST API client if it is enabled in the config.
+
+    It gets enabled using 'heketi_use_rest_client' option of the
+    'heketi_config' config section.
+
+    Returns:
+        heketi_client.HeketiClient object or None if 'heketi-cli'
+        should be used.
+    """
+    heketi_config = g.config.get("cns", g.config.get("openshift"))[
+        "heketi_config"]
+    if not heketi_config.get("heketi_use_rest_client", False):
+        return None
+    user, key = kwargs.get("user"), kwargs.get("secret")
+    if not user:
+        user = heketi_config['heketi_cli_user']
+        key = heketi_config.get('heketi_cli_key')
+    return heketi_client.get_heketi_client(
+        heketi_server_url or (
+            "http://heketi-storage-project.cloudapps.mystorage.com"),
+        user, key)
+
+
+def _heketi_client_call(func, args=(), raise_on_error=True, output=None):
+    """Call Heketi REST API client method the way 'heketi_cmd_run' works.
+
+    Args:
+        func (callable): method of the Heketi client to be called.
+        args (tuple): arguments for the method.
+        raise_on_error (bool): whether or not to raise exception
+            in case of an error. If False, then empty string is returned.
+        output (str): if set, then it gets returned instead of
+            the method's result in case of success.
+    Returns:
+        Result of the method call or 'output' value.
+    """
+    try:
+        result = func(*args)
+    except exceptions.HeketiClientError:
+        if raise_on_error:
+            raise
+        return ""
+    return result if output is None else output
+
+
+def _get_heketi_volume_create_req(size, **kwargs):
+    """Build Heketi API volume create request like 'heketi-cli' does."""
+    req = {"size": int(size)}
+    if kwargs.get("name"):
+        req["name"] = kwargs["name"]
+    if kwargs.get("clusters"):
+        req["clusters"] = kwargs["clusters"].split(",")
+    durability = kwargs.get("durability") or "replicate"
+    req["durability"] = {"type": durability}
+    if durability == "replicate":
+        req["durability"]["replicate"] = {
+            "replica": int(kwargs.get("replica") or 3)}
+    elif durability == "disperse":
+        req["durability"]["disperse"] = {
+            "data": int(kwargs.get("disperse_data") or 4),
+            "redundancy": int(kwargs.get("redundancy") or 2)}
+    if kwargs.get("gid"):
+        req["gid"] = int(kwargs["gid"])
+    if kwargs.get("block"):
+        req["block"] = True
+    if kwargs.get("snapshot_factor"):
+        req["snapshot"] = {
+            "enable": True, "factor": float(kwargs["snapshot_factor"])}
+    if kwargs.get("gluster_volume_options"):
+        req["glustervolumeoptions"] = kwargs[
+            "gluster_volume_options"].split(",")
+    return req
+
+
 def heketi_volume_create(heketi_client_node, heketi_server_url, size,
                          timeout=None, raise_on_error=True, **kwargs):
     """Creates heketi volume with the given user options.
@@ -156,6 +446,18 @@ def heketi_volume_create(heketi_client_node, heketi_server_url, size,
         heketi_server_url if heketi_server_url else (
             "http://heketi-storage-project.cloudapps.mystorage.com"))
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and kwargs.get("json") and not (
+            kwargs.get("persistent_volume")
+            or kwargs.get("persistent_volume_endpoint")
+            or kwargs.get("persistent_volume_file")):
+        return _heketi_client_call(
+            functools.partial(
+                client.volume_create,
+                timeout=timeout or HEKETI_COMMAND_TIMEOUT),
+            (_get_heketi_volume_create_req(size, **kwargs),),
+            raise_on_error=raise_on_error)
+
     block_arg = "--block" if kwargs.get("block") else ""
     clusters_arg = ("--clusters %s" % kwargs.get("clusters")
                     if kwargs.get("clusters") else "")
@@ -245,6 +547,11 @@ def heketi_volume_info(heketi_client_node, heketi_server_url, volume_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.volume_info, (volume_id,), raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s volume info %s %s %s %s" % (
         heketi_server_url, volume_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -288,6 +595,12 @@ def heketi_volume_expand(heketi_client_node, heketi_server_url, volume_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.volume_expand, (volume_id, expand_size),
+            raise_on_error=raise_on_error)
+
     cmd = ("heketi-cli -s %s volume expand --volume=%s "
            "--expand-size=%s %s %s %s" % (
                heketi_server_url, volume_id, expand_size, json_arg,
@@ -337,6 +650,12 @@ def heketi_blockvolume_expand(heketi_client_node, heketi_server_url,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.blockvolume_expand, (blockvolume_id, new_size),
+            raise_on_error=raise_on_error)
+
     cmd = ("heketi-cli -s {} blockvolume expand {} "
            "--new-size={} {} {} {}".format(
                heketi_server_url, blockvolume_id, new_size, json_arg,
@@ -379,6 +698,12 @@ def heketi_volume_delete(heketi_client_node, heketi_server_url, volume_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.volume_delete, (volume_id,), raise_on_error=raise_on_error,
+            output="Volume %s deleted" % volume_id)
+
     cmd = "heketi-cli -s %s volume delete %s %s %s %s" % (
         heketi_server_url, volume_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -417,6 +742,11 @@ def heketi_volume_list(
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.volume_list, raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s volume list %s %s %s" % (
         heketi_server_url, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -457,6 +787,11 @@ def heketi_topology_info(
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.topology_info, raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s topology info %s %s %s" % (
         heketi_server_url, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -467,6 +802,160 @@ def heketi_topology_info(
     return out
 
 
+class HeketiTopology(object):
+    """Indexed snapshot of the Heketi topology.
+
+    Snapshot is built from the single 'heketi-cli topology info --json'
+    call and answers questions about clusters, nodes, devices, bricks,
+    volumes and zones in memory. It does not get updated, so new snapshot
+    has to be taken after changes of the topology.
+
+    Args:
+        topology_info (dict): output of the 'heketi_topology_info' function
+            called with 'json=True'.
+
+    Attributes:
+        clusters (dict): cluster IDs and cluster dicts.
+        nodes (dict): node IDs and node dicts.
+        devices (dict): device IDs and device dicts.
+        bricks (dict): brick IDs and brick dicts.
+        volumes (dict): volume IDs and volume dicts.
+        cluster_nodes (dict): cluster IDs and lists of node IDs.
+        node_devices (dict): node IDs and lists of device IDs.
+        device_node (dict): device IDs and IDs of their nodes.
+        zone_nodes (dict): zones and lists of node IDs.
+        volume_bricks (dict): volume IDs and lists of brick dicts.
+
+    Example:
+        topology = HeketiTopology.get(h_node, h_url)
+        free_space = topology.get_free_space()
+    """
+
+    def __init__(self, topology_info):
+        self.clusters, self.nodes, self.devices = {}, {}, {}
+        self.bricks, self.volumes = {}, {}
+        self.cluster_nodes, self.node_devices, self.device_node = {}, {}, {}
+        self.zone_nodes, self.volume_bricks = {}, {}
+        for cluster in topology_info["clusters"]:
+            self.clusters[cluster["id"]] = cluster
+            self.cluster_nodes[cluster["id"]] = []
+            for volume in cluster.get("volumes") or []:
+                self.volumes[volume["id"]] = volume
+                self.volume_bricks.setdefault(volume["id"], [])
+            for node in cluster.get("nodes") or []:
+                self.nodes[node["id"]] = node
+                self.cluster_nodes[cluster["id"]].append(node["id"])
+                self.zone_nodes.setdefault(node["zone"], []).append(
+                    node["id"])
+                self.node_devices[node["id"]] = []
+                for device in node.get("devices") or []:
+                    self.devices[device["id"]] = device
+                    self.node_devices[node["id"]].append(device["id"])
+                    self.device_node[device["id"]] = node["id"]
+                    for brick in device.get("bricks") or []:
+                        self.bricks[brick["id"]] = brick
+                        self.volume_bricks.setdefault(
+                            brick["volume"], []).append(brick)
+
+    @classmethod
+    def get(cls, heketi_client_node, heketi_server_url, **kwargs):
+        """Take snapshot of the Heketi topology.
+
+        Args:
+            heketi_client_node (str): Node on which cmd has to be executed.
+            heketi_server_url (str): Heketi server url
+
+        Kwargs:
+            The keys, values in kwargs are:
+                - secret : (str)|None
+                - user : (str)|None
+
+        Returns:
+            HeketiTopology: snapshot of the current topology.
+
+        Raises:
+            exceptions.ExecutionError: if command fails.
+        """
+        kwargs["json"] = True
+        return cls(heketi_topology_info(
+            heketi_client_node, heketi_server_url, **kwargs))
+
+    @staticmethod
+    def _is_online(item):
+        return item["state"].strip().lower() == "online"
+
+    def get_nodes(self, cluster_id=None, zone=None, online=False):
+        """Get node dicts filtered by cluster, zone and state.
+
+        Args:
+            cluster_id (str): ID of the cluster the nodes belong to.
+            zone (int): zone the nodes belong to.
+            online (bool): if True, then only online nodes are returned.
+        Returns:
+            list: node dicts.
+        """
+        if cluster_id is not None:
+            node_ids = self.cluster_nodes.get(cluster_id, [])
+        elif zone is not None:
+            node_ids = self.zone_nodes.get(zone, [])
+        else:
+            node_ids = self.nodes
+        return [
+            self.nodes[node_id] for node_id in node_ids
+            if (zone is None or self.nodes[node_id]["zone"] == zone)
+            and not (online and not self._is_online(self.nodes[node_id]))]
+
+    def get_devices(self, node_id, online=False):
+        """Get device dicts of the node.
+
+        Args:
+            node_id (str): ID of the node.
+            online (bool): if True, then only online devices are returned.
+        Returns:
+            list: device dicts.
+        """
+        return [
+            self.devices[device_id]
+            for device_id in self.node_devices.get(node_id, [])
+            if not (online and not self._is_online(self.devices[device_id]))]
+
+    def get_node_bricks(self, node_id):
+        """Get brick dicts of all the devices of the node."""
+        return [
+            brick for device in self.get_devices(node_id)
+            for brick in device.get("bricks") or []]
+
+    def get_device_capacity(self, online=True):
+        """Get capacity of the devices in KiB.
+
+        Args:
+            online (bool): if True, then only online devices of the online
+                nodes are taken into account.
+        Returns:
+            dict: device IDs and dicts with 'total', 'free' and 'used' keys.
+        """
+        capacity = {}
+        for node in self.get_nodes(online=online):
+            for device in self.get_devices(node["id"], online=online):
+                capacity[device["id"]] = dict(
+                    (key, device["storage"][key])
+                    for key in ("total", "free", "used"))
+        return capacity
+
+    def get_free_space(self):
+        """Get free space of the online devices of the online nodes.
+
+        Returns:
+            tuple: total free space in GiB and amount of online nodes.
+        """
+        free_spaces = [
+            sum(device["storage"]["free"]
+                for device in self.get_devices(node["id"], online=True))
+            / 1024 ** 2
+            for node in self.get_nodes(online=True)]
+        return int(sum(free_spaces)), len(free_spaces)
+
+
 def hello_heketi(heketi_client_node, heketi_server_url, **kwargs):
     """Executes curl command to check if heketi server is alive.
 
@@ -492,21 +981,16 @@ def hello_heketi(heketi_client_node, heketi_server_url, **kwargs):
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        client.hello()
+        return True
+
     cmd = "curl --max-time 10 %s/hello" % heketi_server_url
 
-    try:
-        command.cmd_run(cmd=cmd, hostname=heketi_client_node)
-    except Exception as e:
-        g.log.error(
-            'Failed to run "%s" command on the "%s" host. '
-            'Got following error:\n%s' % (cmd, heketi_client_node, e))
-        if ('connection refused' in six.text_type(e).lower()
-                or 'operation timed out' in six.text_type(e).lower()):
-            time.sleep(1)
-            cmd_run_on_heketi_pod(
-                "curl --max-time 10 http://localhost:8080/hello")
-        else:
-            raise
+    HEKETI_ENDPOINT.run(
+        heketi_client_node, cmd,
+        pod_cmd="curl --max-time 10 http://localhost:8080/hello")
     return True
 
 
@@ -542,6 +1026,13 @@ def heketi_cluster_create(
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.cluster_create,
+            (kwargs.get("file", True), kwargs.get("block", True)),
+            raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s cluster create %s %s %s" % (
         heketi_server_url, json_arg, admin_key, user)
 
@@ -589,6 +1080,13 @@ def heketi_cluster_delete(heketi_client_node, heketi_server_url, cluster_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.cluster_delete, (cluster_id,),
+            raise_on_error=raise_on_error,
+            output="Cluster %s deleted" % cluster_id)
+
     cmd = "heketi-cli -s %s cluster delete %s %s %s %s" % (
         heketi_server_url, cluster_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -628,6 +1126,11 @@ def heketi_cluster_info(heketi_client_node, heketi_server_url, cluster_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.cluster_info, (cluster_id,), raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s cluster info %s %s %s %s" % (
         heketi_server_url, cluster_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -668,6 +1171,11 @@ def heketi_cluster_list(
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.cluster_list, raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s cluster list %s %s %s" % (
         heketi_server_url, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -709,6 +1217,13 @@ def heketi_device_add(heketi_client_node, heketi_server_url, device_name,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.device_add, ({"name": device_name, "node": node_id},),
+            raise_on_error=raise_on_error,
+            output="Device added successfully")
+
     cmd = "heketi-cli -s %s device add --name=%s --node=%s %s %s %s" % (
         heketi_server_url, device_name, node_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -747,6 +1262,12 @@ def heketi_device_delete(heketi_client_node, heketi_server_url, device_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.device_delete, (device_id,), raise_on_error=raise_on_error,
+            output="Device %s deleted" % device_id)
+
     cmd = "heketi-cli -s %s device delete %s %s %s %s" % (
         heketi_server_url, device_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -784,6 +1305,13 @@ def heketi_device_disable(heketi_client_node, heketi_server_url, device_id,
 
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
+
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.device_set_state, (device_id, "offline"),
+            raise_on_error=raise_on_error,
+            output="Device %s is now offline" % device_id)
     cmd = "heketi-cli -s %s device disable %s %s %s %s" % (
         heketi_server_url, device_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -821,6 +1349,13 @@ def heketi_device_enable(heketi_client_node, heketi_server_url, device_id,
 
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
+
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.device_set_state, (device_id, "online"),
+            raise_on_error=raise_on_error,
+            output="Device %s is now online" % device_id)
     cmd = "heketi-cli -s %s device enable %s %s %s %s" % (
         heketi_server_url, device_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -860,6 +1395,11 @@ def heketi_device_info(heketi_client_node, heketi_server_url, device_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.device_info, (device_id,), raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s device info %s %s %s %s" % (
         heketi_server_url, device_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -901,6 +1441,13 @@ def heketi_device_remove(heketi_client_node, heketi_server_url, device_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.device_set_state, (device_id, "failed"),
+            raise_on_error=raise_on_error,
+            output="Device %s is now removed" % device_id)
+
     cmd = "heketi-cli -s %s device remove %s %s %s %s" % (
         heketi_server_url, device_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -947,6 +1494,19 @@ def heketi_node_add(
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        req = {
+            "zone": int(zone),
+            "cluster": cluster_id,
+            "hostnames": {
+                "manage": [management_host_name],
+                "storage": [storage_host_name],
+            },
+        }
+        return _heketi_client_call(
+            client.node_add, (req,), raise_on_error=raise_on_error)
+
     cmd = (
         "heketi-cli -s %s node add %s %s %s "
         "--zone=%d --cluster=%s --management-host-name=%s "
@@ -992,6 +1552,12 @@ def heketi_node_delete(heketi_client_node, heketi_server_url, node_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.node_delete, (node_id,), raise_on_error=raise_on_error,
+            output="Node %s deleted" % node_id)
+
     cmd = "heketi-cli -s %s node delete %s %s %s %s" % (
         heketi_server_url, node_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1029,6 +1595,13 @@ def heketi_node_remove(heketi_client_node, heketi_server_url, node_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.node_set_state, (node_id, "failed"),
+            raise_on_error=raise_on_error,
+            output="Node %s is now removed" % node_id)
+
     cmd = "heketi-cli -s %s node remove %s %s %s" % (
         heketi_server_url, node_id, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1067,6 +1640,13 @@ def heketi_node_disable(heketi_client_node, heketi_server_url, node_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.node_set_state, (node_id, "offline"),
+            raise_on_error=raise_on_error,
+            output="Node %s is now offline" % node_id)
+
     cmd = "heketi-cli -s %s node disable %s %s %s %s" % (
         heketi_server_url, node_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1105,6 +1685,13 @@ def heketi_node_enable(heketi_client_node, heketi_server_url, node_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.node_set_state, (node_id, "online"),
+            raise_on_error=raise_on_error,
+            output="Node %s is now online" % node_id)
+
     cmd = "heketi-cli -s %s node enable %s %s %s %s" % (
         heketi_server_url, node_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1144,6 +1731,11 @@ def heketi_node_info(heketi_client_node, heketi_server_url, node_id,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.node_info, (node_id,), raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s node info %s %s %s %s" % (
         heketi_server_url, node_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1178,6 +1770,11 @@ def heketi_node_list(heketi_client_node, heketi_server_url,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.node_list, raise_on_error=raise_on_error) or []
+
     cmd = "heketi-cli -s %s node list %s %s %s" % (
         heketi_server_url, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1191,6 +1788,129 @@ def heketi_node_list(heketi_client_node, heketi_server_url,
     return heketi_node_id_list
 
 
+def heketi_node_info_list(
+        heketi_client_node, heketi_server_url, node_ids=None, **kwargs):
+    """Get info of several Heketi nodes running the requests in parallel.
+
+    Args:
+        heketi_client_node (str): Node on which cmd has to be executed.
+        heketi_server_url (str): Heketi server url
+        node_ids (list): IDs of the nodes. All the nodes by default.
+
+    Kwargs:
+        The keys, values in kwargs are:
+            - secret : (str)|None
+            - user : (str)|None
+
+    Returns:
+        list: node info dicts in the order of the node IDs.
+
+    Raises:
+        exceptions.ExecutionError: if command fails.
+    """
+    kwargs.pop("json", None)
+    if node_ids is None:
+        node_ids = heketi_node_list(
+            heketi_client_node, heketi_server_url, **kwargs)
+    return map_parallel(
+        lambda node_id: heketi_node_info(
+            heketi_client_node, heketi_server_url, node_id, json=True,
+            **kwargs),
+        node_ids)
+
+
+def heketi_device_info_list(
+        heketi_client_node, heketi_server_url, device_ids, **kwargs):
+    """Get info of several Heketi devices running the requests in parallel.
+
+    Args:
+        heketi_client_node (str): Node on which cmd has to be executed.
+        heketi_server_url (str): Heketi server url
+        device_ids (list): IDs of the devices.
+
+    Kwargs:
+        The keys, values in kwargs are:
+            - secret : (str)|None
+            - user : (str)|None
+
+    Returns:
+        list: device info dicts in the order of the device IDs.
+
+    Raises:
+        exceptions.ExecutionError: if command fails.
+    """
+    kwargs.pop("json", None)
+    return map_parallel(
+        lambda device_id: heketi_device_info(
+            heketi_client_node, heketi_server_url, device_id, json=True,
+            **kwargs),
+        device_ids)
+
+
+def heketi_node_set_state_list(
+        heketi_client_node, heketi_server_url, node_ids, enable,
+        raise_on_error=True, **kwargs):
+    """Enable or disable several Heketi nodes in parallel.
+
+    Args:
+        heketi_client_node (str): Node on which cmd has to be executed.
+        heketi_server_url (str): Heketi server url
+        node_ids (list): IDs of the nodes.
+        enable (bool): if True, then nodes get enabled, else disabled.
+        raise_on_error (bool): whether or not to raise exception
+            in case of an error.
+
+    Kwargs:
+        The keys, values in kwargs are:
+            - secret : (str)|None
+            - user : (str)|None
+
+    Returns:
+        list: outputs of the commands in the order of the node IDs.
+
+    Raises:
+        exceptions.ExecutionError: if command fails.
+    """
+    func = heketi_node_enable if enable else heketi_node_disable
+    return map_parallel(
+        lambda node_id: func(
+            heketi_client_node, heketi_server_url, node_id,
+            raise_on_error=raise_on_error, **kwargs),
+        node_ids, raise_on_error=raise_on_error)
+
+
+def heketi_device_set_state_list(
+        heketi_client_node, heketi_server_url, device_ids, enable,
+        raise_on_error=True, **kwargs):
+    """Enable or disable several Heketi devices in parallel.
+
+    Args:
+        heketi_client_node (str): Node on which cmd has to be executed.
+        heketi_server_url (str): Heketi server url
+        device_ids (list): IDs of the devices.
+        enable (bool): if True, then devices get enabled, else disabled.
+        raise_on_error (bool): whether or not to raise exception
+            in case of an error.
+
+    Kwargs:
+        The keys, values in kwargs are:
+            - secret : (str)|None
+            - user : (str)|None
+
+    Returns:
+        list: outputs of the commands in the order of the device IDs.
+
+    Raises:
+        exceptions.ExecutionError: if command fails.
+    """
+    func = heketi_device_enable if enable else heketi_device_disable
+    return map_parallel(
+        lambda device_id: func(
+            heketi_client_node, heketi_server_url, device_id,
+            raise_on_error=raise_on_error, **kwargs),
+        device_ids, raise_on_error=raise_on_error)
+
+
 def heketi_blockvolume_info(heketi_client_node, heketi_server_url,
                             block_volume_id, raise_on_error=True, **kwargs):
     """Executes heketi blockvolume info command.
@@ -1222,6 +1942,12 @@ def heketi_blockvolume_info(heketi_client_node, heketi_server_url,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.blockvolume_info, (block_volume_id,),
+            raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s blockvolume info %s %s %s %s" % (
         heketi_server_url, block_volume_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1292,6 +2018,18 @@ def heketi_blockvolume_create(heketi_client_node, heketi_server_url, size,
     if name is not None:
         name_arg = "--name %s" % name
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        req = {"size": int(size), "auth": bool(auth)}
+        if clusters is not None:
+            req["clusters"] = clusters.split(",")
+        if ha is not None:
+            req["hacount"] = ha
+        if name is not None:
+            req["name"] = name
+        return _heketi_client_call(
+            client.blockvolume_create, (req,), raise_on_error=raise_on_error)
+
     cmd = ("heketi-cli -s %s blockvolume create --size=%s %s %s %s %s "
            "%s %s %s" % (heketi_server_url, str(size), auth_arg,
                          clusters_arg, ha_arg, name_arg,
@@ -1335,6 +2073,13 @@ def heketi_blockvolume_delete(heketi_client_node, heketi_server_url,
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client:
+        return _heketi_client_call(
+            client.blockvolume_delete, (block_volume_id,),
+            raise_on_error=raise_on_error,
+            output="Volume %s deleted" % block_volume_id)
+
     cmd = "heketi-cli -s %s blockvolume delete %s %s %s %s" % (
         heketi_server_url, block_volume_id, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1374,6 +2119,11 @@ def heketi_blockvolume_list(
     heketi_server_url, json_arg, admin_key, user = _set_heketi_global_flags(
         heketi_server_url, **kwargs)
 
+    client = _get_heketi_client(heketi_server_url, **kwargs)
+    if client and json_arg:
+        return _heketi_client_call(
+            client.blockvolume_list, raise_on_error=raise_on_error)
+
     cmd = "heketi-cli -s %s blockvolume list %s %s %s" % (
         heketi_server_url, json_arg, admin_key, user)
     cmd = TIMEOUT_PREFIX + cmd
@@ -1654,21 +2404,14 @@ def get_heketi_metrics(heketi_client_node, heketi_server_url,
         g.log.error(msg)
         raise NotImplementedError(msg)
 
-    cmd = "curl --max-time 10 %s/metrics" % heketi_server_url
-
-    try:
-        out = command.cmd_run(cmd=cmd, hostname=heketi_client_node)
-    except Exception as e:
-        g.log.error(
-            'Failed to run "%s" command on the "%s" host. '
-            'Got following error:\n%s' % (cmd, heketi_client_node, e))
-        if ('connection refused' in six.text_type(e).lower()
-                or 'operation timed out' in six.text_type(e).lower()):
-            time.sleep(1)
-            out = cmd_run_on_heketi_pod(
-                "curl --max-time 10 http://localhost:8080/metrics")
-        else:
-            raise
+    client = _get_heketi_client(heketi_server_url)
+    if client:
+        out = client.metrics()
+    else:
+        cmd = "curl --max-time 10 %s/metrics" % heketi_server_url
+        out = HEKETI_ENDPOINT.run(
+            heketi_client_node, cmd,
+            pod_cmd="curl --max-time 10 http://localhost:8080/metrics")
 
     if prometheus_format:
         return out.strip()
@@ -1745,34 +2488,24 @@ def get_block_hosting_volume_list(
     return bhv
 
 
-def get_total_free_space(heketi_client_node, heketi_server_url):
+def get_total_free_space(heketi_client_node, heketi_server_url,
+                         topology=None):
     """
     Calculates free space across devices which are online
     and skips the ones which are offline.
     Args:
         - heketi_client_node (str): Node where we want to run our commands.
         - heketi_server_url (str): This is a heketi server url.
+        - topology (HeketiTopology): snapshot of the topology to be used
+            instead of getting the new one.
 
     Returns:
         tuple : tuple of total free space and number of nodes, if successful
 
     """
-    device_free_spaces = []
-    heketi_node_id_list = heketi_node_list(
+    topology = topology or HeketiTopology.get(
         heketi_client_node, heketi_server_url)
-    for node_id in heketi_node_id_list:
-        total_device_free_space = 0
-        node_info_dict = heketi_node_info(
-            heketi_client_node, heketi_server_url,
-            node_id, json=True)
-        if (node_info_dict["state"].strip().lower() != "online"):
-            continue
-        for device in node_info_dict["devices"]:
-            if (device["state"].strip().lower() != "online"):
-                continue
-            total_device_free_space += (device["storage"]["free"])
-        device_free_spaces.append(total_device_free_space / 1024 ** 2)
-    return int(sum(device_free_spaces)), len(device_free_spaces)
+    return topology.get_free_space()
 
 
 def heketi_server_operations_list(
@@ -1978,13 +2711,11 @@ def get_heketi_volume_and_brick_count_list(
         AssertionError: if command fails.
 
     """
-    topology_info = heketi_topology_info(
-        heketi_client_node, heketi_server_url, json=True, **kwargs)
-    volume_name_brick_count = []
-    for c in topology_info['clusters']:
-        volume_name_brick_count = [
-            (v['name'], len(v['bricks'])) for v in c['volumes']]
-    return volume_name_brick_count
+    topology = HeketiTopology.get(
+        heketi_client_node, heketi_server_url, **kwargs)
+    return [
+        (volume['name'], len(volume['bricks']))
+        for volume in topology.volumes.values()]
 
 
 def get_vol_file_servers_and_hosts(
@@ -2023,13 +2754,16 @@ def get_vol_file_servers_and_hosts(
 
 
 def get_bricks_on_heketi_node(
-        heketi_client_node, heketi_server_url, node_id, **kwargs):
+        heketi_client_node, heketi_server_url, node_id, topology=None,
+        **kwargs):
     """Get bricks on heketi node.
 
     Args:
         heketi_client_node (str): Node on which cmd has to be executed.
         heketi_server_url (str): Heketi server url
         node_id (str): Node ID
+        topology (HeketiTopology): snapshot of the topology to be used
+            instead of getting the new one.
 
     Kwargs:
         The keys, values in kwargs are:
@@ -2046,18 +2780,16 @@ def get_bricks_on_heketi_node(
     if 'json' in kwargs:
         raise AssertionError("json is not expected parameter")
 
-    kwargs['json'] = True
-
-    node_info = heketi_node_info(
-        heketi_client_node, heketi_server_url, node_id, **kwargs)
+    topology = topology or HeketiTopology.get(
+        heketi_client_node, heketi_server_url, **kwargs)
 
-    if len(node_info['devices']) < 1:
-        raise AssertionError("No device found on node %s" % node_info)
+    if node_id not in topology.nodes:
+        raise AssertionError("Node %s not found in topology" % node_id)
+    if not topology.node_devices[node_id]:
+        raise AssertionError(
+            "No device found on node %s" % topology.nodes[node_id])
 
-    bricks = []
-    for device in node_info['devices']:
-        bricks += device['bricks']
-    return bricks
+    return topology.get_node_bricks(node_id)
 
 
 def heketi_volume_list_by_name_prefix(
@@ -2092,7 +2824,8 @@ def heketi_volume_list_by_name_prefix(
 
 
 def validate_dev_path_vg_and_uuid(
-        heketi_client_node, heketi_server_url, hostname, device_id):
+        heketi_client_node, heketi_server_url, hostname, device_id,
+        topology=None):
     """Validate dev_path between node and heketi
 
     Args:
@@ -2100,14 +2833,19 @@ def validate_dev_path_vg_and_uuid(
         heketi_server_url (str): Heketi server url.
         hostname (str): Hostname of the node to which device is attached.
         device_id (str): Device id to match the uuid and vg with node.
+        topology (HeketiTopology): snapshot of the topology to be used
+            instead of getting the new one.
 
     Returns:
         bool: True if uuid and vg entry in heketi matches the actual values
               else False
     """
     # Get dev_name, vg and uuid from heketi
-    dev_info = heketi_device_info(
-        heketi_client_node, heketi_server_url, device_id, json=True)
+    topology = topology or HeketiTopology.get(
+        heketi_client_node, heketi_server_url)
+    assert device_id in topology.devices, (
+        "Device %s not found in topology" % device_id)
+    dev_info = topology.devices[device_id]
     dev_name, h_uuid = dev_info["name"], dev_info["pv_uuid"]
     bricks = dev_info["bricks"]
     if bricks:
@@ -0,0 +1,697 @@
+"""Client for the Kubernetes/OpenShift API server.
+
+It is an alternative backend for some of the 'openshift_ops' functions.
+Instead of running 'oc' commands on the OCP client node and parsing their
+output, API server gets requested directly from the test runner using
+pooled keep-alive HTTPS connections. Credentials get taken from the
+kubeconfig of the OCP client node ('oc config view --raw') or from the local
+kubeconfig file set using 'kube_api_kubeconfig' config option.
+
+The backend gets enabled by setting 'ocp_api_backend' option of the 'common'
+config section to 'api'. Functions of 'openshift_ops' fall back to 'oc'
+commands for unsupported cases and when API server is not reachable.
+"""
+
+import base64
+import datetime
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import os
+import re
+import shlex
+import socket
+import ssl
+import tempfile
+import threading
+
+from glusto.core import Glusto as g
+import six
+from six.moves import http_client
+from six.moves.urllib import parse as urlparse
+import yaml
+
+from openshiftstoragelibs import command
+from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import utils
+
+
+# NOTE: resource aliases known by 'oc' mapped to the API group version,
+# plural resource name, kind and whether the resource is namespaced.
+RESOURCES = {}
+_RESOURCE_DEFINITIONS = (
+    ("v1", "pods", "Pod", True, ("po", "pod")),
+    ("v1", "persistentvolumeclaims", "PersistentVolumeClaim", True,
+     ("pvc", "persistentvolumeclaim")),
+    ("v1", "persistentvolumes", "PersistentVolume", False,
+     ("pv", "persistentvolume")),
+    ("v1", "services", "Service", True, ("svc", "service")),
+    ("v1", "endpoints", "Endpoints", True, ("ep",)),
+    ("v1", "events", "Event", True, ("ev", "event")),
+    ("v1", "secrets", "Secret", True, ("secret",)),
+    ("v1", "configmaps", "ConfigMap", True, ("cm", "configmap")),
+    ("v1", "serviceaccounts", "ServiceAccount", True,
+     ("sa", "serviceaccount")),
+    ("v1", "replicationcontrollers", "ReplicationController", True,
+     ("rc", "replicationcontroller")),
+    ("v1", "nodes", "Node", False, ("no", "node")),
+    ("v1", "namespaces", "Namespace", False, ("ns", "namespace")),
+    ("apps/v1", "daemonsets", "DaemonSet", True, ("ds", "daemonset")),
+    ("apps/v1", "deployments", "Deployment", True,
+     ("deploy", "deployment")),
+    ("apps/v1", "replicasets", "ReplicaSet", True, ("rs", "replicaset")),
+    ("apps/v1", "statefulsets", "StatefulSet", True,
+     ("sts", "statefulset")),
+    ("batch/v1", "jobs", "Job", True, ("job",)),
+    ("storage.k8s.io/v1", "storageclasses", "StorageClass", False,
+     ("sc", "storageclass")),
+    ("apps.openshift.io/v1", "deploymentconfigs", "DeploymentConfig", True,
+     ("dc", "deploymentconfig")),
+    ("route.openshift.io/v1", "routes", "Route", True, ("route",)),
+    ("template.openshift.io/v1", "templates", "Template", True,
+     ("template",)),
+    ("project.openshift.io/v1", "projects", "Project", False,
+     ("project",)),
+)
+for _api_version, _plural, _kind, _namespaced, _aliases in (
+        _RESOURCE_DEFINITIONS):
+    for _alias in (_plural, _kind.lower()) + _aliases:
+        RESOURCES[_alias] = {
+            "api_version": _api_version,
+            "plural": _plural,
+            "kind": _kind,
+            "namespaced": _namespaced,
+        }
+del _api_version, _plural, _kind, _namespaced, _aliases, _alias
+KINDS = dict((r["kind"], r) for r in RESOURCES.values())
+
+
+def get_resource(rtype):
+    """Get API info of the resource type using any of the 'oc' aliases.
+
+    Args:
+        rtype (str): resource type like 'pod', 'pvc' or 'storageClass'.
+    Returns:
+        dict: resource info or None if the resource type is unknown.
+    """
+    return RESOURCES.get(rtype.strip().lower())
+
+
+_PATH_TOKEN_RE = re.compile(
+    r"""\.|\[([^\]]*)\]|"((?:[^"\\]|\\.)*)"|'((?:[^'\\]|\\.)*)'"""
+    r"""|((?:[^.\["'\\]|\\.)+)""")
+_FILTER_RE = re.compile(
+    r"""^\?\(@\.([\w.]+)\s*(==|!=)\s*["']?([^"')]*)["']?\)$""")
+_UNESCAPE_RE = re.compile(r"\\(.)")
+
+
+def _parse_path(path):
+    path = path.strip()
+    if path.startswith("{") and path.endswith("}"):
+        path = path[1:-1]
+    steps = []
+    for match in _PATH_TOKEN_RE.finditer(path):
+        index, dq_key, sq_key, key = match.groups()
+        if index is not None:
+            steps.append(("index", index.strip()))
+        elif dq_key is not None or sq_key is not None:
+            steps.append(("key", _UNESCAPE_RE.sub(
+                r"\1", dq_key if dq_key is not None else sq_key)))
+        elif key is not None:
+            steps.append(("key", _UNESCAPE_RE.sub(r"\1", key)))
+    return steps
+
+
+def _get_by_dotted_key(obj, dotted_key):
+    for key in dotted_key.split("."):
+        if not isinstance(obj, dict) or key not in obj:
+            return None
+        obj = obj[key]
+    return obj
+
+
+def _apply_step(values, step):
+    step_type, arg = step
+    result = []
+    for value in values:
+        if step_type == "key":
+            if isinstance(value, dict) and arg in value:
+                result.append(value[arg])
+        elif not isinstance(value, list):
+            continue
+        elif arg == "*":
+            result.extend(value)
+        elif arg.lstrip("-").isdigit():
+            if -len(value) <= int(arg) < len(value):
+                result.append(value[int(arg)])
+        else:
+            match = _FILTER_RE.match(arg)
+            if not match:
+                raise exceptions.NotSupportedException(
+                    "JSONPath filter '%s' is not supported." % arg)
+            key, operator, expected = match.groups()
+            for item in value:
+                actual = _get_by_dotted_key(item, key)
+                actual = _format_value(actual) if actual is not None else None
+                if (actual == expected) == (operator == "=="):
+                    result.append(item)
+    return result
+
+
+def _format_value(value):
+    """Format value the way Go's '%v' verb used by 'oc' does."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return "[%s]" % " ".join(_format_value(v) for v in value)
+    if isinstance(value, dict):
+        return "map[%s]" % " ".join(
+            "%s:%s" % (k, _format_value(value[k])) for k in sorted(value))
+    if value is None:
+        return "<nil>"
+    return six.text_type(value)
+
+
+def get_json_path_value(obj, path):
+    """Get value of the object field like 'oc -o custom-columns' does.
+
+    Args:
+        obj (dict): API object.
+        path (str): relaxed JSONPath expression like '.metadata.name',
+            '.spec.volumes[*].name' or '.status.conditions[?(@.type=="X")]'.
+    Returns:
+        str: field value, comma-separated values in case of multiple
+            matches or '<none>' if the field is absent.
+    """
+    values = [obj]
+    for step in _parse_path(path):
+        values = _apply_step(values, step)
+    values = [v for v in values if v is not None]
+    if not values:
+        return "<none>"
+    return ",".join(_format_value(v) for v in values)
+
+
+def parse_custom_columns(custom):
+    """Get JSONPath expressions of the 'oc' custom columns definition.
+
+    Args:
+        custom (str|list): custom columns like ':.metadata.name,:.spec.x'.
+    Returns:
+        list: JSONPath expressions of the columns.
+    """
+    custom = ",".join(custom) if isinstance(custom, list) else custom
+    # NOTE: columns are usually defined for being passed via shell,
+    # so remove shell quoting first.
+    custom = " ".join(shlex.split(custom))
+    paths = []
+    for column in re.split(r",(?![^\[]*\])", custom):
+        if not column.strip():
+            continue
+        paths.append(column.split(":", 1)[1] if ":" in column else column)
+    return paths
+
+
+def _human_duration(seconds):
+    seconds = max(int(seconds), 0)
+    minutes, hours = seconds // 60, seconds // 3600
+    if seconds < 120:
+        return "%ds" % seconds
+    elif minutes < 10:
+        return ("%dm%ds" % (minutes, seconds % 60) if seconds % 60
+                else "%dm" % minutes)
+    elif minutes < 180:
+        return "%dm" % minutes
+    elif hours < 8:
+        return ("%dh%dm" % (hours, minutes % 60) if minutes % 60
+                else "%dh" % hours)
+    elif hours < 48:
+        return "%dh" % hours
+    elif hours < 24 * 8:
+        return ("%dd%dh" % (hours // 24, hours % 24) if hours % 24
+                else "%dd" % (hours // 24))
+    elif hours < 24 * 365 * 2:
+        return "%dd" % (hours // 24)
+    elif hours < 24 * 365 * 8:
+        return "%dy%dd" % (hours // 24 // 365, hours // 24 % 365)
+    return "%dy" % (hours // 24 // 365)
+
+
+def get_pod_wide_info(pod, now=None):
+    """Get POD info the way 'oc get pods -o wide' calculates it.
+
+    Args:
+        pod (dict): POD API object.
+        now (datetime.datetime): optional. UTC time to calculate age.
+    Returns:
+        dict: 'ready', 'status', 'restarts', 'age', 'ip' and 'node' keys.
+    """
+    spec, status = pod.get("spec", {}), pod.get("status", {})
+    reason = status.get("reason") or status.get("phase") or "Unknown"
+    ready, restarts = 0, 0
+    for cs in status.get("containerStatuses") or []:
+        restarts += cs.get("restartCount", 0)
+        state = cs.get("state", {})
+        if state.get("waiting", {}).get("reason"):
+            reason = state["waiting"]["reason"]
+        elif state.get("terminated", {}).get("reason"):
+            reason = state["terminated"]["reason"]
+        elif "terminated" in state:
+            terminated = state["terminated"]
+            reason = ("Signal:%s" % terminated["signal"]
+                      if terminated.get("signal")
+                      else "ExitCode:%s" % terminated.get("exitCode"))
+        elif cs.get("ready") and "running" in state:
+            ready += 1
+    if pod.get("metadata", {}).get("deletionTimestamp"):
+        reason = ("Unknown" if status.get("reason") == "NodeLost"
+                  else "Terminating")
+
+    now = now or datetime.datetime.utcnow()
+    created = pod.get("metadata", {}).get("creationTimestamp")
+    age = "<unknown>"
+    if created:
+        created = datetime.datetime.strptime(created, "%Y-%m-%dT%H:%M:%SZ")
+        age = _human_duration((now - created).total_seconds())
+    return {
+        "ready": "%d/%d" % (ready, len(spec.get("containers") or [])),
+        "status": reason,
+        "restarts": six.text_type(restarts),
+        "age": age,
+        "ip": status.get("podIP") or "<none>",
+        "node": spec.get("nodeName") or "<none>",
+    }
+
+
+class KubeAPIClient(object):
+    """Thread-safe client for the Kubernetes API server.
+
+    Args:
+        server (str): API server URL like 'https://master:8443'.
+        token (str): bearer token. Optional if client cert is used.
+        namespace (str): default namespace for namespaced resources.
+        ca_data (bytes): optional. PEM encoded CA certificates.
+        insecure (bool): if True, then server cert doesn't get verified.
+        cert_file (str): optional. Path to the client cert file.
+        key_file (str): optional. Path to the client key file.
+        timeout (int): seconds to wait for each of the requests.
+        max_connections (int): amount of idle keep-alive connections
+            to be kept for reuse.
+    """
+
+    def __init__(self, server, token=None, namespace="default",
+                 ca_data=None, insecure=False, cert_file=None,
+                 key_file=None, timeout=60, max_connections=8):
+        parsed_url = urlparse.urlsplit(server)
+        self.server = server
+        self.token = token
+        self.namespace = namespace
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._scheme = parsed_url.scheme
+        self._netloc = parsed_url.netloc
+        self._base_path = parsed_url.path.rstrip("/")
+        self._ssl_context = None
+        if self._scheme == "https":
+            if insecure:
+                self._ssl_context = ssl._create_unverified_context()
+            else:
+                self._ssl_context = ssl.create_default_context(
+                    cadata=ca_data.decode("ascii") if ca_data else None)
+            if cert_file:
+                self._ssl_context.load_cert_chain(cert_file, key_file)
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _new_connection(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        if self._scheme == "https":
+            return http_client.HTTPSConnection(
+                self._netloc, timeout=timeout, context=self._ssl_context)
+        return http_client.HTTPConnection(self._netloc, timeout=timeout)
+
+    def _get_connection(self):
+        with self._lock:
+            if self._connections:
+                return self._connections.pop(), True
+        return self._new_connection(), False
+
+    def _put_connection(self, conn):
+        with self._lock:
+            if len(self._connections) < self.max_connections:
+                self._connections.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close all the idle connections."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def request(self, method, path, body=None, params=None,
+                content_type="application/json"):
+        """Make API request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): URL path like '/api/v1/namespaces/x/pods'.
+            body (dict): optional. Request data to be sent as JSON.
+            params (dict): optional. Query parameters.
+            content_type (str): content type of the request body.
+        Returns:
+            dict: parsed response body.
+        Raises:
+            exceptions.KubeAPIError: if request fails.
+        """
+        path = self._base_path + path
+        query = urlparse.urlencode(dict(
+            (k, v) for k, v in (params or {}).items() if v is not None))
+        if query:
+            path += "?" + query
+        data = json.dumps(body) if body is not None else None
+        headers = {"Accept": "application/json", "Connection": "keep-alive"}
+        if data is not None:
+            headers["Content-Type"] = content_type
+        if self.token:
+            headers["Authorization"] = "Bearer %s" % self.token
+        conn, is_reused = self._get_connection()
+        while True:
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                content = response.read()
+                break
+            except (http_client.HTTPException, socket.error) as e:
+                conn.close()
+                # NOTE: server may close idle keep-alive connection at any
+                # time, so retry once using new connection in such case.
+                # Other errors, like timeouts, are not retried, because
+                # request may be already processed by the server.
+                if not (is_reused and utils.is_closed_connection_error(e)):
+                    msg = "API request '%s %s' failed: %s" % (
+                        method, path, e)
+                    g.log.error(msg)
+                    raise exceptions.KubeAPIError(msg)
+                conn, is_reused = self._new_connection(), False
+        if (response.getheader("connection") or "").lower() == "close":
+            conn.close()
+        else:
+            self._put_connection(conn)
+        if isinstance(content, six.binary_type):
+            content = content.decode("utf-8", "replace")
+        if response.status >= 300:
+            try:
+                message = json.loads(content).get("message", content)
+            except ValueError:
+                message = content
+            msg = "API request '%s %s' failed with '%s' status code: %s" % (
+                method, path, response.status, message)
+            g.log.error(msg)
+            raise exceptions.KubeAPIError(msg, response.status)
+        return json.loads(content) if content else {}
+
+    def get_path(self, resource, name=None, namespace=None):
+        """Get URL path of the resource collection or object."""
+        group_version = resource["api_version"]
+        path = ("/api/%s" % group_version if "/" not in group_version
+                else "/apis/%s" % group_version)
+        if resource["namespaced"]:
+            path += "/namespaces/%s" % (namespace or self.namespace)
+        path += "/%s" % resource["plural"]
+        if name:
+            path += "/%s" % name
+        return path
+
+    def get(self, resource, name=None, selector=None, field_selector=None,
+            namespace=None):
+        """Get API object or list of objects.
+
+        Returns:
+            dict: API object if 'name' is set. Otherwise, object of the
+                'List' kind with 'items' the same way as 'oc get' returns.
+        """
+        path = self.get_path(resource, name, namespace)
+        if name:
+            return self.request("GET", path)
+        data = self.request("GET", path, params={
+            "labelSelector": selector, "fieldSelector": field_selector})
+        items = data.get("items") or []
+        for item in items:
+            item.setdefault("apiVersion", resource["api_version"])
+            item.setdefault("kind", resource["kind"])
+        return {
+            "apiVersion": "v1",
+            "kind": "List",
+            "items": items,
+            "metadata": {
+                "resourceVersion": data.get("metadata", {}).get(
+                    "resourceVersion", ""),
+                "selfLink": "",
+            },
+        }
+
+    def create(self, obj, namespace=None):
+        """Create API object or all the items of the 'List' object."""
+        if obj.get("kind") == "List":
+            return [self.create(item, namespace) for item in obj["items"]]
+        resource = KINDS.get(obj.get("kind"))
+        if resource is None:
+            raise exceptions.NotSupportedException(
+                "Kind '%s' is not supported." % obj.get("kind"))
+        namespace = namespace or obj.get("metadata", {}).get("namespace")
+        return self.request(
+            "POST", self.get_path(resource, namespace=namespace), obj)
+
+    def delete(self, resource, name=None, selector=None, force=False,
+               namespace=None):
+        """Delete API object by name or all the objects by label selector.
+        """
+        body = {
+            "kind": "DeleteOptions",
+            "apiVersion": "v1",
+            "propagationPolicy": "Background",
+        }
+        if force:
+            body["gracePeriodSeconds"] = 0
+        if name:
+            names = [name]
+        else:
+            names = [
+                item["metadata"]["name"]
+                for item in self.get(
+                    resource, selector=selector,
+                    namespace=namespace)["items"]]
+        for obj_name in names:
+            self.request(
+                "DELETE", self.get_path(resource, obj_name, namespace), body)
+
+    def patch(self, resource, name, changes, namespace=None):
+        """Patch API object using strategic merge patch like 'oc' does."""
+        return self.request(
+            "PATCH", self.get_path(resource, name, namespace), changes,
+            content_type="application/strategic-merge-patch+json")
+
+    def watch(self, resource, resource_version=None, namespace=None,
+              timeout_seconds=300):
+        """Start watching changes of the objects of the resource type.
+
+        Watch uses its own connection which is not shared with other
+        requests, because it is kept open until the server closes it.
+
+        Args:
+            resource (dict): resource info got from 'get_resource'.
+            resource_version (str): optional. Version to watch changes
+                since. Usually, it is the 'resourceVersion' of the list.
+            namespace (str): optional. Namespace of the objects.
+            timeout_seconds (int): seconds after which server closes
+                the watch.
+        Returns:
+            WatchStream object.
+        Raises:
+            exceptions.KubeAPIError: if the watch can not be started.
+        """
+        path = self._base_path + self.get_path(
+            resource, namespace=namespace) + "?" + urlparse.urlencode({
+                "watch": "true",
+                "allowWatchBookmarks": "true",
+                "timeoutSeconds": timeout_seconds,
+                "resourceVersion": resource_version or "",
+            })
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = "Bearer %s" % self.token
+        conn = self._new_connection(timeout_seconds + self.timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+        except (http_client.HTTPException, socket.error) as e:
+            conn.close()
+            msg = "API watch '%s' failed: %s" % (path, e)
+            g.log.error(msg)
+            raise exceptions.KubeAPIError(msg)
+        if response.status >= 300:
+            content = response.read()
+            conn.close()
+            msg = "API watch '%s' failed with '%s' status code: %s" % (
+                path, response.status, content)
+            g.log.error(msg)
+            raise exceptions.KubeAPIError(msg, response.status)
+        return WatchStream(conn, response)
+
+
+class WatchStream(object):
+    """Iterable stream of the API server watch events.
+
+    Each item is a tuple of the event type ('ADDED', 'MODIFIED', 'DELETED',
+    'BOOKMARK' or 'ERROR') and the API object. Iteration stops when
+    the server closes the watch or the stream gets closed.
+
+    Note: streaming requires Python 3.
+    """
+
+    def __init__(self, conn, response):
+        self._conn = conn
+        self._response = response
+        self._is_closed = False
+
+    def __iter__(self):
+        while True:
+            try:
+                line = self._response.readline()
+            except Exception:
+                # NOTE: closing of the stream from another thread breaks
+                # reading in different ways, so ignore errors in such case.
+                if self._is_closed:
+                    return
+                raise
+            if not line:
+                return
+            line = line.strip()
+            if not line:
+                continue
+            if isinstance(line, six.binary_type):
+                line = line.decode("utf-8", "replace")
+            event = json.loads(line)
+            yield event.get("type"), event.get("object") or {}
+
+    def close(self):
+        """Close the stream interrupting blocked reading if any."""
+        self._is_closed = True
+        sock = self._conn.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+        self._conn.close()
+
+
+def _write_temp_file(data):
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pem")
+    temp_file.write(base64.b64decode(data))
+    temp_file.close()
+    return temp_file.name
+
+
+def _remove_temp_files(*paths):
+    for path in paths:
+        if not path:
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            g.log.error("Failed to remove '%s' file: %s" % (path, e))
+
+
+def _load_kubeconfig(ocp_node):
+    kubeconfig_path = g.config.get("common", {}).get("kube_api_kubeconfig")
+    if kubeconfig_path:
+        with open(kubeconfig_path) as kubeconfig_file:
+            kubeconfig = yaml.safe_load(kubeconfig_file)
+        current_context = kubeconfig.get("current-context")
+        context = [
+            c["context"] for c in kubeconfig["contexts"]
+            if c["name"] == current_context][0]
+        cluster = [
+            c["cluster"] for c in kubeconfig["clusters"]
+            if c["name"] == context["cluster"]][0]
+        user = [
+            u["user"] for u in kubeconfig["users"]
+            if u["name"] == context["user"]][0]
+    else:
+        kubeconfig = json.loads(command.cmd_run(
+            "oc config view --minify --raw -o json", hostname=ocp_node))
+        context = kubeconfig["contexts"][0]["context"]
+        cluster = kubeconfig["clusters"][0]["cluster"]
+        user = kubeconfig["users"][0]["user"]
+    return context, cluster, user
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_kube_api_client(ocp_node):
+    """Get shared API client using credentials of the OCP client node.
+
+    Args:
+        ocp_node (str): OCP client node which kubeconfig is used.
+    Returns:
+        KubeAPIClient object or None if API server is not available.
+    """
+    with _CLIENTS_LOCK:
+        if ocp_node in _CLIENTS:
+            return _CLIENTS[ocp_node]
+        client, cert_file, key_file = None, None, None
+        try:
+            context, cluster, user = _load_kubeconfig(ocp_node)
+            token = user.get("token")
+            if user.get("client-certificate-data"):
+                cert_file = _write_temp_file(user["client-certificate-data"])
+                key_file = _write_temp_file(user["client-key-data"])
+            elif not token:
+                token = command.cmd_run("oc whoami -t", hostname=ocp_node)
+            ca_data = cluster.get("certificate-authority-data")
+            client = KubeAPIClient(
+                cluster["server"], token=token,
+                namespace=context.get("namespace") or "default",
+                ca_data=base64.b64decode(ca_data) if ca_data else None,
+                insecure=cluster.get("insecure-skip-tls-verify", False),
+                cert_file=cert_file, key_file=key_file,
+                timeout=g.config.get("common", {}).get(
+                    "kube_api_timeout", 60))
+        except Exception as e:
+            g.log.error(
+                "Failed to configure API client using kubeconfig of the "
+                "'%s' node, 'oc' commands are going to be used: %s" % (
+                    ocp_node, e))
+        finally:
+            # NOTE: client cert and key get loaded to the SSL context by the
+            # client constructor, so their files are not needed anymore.
+            _remove_temp_files(cert_file, key_file)
+        _CLIENTS[ocp_node] = client
+        return client
+
+
+def disable_kube_api_client(ocp_node):
+    """Make 'openshift_ops' use 'oc' commands for the OCP client node."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(ocp_node)
+        _CLIENTS[ocp_node] = None
+    if client is not None:
+        client.close()
+
+
+def reset_kube_api_client(ocp_node=None):
+    """Drop cached API client to reload kubeconfig on next usage."""
+    with _CLIENTS_LOCK:
+        nodes = [ocp_node] if ocp_node else list(_CLIENTS.keys())
+        clients = [_CLIENTS.pop(node, None) for node in nodes]
+    for client in clients:
+        if client is not None:
+            client.close()
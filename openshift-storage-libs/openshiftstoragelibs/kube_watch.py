@@ -0,0 +1,633 @@
+"""Shared watches of the OCP resources.
+
+Each watch keeps local cache of all the objects of one resource type in
+the current project of an OCP client node. The cache gets filled using one
+list request and then gets updated using stream of the changes, which is
+provided either by the API server watch endpoint (if 'api' backend is used)
+or by 'oc get -w -o json' command running on the OCP client node. Objects
+are tracked using their 'resourceVersion', so outdated data never overrides
+the newer one.
+
+Any amount of waiters may share one watch. They get woken up as soon as
+the cache gets changed instead of sleeping for the whole polling interval.
+
+Events are kept in the same way in the 'EventStore', which additionally
+indexes them by the involved object, reason and type, so filtering of them
+does not require requesting and scanning all the events of the project.
+
+Watches get enabled by setting 'ocp_watch_enabled' option of the 'common'
+config section to True.
+
+Example:
+    >>> watch = get_watch('master-node', 'pod')
+    >>> for w in watch.waiter(timeout=300, interval=10):
+    ...     pod = watch.get('heketi-1-abcde')
+    ...     if pod and pod['status'].get('phase') == 'Running':
+    ...         break
+"""
+
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import re
+import threading
+import time
+
+from glusto.core import Glusto as g
+import six
+
+from openshiftstoragelibs import command
+from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import kube_api
+from openshiftstoragelibs import openshift_version
+from openshiftstoragelibs import waiter
+
+
+WATCH_TIMEOUT = 300
+MAX_RETRY_DELAY = 30
+
+_LABEL_SET_RE = re.compile(r"^\s*([^\s!=]+)\s+(in|notin)\s+\((.*)\)\s*$")
+
+
+def _split_selector(selector):
+    """Split selector by commas which are not part of the value sets."""
+    return [
+        requirement for requirement in re.split(r",(?![^(]*\))", selector)
+        if requirement.strip()]
+
+
+def _match_label_selector(labels, selector):
+    """Check labels of an object against 'oc' label selector."""
+    for requirement in _split_selector(selector):
+        match = _LABEL_SET_RE.match(requirement)
+        if match:
+            key, operator, values = match.groups()
+            values = [v.strip() for v in values.split(",")]
+            if (labels.get(key) in values) != (operator == "in"):
+                return False
+            continue
+        requirement = requirement.strip()
+        if "!=" in requirement:
+            key, value = requirement.split("!=", 1)
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif "=" in requirement:
+            key, value = re.split("==?", requirement, 1)
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif requirement.startswith("!"):
+            if requirement[1:].strip() in labels:
+                return False
+        elif requirement not in labels:
+            return False
+    return True
+
+
+def _match_field_selector(obj, field_selector):
+    """Check object fields against 'oc' field selector."""
+    if isinstance(field_selector, six.string_types):
+        field_selector = field_selector.split(",")
+    for requirement in field_selector:
+        key, operator, value = re.split("(!=|==|=)", requirement.strip(), 1)
+        actual = kube_api.get_json_path_value(obj, "." + key.strip())
+        actual = "" if actual == "<none>" else actual
+        if (actual == value.strip()) != (operator != "!="):
+            return False
+    return True
+
+
+def _get_resource_version(obj):
+    """Get resource version of an object as int to be able to compare it."""
+    version = (obj.get("metadata") or {}).get("resourceVersion") or ""
+    return int(version) if version.isdigit() else None
+
+
+def _is_newer(obj, other):
+    version, other_version = (
+        _get_resource_version(obj), _get_resource_version(other))
+    if version is None or other_version is None:
+        return True
+    return version >= other_version
+
+
+class OcWatchStream(object):
+    """Stream of changes got from 'oc get -w -o json' command.
+
+    Command runs on the OCP client node using dedicated SSH connection.
+
+    Args:
+        ocp_node (str): OCP client node to run the command on.
+        rtype (str): resource type to be watched.
+        with_event_types (bool): whether 'oc' supports
+            '--output-watch-events' option. If not, then all the changes
+            are considered as 'MODIFIED' ones and deletions are not visible.
+    """
+
+    def __init__(self, ocp_node, rtype, with_event_types=True):
+        self.with_event_types = with_event_types
+        cmd = "oc get %s -w -o json" % rtype
+        if with_event_types:
+            cmd += " --output-watch-events"
+        g.log.info("root@%s (watch): %s" % (ocp_node, cmd))
+        self._ssh = g._create_pooled_ssh_connection(ocp_node, "root")
+        self._proc = self._ssh.popen(cmd, universal_newlines=True)
+
+    def __iter__(self):
+        lines = []
+        for line in iter(self._proc.stdout.readline, ""):
+            lines.append(line)
+            # NOTE: objects are pretty-printed, so only the closing brace
+            # of the top-level object has no indentation.
+            if line.rstrip() != "}":
+                continue
+            try:
+                data = json.loads("".join(lines))
+            except ValueError:
+                continue
+            lines = []
+            if self.with_event_types:
+                yield data.get("type"), data.get("object") or {}
+            else:
+                yield "MODIFIED", data
+
+    def get_error(self):
+        """Get stderr of the finished command."""
+        try:
+            return self._proc.stderr.read()
+        except Exception:
+            return ""
+
+    def close(self):
+        try:
+            self._proc.kill()
+        except Exception:
+            pass
+        try:
+            self._ssh.close()
+        except Exception:
+            pass
+
+
+class ResourceWatch(object):
+    """Cache of the objects of one resource type kept in sync using watch.
+
+    Args:
+        ocp_node (str): OCP client node which credentials and current
+            project are used.
+        rtype (str): resource type like 'pod', 'pvc' or 'pv'.
+    """
+
+    def __init__(self, ocp_node, rtype):
+        self.ocp_node = ocp_node
+        self.resource = kube_api.get_resource(rtype)
+        if self.resource is None:
+            raise exceptions.NotSupportedException(
+                "Watching of the '%s' resource type is not supported." % rtype)
+        self.rtype = self.resource["plural"]
+        self._cond = threading.Condition()
+        self._sync_lock = threading.Lock()
+        self._objects = {}
+        self._resource_version = None
+        self._revision = 0
+        self._changes_during_sync = None
+        self._last_sync = 0
+        self._is_exact = False
+        self._is_streaming = False
+        self._with_event_types = None
+        self._stream = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def revision(self):
+        """Counter of the cache changes."""
+        return self._revision
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _get_api_client(self):
+        if g.config.get("common", {}).get("ocp_api_backend", "oc") != "api":
+            return None
+        return kube_api.get_kube_api_client(self.ocp_node)
+
+    def _list(self):
+        client = self._get_api_client()
+        if client:
+            try:
+                return client.get(self.resource)
+            except exceptions.KubeAPIError as e:
+                if e.status is not None:
+                    raise
+        return json.loads(command.cmd_run(
+            "oc get %s -o json" % self.rtype, hostname=self.ocp_node))
+
+    def _open_stream(self):
+        client = self._get_api_client()
+        if client and self._resource_version is None:
+            self.resync()
+        if client and self._resource_version:
+            try:
+                stream = client.watch(
+                    self.resource, self._resource_version,
+                    timeout_seconds=WATCH_TIMEOUT)
+                self._is_exact = True
+                return stream
+            except exceptions.KubeAPIError as e:
+                if e.status == 410:
+                    # NOTE: requested version is too old, so relist is needed.
+                    self._resource_version = None
+                    raise
+                if e.status is not None:
+                    raise
+        if self._with_event_types is None:
+            self._with_event_types = (
+                openshift_version.get_openshift_version(self.ocp_node)
+                >= "4.3")
+        self._is_exact = False
+        return OcWatchStream(
+            self.ocp_node, self.rtype, self._with_event_types)
+
+    def _notify(self):
+        self._revision += 1
+        self._cond.notify_all()
+
+    def resync(self, max_age=None):
+        """Replace cache with the fresh list of objects.
+
+        Args:
+            max_age (int): optional. If set, then list is not requested
+                in case the last one is younger than 'max_age' seconds.
+        """
+        with self._sync_lock:
+            if max_age is not None and time.time() - self._last_sync < max_age:
+                return
+            with self._cond:
+                self._changes_during_sync = {}
+            try:
+                data = self._list()
+            finally:
+                with self._cond:
+                    changes, self._changes_during_sync = (
+                        self._changes_during_sync, None)
+            self._last_sync = time.time()
+            with self._cond:
+                self._apply_list(data, changes)
+
+    def _apply_list(self, data, changes):
+        objects, is_changed = {}, False
+        for item in data.get("items") or []:
+            name = item["metadata"]["name"]
+            cached = self._objects.get(name)
+            if name in changes and (
+                    cached is None and not _is_newer(item, changes[name])
+                    or cached is not None and not _is_newer(item, cached)):
+                # NOTE: object was changed or deleted after the list was
+                # requested, so watch data is newer.
+                if cached is not None:
+                    objects[name] = cached
+                continue
+            objects[name] = item
+            is_changed = is_changed or cached is None or (
+                _get_resource_version(cached) != _get_resource_version(item))
+        for name, cached in self._objects.items():
+            if name in objects:
+                continue
+            if name in changes:
+                # NOTE: object was created after the list was requested.
+                objects[name] = cached
+            else:
+                is_changed = True
+        self._objects = objects
+        version = (data.get("metadata") or {}).get("resourceVersion")
+        if version:
+            self._resource_version = version
+        if is_changed:
+            self._notify()
+
+    def _apply(self, event_type, obj):
+        name = (obj.get("metadata") or {}).get("name")
+        version = (obj.get("metadata") or {}).get("resourceVersion")
+        with self._cond:
+            if version and self._is_exact:
+                self._resource_version = version
+            if event_type == "BOOKMARK" or not name:
+                return
+            cached = self._objects.get(name)
+            if cached is not None and not _is_newer(obj, cached):
+                return
+            if self._changes_during_sync is not None:
+                self._changes_during_sync[name] = obj
+            if event_type == "DELETED":
+                if cached is None:
+                    return
+                del self._objects[name]
+            else:
+                self._objects[name] = obj
+            self._notify()
+
+    def _run(self):
+        failures, is_first = 0, True
+        while not self._stopped.is_set():
+            stream = None
+            try:
+                stream = self._open_stream()
+                if not self._is_exact and not is_first:
+                    # NOTE: 'oc' stream does not report deletions which
+                    # happened while it was not running.
+                    self.resync()
+                is_first = False
+                with self._cond:
+                    self._stream, self._is_streaming = stream, True
+                for event_type, obj in stream:
+                    if self._stopped.is_set():
+                        break
+                    if event_type == "ERROR":
+                        g.log.info(
+                            "Watch of '%s' on '%s' got error, relisting: %s"
+                            % (self.rtype, self.ocp_node, obj.get("message")))
+                        self._resource_version = None
+                        break
+                    self._apply(event_type, obj)
+                    failures = 0
+                if (isinstance(stream, OcWatchStream)
+                        and not self._stopped.is_set()):
+                    error = stream.get_error()
+                    if "output-watch-events" in error:
+                        self._with_event_types = False
+                    elif error:
+                        raise exceptions.ExecutionError(error)
+            except Exception as e:
+                failures += 1
+                g.log.error(
+                    "Watch of '%s' on '%s' failed: %s" % (
+                        self.rtype, self.ocp_node, six.text_type(e)))
+            finally:
+                with self._cond:
+                    self._stream, self._is_streaming = None, False
+                if stream is not None:
+                    stream.close()
+            self._stopped.wait(min(failures * 5, MAX_RETRY_DELAY))
+
+    def start(self):
+        """Fill the cache and start following the changes in background."""
+        self.resync()
+        self._thread = threading.Thread(
+            target=self._run, name="watch-%s-%s" % (self.ocp_node, self.rtype))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop following the changes."""
+        self._stopped.set()
+        with self._cond:
+            stream = self._stream
+            self._notify()
+        if stream is not None:
+            stream.close()
+
+    def get(self, name):
+        """Get cached object by name.
+
+        Returns:
+            dict: API object or None if it is absent. It must not be changed.
+        """
+        with self._cond:
+            return self._objects.get(name)
+
+    def list(self, selector=None, field_selector=None):
+        """Get cached objects which match the selectors.
+
+        Args:
+            selector (str|list): optional. Label selector.
+            field_selector (str|list): optional. Field selector.
+        Returns:
+            list: API objects sorted by name. They must not be changed.
+        """
+        if isinstance(selector, list):
+            selector = ",".join(selector)
+        with self._cond:
+            objects = [self._objects[name] for name in sorted(self._objects)]
+        if selector:
+            objects = [
+                obj for obj in objects if _match_label_selector(
+                    obj["metadata"].get("labels") or {}, selector)]
+        if field_selector:
+            objects = [
+                obj for obj in objects
+                if _match_field_selector(obj, field_selector)]
+        return objects
+
+    def get_custom_resource(self, custom, selector=None, field_selector=None):
+        """Get cached objects data like 'oc_get_custom_resource' does."""
+        paths = kube_api.parse_custom_columns(custom)
+        return [
+            [kube_api.get_json_path_value(obj, path) for path in paths]
+            for obj in self.list(selector, field_selector)]
+
+    def wait_for_change(self, revision, timeout):
+        """Wait for cache to be changed since the provided revision.
+
+        If there were no changes and the cache may be outdated, because
+        the stream does not report all the changes or is broken, then
+        the cache gets relisted not more often than once per 'timeout'.
+
+        Args:
+            revision (int): revision of the cache to wait changes since.
+            timeout (float): seconds to wait for changes.
+        Returns:
+            int: current revision of the cache.
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._revision == revision and not self._stopped.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if self._revision != revision:
+                return self._revision
+            is_exact = self._is_exact and self._is_streaming
+        if not is_exact:
+            self.resync(max_age=timeout)
+        return self._revision
+
+    def waiter(self, timeout=60, interval=1):
+        """Get waiter which wakes up as soon as the cache gets changed."""
+        return WatchWaiter(self, timeout, interval)
+
+
+class EventStore(ResourceWatch):
+    """Watch of the events indexed by the involved object, reason and type.
+
+    Args:
+        ocp_node (str): OCP client node which credentials and current
+            project are used.
+        rtype (str): 'events' resource type.
+    """
+
+    # NOTE: keys are the same as the filter args of 'openshift_ops.get_events'
+    INDEXED_FIELDS = {
+        "obj_name": ("involvedObject", "name"),
+        "obj_namespace": ("involvedObject", "namespace"),
+        "obj_type": ("involvedObject", "kind"),
+        "event_reason": ("reason",),
+        "event_type": ("type",),
+    }
+
+    def __init__(self, ocp_node, rtype="events"):
+        super(EventStore, self).__init__(ocp_node, rtype)
+        self._index = dict((key, {}) for key in self.INDEXED_FIELDS)
+
+    def _get_index_values(self, obj):
+        for key, fields in self.INDEXED_FIELDS.items():
+            value = obj
+            for field in fields:
+                value = (value or {}).get(field)
+            if value is not None:
+                yield key, value
+
+    def _add_to_index(self, name, obj):
+        for key, value in self._get_index_values(obj):
+            self._index[key].setdefault(value, set()).add(name)
+
+    def _remove_from_index(self, name, obj):
+        for key, value in self._get_index_values(obj):
+            names = self._index[key].get(value)
+            if names is None:
+                continue
+            names.discard(name)
+            if not names:
+                del self._index[key][value]
+
+    def _apply_list(self, data, changes):
+        super(EventStore, self)._apply_list(data, changes)
+        self._index = dict((key, {}) for key in self.INDEXED_FIELDS)
+        for name, obj in self._objects.items():
+            self._add_to_index(name, obj)
+
+    def _apply(self, event_type, obj):
+        name = (obj.get("metadata") or {}).get("name")
+        with self._cond:
+            cached = self._objects.get(name)
+            super(EventStore, self)._apply(event_type, obj)
+            new_obj = self._objects.get(name)
+            if new_obj is not cached:
+                if cached is not None:
+                    self._remove_from_index(name, cached)
+                if new_obj is not None:
+                    self._add_to_index(name, new_obj)
+
+    def find(self, **filters):
+        """Get cached events using the indexes.
+
+        Args:
+            filters: values of the 'INDEXED_FIELDS' keys. Empty values are
+                ignored.
+        Returns:
+            list: events sorted by name the same way as API server returns
+                them. They must not be changed.
+        """
+        filters = dict((k, v) for k, v in filters.items() if v)
+        with self._cond:
+            if not filters:
+                names = set(self._objects)
+            else:
+                indexed_names = sorted(
+                    (self._index[key].get(value, set())
+                     for key, value in filters.items()), key=len)
+                names = indexed_names[0].intersection(*indexed_names[1:])
+            return [self._objects[name] for name in sorted(names)]
+
+
+class WatchWaiter(waiter.Waiter):
+    """Waiter which sleeps until the watched cache changes.
+
+    It has the same semantics as 'waiter.Waiter' one, but the 'interval'
+    is the maximum time between attempts instead of the exact one.
+    """
+
+    def __init__(self, watch, timeout=60, interval=1):
+        super(WatchWaiter, self).__init__(timeout=timeout, interval=interval)
+        self.watch = watch
+        self._revision = None
+
+    def next(self):
+        if self._start is None:
+            self._start = time.time()
+        remaining = self.timeout - (time.time() - self._start)
+        if remaining < 0:
+            self.expired = True
+            raise StopIteration()
+        if self._attempt != 0:
+            self._revision = self.watch.wait_for_change(
+                self._revision, min(self.interval, remaining))
+        else:
+            self._revision = self.watch.revision
+        self._attempt += 1
+        return self
+
+    __next__ = next
+
+
+_WATCHES = {}
+_WATCHES_LOCK = threading.Lock()
+
+
+def get_watch(ocp_node, rtype):
+    """Get shared watch of the resource type if watches are enabled.
+
+    Args:
+        ocp_node (str): OCP client node which credentials and current
+            project are used.
+        rtype (str): resource type like 'pod', 'pvc' or 'pv'.
+    Returns:
+        ResourceWatch object or None if polling should be used instead.
+    """
+    if not g.config.get("common", {}).get("ocp_watch_enabled", False):
+        return None
+    resource = kube_api.get_resource(rtype)
+    if resource is None:
+        return None
+    key = (ocp_node, resource["plural"])
+    with _WATCHES_LOCK:
+        watch = _WATCHES.get(key)
+        if watch is not None and watch.is_running:
+            return watch
+        watch_class = (
+            EventStore if resource["plural"] == "events" else ResourceWatch)
+        watch = watch_class(ocp_node, rtype)
+        try:
+            watch.start()
+        except Exception as e:
+            g.log.error(
+                "Failed to start watch of '%s' on '%s', polling is going to "
+                "be used: %s" % (rtype, ocp_node, six.text_type(e)))
+            return None
+        _WATCHES[key] = watch
+        return watch
+
+
+def get_event_store(ocp_node):
+    """Get shared store of the events if watches are enabled.
+
+    Args:
+        ocp_node (str): OCP client node which credentials and current
+            project are used.
+    Returns:
+        EventStore object or None if events should be requested instead.
+    """
+    return get_watch(ocp_node, "events")
+
+
+def stop_watches(ocp_node=None):
+    """Stop watches of the OCP client node or all of them."""
+    with _WATCHES_LOCK:
+        keys = [key for key in _WATCHES if ocp_node in (None, key[0])]
+        watches = [_WATCHES.pop(key) for key in keys]
+    for watch in watches:
+        watch.stop()
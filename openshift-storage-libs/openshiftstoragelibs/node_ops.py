@@ -7,6 +7,7 @@ import six
 from openshiftstoragelibs.cloundproviders.vmware import VmWare
 from openshiftstoragelibs import command
 from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import openshift_ops
 from openshiftstoragelibs import waiter
 
 
@@ -58,6 +59,7 @@ def node_reboot_by_command(
 
     # added sleep as node will restart after 3 sec
     time.sleep(3)
+    openshift_ops.GLUSTER_TOPOLOGY.invalidate()
 
     if wait_for_connection:
         wait_for_ssh_connection(node, timeout=timeout, interval=wait_step)
@@ -125,6 +127,7 @@ def power_off_vm_by_name(name):
     g.log.info('powering off the vm "%s"' % name)
     cloudProvider.power_off_vm_by_name(name)
     g.log.info('powered off the vm "%s" successfully' % name)
+    openshift_ops.GLUSTER_TOPOLOGY.invalidate()
 
 
 def power_on_vm_by_name(name, timeout=600, interval=10):
@@ -142,6 +145,7 @@ def power_on_vm_by_name(name, timeout=600, interval=10):
     g.log.info('powering on the VM "%s"' % name)
     cloudProvider.power_on_vm_by_name(name)
     g.log.info('Powered on the VM "%s" successfully' % name)
+    openshift_ops.GLUSTER_TOPOLOGY.invalidate()
 
     # Wait for hostname to get assigned
     _waiter = waiter.Waiter(timeout, interval)
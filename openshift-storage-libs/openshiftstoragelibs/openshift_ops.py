@@ -4,6 +4,7 @@ Various utility functions for interacting with OCP/OpenShift.
 """
 
 import base64
+import copy
 try:
     # py2/3
     import simplejson as json
@@ -16,15 +17,20 @@ from glusto.core import Glusto as g
 from glustolibs.gluster import volume_ops
 import mock
 import six
+import threading
 import time
 import yaml
 
 from openshiftstoragelibs import command
 from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import kube_api
+from openshiftstoragelibs import kube_watch
 from openshiftstoragelibs import openshift_version
 from openshiftstoragelibs import utils
 from openshiftstoragelibs import waiter
 from openshiftstoragelibs.heketi_ops import (
+    HEKETI_DC,
+    HEKETI_ENDPOINT,
     heketi_blockvolume_info,
     heketi_volume_info,
 )
@@ -39,6 +45,55 @@ KILL_SERVICE = "kill -9 %s"
 IS_ACTIVE_SERVICE = "systemctl is-active %s"
 
 
+def _get_kube_api(ocp_node, rtype=None):
+    """Get API client and resource info if 'api' backend is enabled.
+
+    Args:
+        ocp_node (str): OCP client node which credentials are used.
+        rtype (str): optional. Resource type to be requested.
+    Returns:
+        tuple: kube_api.KubeAPIClient object and resource info dict or
+            (None, None) if 'oc' commands should be used.
+    """
+    if g.config.get("common", {}).get("ocp_api_backend", "oc") != "api":
+        return None, None
+    resource = kube_api.get_resource(rtype) if rtype else None
+    if rtype and resource is None:
+        return None, None
+    client = kube_api.get_kube_api_client(ocp_node)
+    return (client, resource) if client else (None, None)
+
+
+def _get_waiter(ocp_node, rtype, timeout, interval):
+    """Get waiter which uses shared watch of the resource type if enabled.
+
+    Args:
+        ocp_node (str): OCP client node which credentials are used.
+        rtype (str): resource type to be waited for.
+        timeout (int): overall timeout for waiting.
+        interval (int): interval in seconds between waiting attempts.
+            If watch is used, then it is the maximum one.
+    Returns:
+        tuple: kube_watch.ResourceWatch object or None if polling should be
+            used and the waiter object.
+    """
+    watch = kube_watch.get_watch(ocp_node, rtype)
+    if watch is None:
+        return None, waiter.Waiter(timeout, interval)
+    return watch, watch.waiter(timeout, interval)
+
+
+def _is_kube_api_unreachable(ocp_node, error):
+    """Switch to 'oc' commands if API server is not reachable."""
+    if error.status is not None:
+        return False
+    g.log.error(
+        "API server is not reachable, 'oc' commands are going to be used "
+        "for the '%s' node." % ocp_node)
+    kube_api.disable_kube_api_client(ocp_node)
+    return True
+
+
 def oc_get_pods(ocp_node, selector=None, name=None):
     """Gets the pods info with 'wide' option in the current project.
 
@@ -52,6 +107,17 @@ def oc_get_pods(ocp_node, selector=None, name=None):
         dict : dict of pods info in the current project.
     """
 
+    client, resource = _get_kube_api(ocp_node, "pods")
+    if client:
+        try:
+            data = client.get(resource, name, selector=selector)
+            return dict(
+                (pod["metadata"]["name"], kube_api.get_pod_wide_info(pod))
+                for pod in ([data] if name else data["items"]))
+        except exceptions.KubeAPIError as e:
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+
     cmd = "oc get -o wide --no-headers=true pods "
     if selector:
         cmd += " --selector %s" % selector
@@ -90,19 +156,27 @@ def _parse_wide_pods_output(output):
 
 
 def oc_get_pods_full(ocp_node):
-    """Gets all the pod info via YAML in the current project.
+    """Gets all the pod info via JSON in the current project.
 
     Args:
         ocp_node (str): Node in which ocp command will be executed.
 
     Returns:
-        dict: The YAML output converted to python objects
+        dict: The JSON output converted to python objects
             (a top-level dict)
     """
 
-    cmd = "oc get -o yaml pods"
+    client, resource = _get_kube_api(ocp_node, "pods")
+    if client:
+        try:
+            return client.get(resource)
+        except exceptions.KubeAPIError as e:
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+
+    cmd = "oc get -o json pods"
     out = command.cmd_run(cmd, hostname=ocp_node)
-    return yaml.load(out)
+    return utils.load_json_or_yaml(out)
 
 
 def get_ocp_gluster_pod_details(ocp_node):
@@ -147,6 +221,107 @@ def get_ocp_gluster_pod_details(ocp_node):
     return gluster_pod_details
 
 
+class GlusterTopology(object):
+    """Thread-safe cache of Gluster PODs placement.
+
+    Gluster PODs details get fetched once per 'ttl' seconds for each of the
+    OCP client nodes and indexed by node IP address, POD IP address and
+    node hostname. Cache gets invalidated explicitly after the events
+    which change PODs placement, such as POD respins and node reboots.
+
+    Args:
+        ttl (int): seconds during which cached PODs details are considered
+            to be valid. If not provided, then 'gluster_topology_cache_ttl'
+            config option is used with default value of 300 seconds.
+    """
+
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return g.config.get("common", {}).get(
+            "gluster_topology_cache_ttl", 300)
+
+    def get_pods(self, ocp_node, refresh=False):
+        """Get Gluster PODs details using cached data if possible.
+
+        Args:
+            ocp_node (str): node to run 'oc' commands on.
+            refresh (bool): if True, then cached data gets ignored.
+        Returns:
+            list: list of dicts in the format which is returned by
+                'get_ocp_gluster_pod_details' function.
+        """
+        with self._lock:
+            entry = self._cache.get(ocp_node)
+            if (not refresh and entry is not None
+                    and time.time() - entry["time"] < self.ttl):
+                return list(entry["pods"])
+
+        now = time.time()
+        pods = get_ocp_gluster_pod_details(ocp_node)
+        by_node = {}
+        for pod in pods:
+            for key in ("pod_host_ip", "pod_ip", "pod_hostname"):
+                by_node.setdefault(pod[key], pod)
+        with self._lock:
+            self._cache[ocp_node] = {
+                "time": now, "pods": pods, "by_node": by_node}
+        return list(pods)
+
+    def get_pod_for_node(self, ocp_node, gluster_node, refresh=False):
+        """Get details of the Gluster POD running on the specified node.
+
+        Args:
+            ocp_node (str): node to run 'oc' commands on.
+            gluster_node (str): IP address or hostname of a Gluster node.
+            refresh (bool): if True, then cached data gets ignored.
+        Returns:
+            dict: Gluster POD details or None if POD is not found.
+        """
+        self.get_pods(ocp_node, refresh=refresh)
+        with self._lock:
+            return self._cache[ocp_node]["by_node"].get(gluster_node)
+
+    def is_pod_gone(self, ocp_node, pod_name):
+        """Check using fresh data whether the Gluster POD doesn't exist.
+
+        Args:
+            ocp_node (str): node to run 'oc' commands on.
+            pod_name (str): name of the Gluster POD to check.
+        Returns:
+            bool: True if the POD was refreshed away from the cache.
+        """
+        return pod_name not in [
+            pod["pod_name"] for pod in self.get_pods(ocp_node, refresh=True)]
+
+    def invalidate(self, ocp_node=None, pod_name=None):
+        """Drop cached Gluster PODs details.
+
+        Args:
+            ocp_node (str): node which cached data should be dropped.
+                If not set, then data of all the nodes gets dropped.
+            pod_name (str): if set, then only the cached data which
+                contains this POD gets dropped.
+        """
+        with self._lock:
+            for node in list(self._cache.keys()):
+                if ocp_node is not None and node != ocp_node:
+                    continue
+                if pod_name is not None and pod_name not in [
+                        pod["pod_name"] for pod in self._cache[node]["pods"]]:
+                    continue
+                del self._cache[node]
+
+
+GLUSTER_TOPOLOGY = GlusterTopology()
+
+
 def get_amount_of_gluster_nodes(ocp_node):
     """Calculate amount of Gluster nodes.
 
@@ -185,6 +360,8 @@ def switch_oc_project(ocp_node, project_name):
 
     cmd = "oc project %s" % project_name
     command.cmd_run(cmd, hostname=ocp_node)
+    kube_api.reset_kube_api_client(ocp_node)
+    kube_watch.stop_watches(ocp_node)
     return True
 
 
@@ -219,6 +396,18 @@ def oc_create(ocp_node, value, value_type='file'):
     Raises:
         AssertionError: Raised when resource fails to create.
     """
+    client, _resource = _get_kube_api(ocp_node)
+    if client and value_type != 'file':
+        try:
+            client.create(yaml.safe_load(value))
+            g.log.info('Created resource from %s.' % value_type)
+            return
+        except exceptions.NotSupportedException as e:
+            g.log.info("%s Using 'oc' command." % e)
+        except exceptions.KubeAPIError as e:
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+
     if value_type == 'file':
         cmd = ['oc', 'create', '-f', value]
     else:
@@ -330,6 +519,12 @@ def oc_create_pvc(hostname, sc_name=None, pvc_name_prefix="autotests-pvc",
         label (dic): label for PVC.
     """
     pvc_name = "%s-%s" % (pvc_name_prefix, utils.get_random_str())
+    pvc_data = json.dumps(_get_pvc_data(pvc_name, sc_name, pvc_size, label))
+    oc_create(hostname, pvc_data, 'stdin')
+    return pvc_name
+
+
+def _get_pvc_data(pvc_name, sc_name, pvc_size, label):
     metadata = {"name": pvc_name}
     if label:
         metadata["labels"] = label
@@ -338,7 +533,7 @@ def oc_create_pvc(hostname, sc_name=None, pvc_name_prefix="autotests-pvc",
             "volume.kubernetes.io/storage-class": sc_name,
             "volume.beta.kubernetes.io/storage-class": sc_name,
         }
-    pvc_data = json.dumps({
+    return {
         "kind": "PersistentVolumeClaim",
         "apiVersion": "v1",
         "metadata": metadata,
@@ -346,9 +541,40 @@ def oc_create_pvc(hostname, sc_name=None, pvc_name_prefix="autotests-pvc",
             "accessModes": ["ReadWriteOnce"],
             "resources": {"requests": {"storage": "%sGi" % pvc_size}}
         },
-    })
-    oc_create(hostname, pvc_data, 'stdin')
-    return pvc_name
+    }
+
+
+def _get_chunk_size(chunk_size):
+    if chunk_size is None:
+        chunk_size = g.config.get("common", {}).get("oc_bulk_chunk_size", 100)
+    return max(int(chunk_size), 1)
+
+
+def oc_create_pvcs(hostname, pvc_names, sc_name=None, pvc_size=1,
+                   label=None, chunk_size=None):
+    """Create several PVCs using one 'List' manifest per chunk of them.
+
+    Args:
+        hostname (str): Node on which 'oc create' command will be executed.
+        pvc_names (list): names of the PVCs to be created.
+        sc_name (str): name of a storage class to create PVCs in.
+        pvc_size (int/str): size of each PVC in Gb
+        label (dic): label for PVCs.
+        chunk_size (int): max amount of PVCs created by one 'oc create'
+            call. Defaults to the 'oc_bulk_chunk_size' config option.
+    Raises:
+        AssertionError: Raised when PVCs of some chunk fail to create.
+    """
+    chunk_size = _get_chunk_size(chunk_size)
+    for i in range(0, len(pvc_names), chunk_size):
+        pvcs_data = json.dumps({
+            "kind": "List",
+            "apiVersion": "v1",
+            "items": [
+                _get_pvc_data(pvc_name, sc_name, pvc_size, label)
+                for pvc_name in pvc_names[i:i + chunk_size]],
+        })
+        oc_create(hostname, pvcs_data, 'stdin')
 
 
 def _oc_create_app_dc_with_io_image(hostname, pvc_name, dc_name_prefix,
@@ -495,22 +721,79 @@ def oc_delete(
             '&>', '{}_$(date +%Y-%m-%d-%H-%m-%s).log'.format(name)]
         command.cmd_run(cmd, hostname=ocp_node)
 
-    if name:
-        cmd = ['oc', 'delete', rtype, name]
-    else:
-
+    if not name:
         # Fetch label from dic
         label = list(label.items())[0][0] + '=' + list(label.items())[0][1]
-        cmd = ['oc', 'delete', rtype, '-l', label]
 
-    if openshift_version.get_openshift_version() >= '3.11':
-        cmd.append('--wait=false')
+    client, resource = _get_kube_api(ocp_node, rtype)
+    is_deleted = False
+    if client:
+        try:
+            client.delete(resource, name, selector=label, force=is_force)
+            is_deleted = True
+        except exceptions.KubeAPIError as e:
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+
+    if not is_deleted:
+        if name:
+            cmd = ['oc', 'delete', rtype, name]
+        else:
+            cmd = ['oc', 'delete', rtype, '-l', label]
+
+        if openshift_version.get_openshift_version() >= '3.11':
+            cmd.append('--wait=false')
 
-    # Forcefully delete
-    if is_force:
-        cmd.append("--grace-period 0 --force")
+        # Forcefully delete
+        if is_force:
+            cmd.append("--grace-period 0 --force")
 
-    command.cmd_run(cmd, hostname=ocp_node)
+        command.cmd_run(cmd, hostname=ocp_node)
+
+    if rtype in ("pod", "pods", "po"):
+        GLUSTER_TOPOLOGY.invalidate(pod_name=name)
+        HEKETI_ENDPOINT.invalidate(pod_name=name)
+    elif rtype in ("daemonset", "daemonsets", "ds"):
+        GLUSTER_TOPOLOGY.invalidate()
+
+
+def oc_delete_resources(ocp_node, rtype, names, chunk_size=None):
+    """Delete several OCP resources of one type by their names.
+
+    Absent resources are skipped. Resources get deleted not waiting for
+    their absence, so 'wait_for_resources_absence' is expected to be used
+    afterwards.
+
+    Args:
+        ocp_node (str): Node on which the ocp command will run.
+        rtype (str): Name of the resource type (pvc, pod, etc).
+        names (list): names of the resources to be deleted.
+        chunk_size (int): max amount of resources deleted by one
+            'oc delete' call. Defaults to the 'oc_bulk_chunk_size' config
+            option.
+    """
+    names = list(names)
+    client, resource = _get_kube_api(ocp_node, rtype)
+    if client:
+        try:
+            for name in names:
+                try:
+                    client.delete(resource, name)
+                except exceptions.KubeAPIError as e:
+                    if e.status != 404:
+                        raise
+            return
+        except exceptions.KubeAPIError as e:
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+
+    chunk_size = _get_chunk_size(chunk_size)
+    for i in range(0, len(names), chunk_size):
+        cmd = ['oc', 'delete', rtype] + names[i:i + chunk_size] + [
+            '--ignore-not-found']
+        if openshift_version.get_openshift_version() >= '3.11':
+            cmd.append('--wait=false')
+        command.cmd_run(cmd, hostname=ocp_node)
 
 
 def oc_get_custom_resource(ocp_node, rtype, custom, name=None, selector=None,
@@ -536,14 +819,8 @@ def oc_get_custom_resource(ocp_node, rtype, custom, name=None, selector=None,
                 ocp_node, "pvc", ":.metadata.name"
             )
     """
-    cmd = ['oc', 'get', rtype, '--no-headers']
-
-    if name:
-        cmd.append(name)
-
-    if selector:
-        cmd.append('--selector %s' % (
-            ','.join(selector) if isinstance(selector, list) else selector))
+    if selector and isinstance(selector, list):
+        selector = ','.join(selector)
 
     if field_selector:
         # NOTE(Nitin Goyal): Add field-selector parameters to custom because it
@@ -555,18 +832,46 @@ def oc_get_custom_resource(ocp_node, rtype, custom, name=None, selector=None,
         for fs in field_selector:
             custom += ',:' + re.split('=|!=', fs)[0]
 
-    cmd.append('-o=custom-columns=%s' % (
-        ','.join(custom) if isinstance(custom, list) else custom))
+    out_list = None
+    client, resource = _get_kube_api(ocp_node, rtype)
+    if client:
+        try:
+            data = client.get(resource, name, selector=selector)
+        except exceptions.KubeAPIError as e:
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+        else:
+            paths = kube_api.parse_custom_columns(custom)
+            out_list = [
+                [kube_api.get_json_path_value(obj, path) for path in paths]
+                for obj in ([data] if name else data["items"])]
+            # NOTE: keep the format of the 'oc' output parsing results
+            out_list = out_list[0] if name else (out_list or [[]])
 
-    out = command.cmd_run(cmd, hostname=ocp_node)
+    if out_list is None:
+        cmd = ['oc', 'get', rtype, '--no-headers']
 
-    if name:
-        return list(filter(None, map(str.strip, (out.strip()).split(' '))))
-    else:
-        out_list = []
-        for line in (out.strip()).split('\n'):
-            out_list.append(
-                list(filter(None, map(str.strip, line.split(' ')))))
+        if name:
+            cmd.append(name)
+
+        if selector:
+            cmd.append('--selector %s' % selector)
+
+        cmd.append('-o=custom-columns=%s' % (
+            ','.join(custom) if isinstance(custom, list) else custom))
+
+        out = command.cmd_run(cmd, hostname=ocp_node)
+
+        if name:
+            return list(
+                filter(None, map(str.strip, (out.strip()).split(' '))))
+        else:
+            out_list = []
+            for line in (out.strip()).split('\n'):
+                out_list.append(
+                    list(filter(None, map(str.strip, line.split(' ')))))
+    elif name:
+        return out_list
 
     if not field_selector:
         return out_list
@@ -607,12 +912,22 @@ def oc_get_yaml(ocp_node, rtype, name=None, raise_on_error=True):
         AssertionError: Raised when unable to get resource and
             `raise_on_error` is true.
     """
-    cmd = ['oc', 'get', '-oyaml', rtype]
+    client, resource = _get_kube_api(ocp_node, rtype)
+    if client:
+        try:
+            return client.get(resource, name)
+        except exceptions.KubeAPIError as e:
+            if e.status is not None and not raise_on_error:
+                return {}
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+
+    cmd = ['oc', 'get', '-ojson', rtype]
     if name is not None:
         cmd.append(name)
     out = command.cmd_run(
         cmd, hostname=ocp_node, raise_on_error=raise_on_error)
-    return yaml.load(out, Loader=yaml.FullLoader) if out else {}
+    return utils.load_json_or_yaml(out) if out else {}
 
 
 def oc_get_pvc(ocp_node, name):
@@ -683,36 +998,66 @@ def wait_for_resources_absence(ocp_node, rtype, names,
         interval (int): interval in seconds between waiting attempts.
         timeout (int): overall timeout for waiting.
     """
-    _waiter = waiter.Waiter(timeout=timeout, interval=interval)
+    start_time = time.time()
+    watch, _waiter = _get_waiter(ocp_node, rtype, timeout, interval)
     if len(names[0]) == 1:
         names = (names, )
     resources = {name: {'resource': 'not_checked'} for name in names}
-    for name in names:
-        for w in _waiter:
-            try:
-                resources[name]['resource'] = oc_get_yaml(
-                    ocp_node, rtype, name, raise_on_error=True)
-            except AssertionError:
-                # NOTE(vponomar): Reset attempts for waiter to avoid redundant
-                # sleep equal to 'interval' on the next usage.
-                _waiter._attempt = 0
-                resources[name]['resource'] = 'absent'
-                break
+
+    # NOTE: list resources just once per attempt and diff it against the set
+    # of pending names instead of requesting each of the resources.
+    pending_names = set(names)
+    for w in _waiter:
+        if watch is not None:
+            existing_names = set(
+                obj['metadata']['name'] for obj in watch.list())
+        else:
+            existing_names = set(
+                row[0] for row in oc_get_custom_resource(
+                    ocp_node, rtype, ':.metadata.name') if row)
+        for name in pending_names - existing_names:
+            resources[name]['resource'] = 'absent'
+        pending_names &= existing_names
+        if not pending_names:
+            break
+    expired = _waiter.expired
+
     if rtype == 'pvc':
+        # NOTE(vponomar): PV may exist even if PVC is deleted, so look for PVs
+        # using the 'claimRef' of them.
+        pending_names = set(names)
         for name in names:
             resources[name]['pv_name'] = '?'
-            for w in _waiter:
-                try:
-                    _pv_name = get_pv_name_from_pvc(ocp_node, name)
-                    if resources[name]['pv_name'] == '?':
-                        resources[name]['pv_name'] = _pv_name
-                except AssertionError:
-                    _waiter._attempt = 0
+        pv_watch, _waiter = _get_waiter(
+            ocp_node, 'pv', max(timeout - (time.time() - start_time), 0),
+            interval)
+        for w in _waiter:
+            if pv_watch is not None:
+                pv_names = dict(
+                    (kube_api.get_json_path_value(pv, '.spec.claimRef.name'),
+                     pv['metadata']['name'])
+                    for pv in pv_watch.list())
+            else:
+                pv_names = dict(
+                    (row[1], row[0]) for row in oc_get_custom_resource(
+                        ocp_node, 'pv', ':.metadata.name,:.spec.claimRef.name')
+                    if len(row) == 2)
+            for name in pending_names:
+                if name not in pv_names:
                     resources[name]['pv_name'] = 'absent'
-                    break
-    if _waiter.expired:
+                elif resources[name]['pv_name'] == '?':
+                    resources[name]['pv_name'] = pv_names[name]
+            pending_names &= set(pv_names)
+            if not pending_names:
+                break
+        expired = expired or _waiter.expired
+
+    if expired:
         # Gather more info for ease of debugging
         for name in names:
+            if resources[name]['resource'] != 'absent':
+                resources[name]['resource'] = oc_get_yaml(
+                    ocp_node, rtype, name, raise_on_error=False) or 'absent'
             try:
                 r_events = get_events(ocp_node, obj_name=name)
             except Exception:
@@ -770,6 +1115,8 @@ def scale_dcs_pod_amount_and_wait(hostname, dc_names, pod_amount=1,
         namespace_arg, pod_amount, " dc/".join(dc_names))
 
     command.cmd_run(scale_cmd, hostname=hostname)
+    if HEKETI_DC in dc_names:
+        HEKETI_ENDPOINT.invalidate()
 
     for dc_name in dc_names:
         dc_and_pod_names[dc_name] = get_pod_names_from_dc(hostname, dc_name)
@@ -921,6 +1268,53 @@ def get_gluster_pod_name_for_specific_node(
     return g_pod_name[0][0]
 
 
+def _cmd_run_on_gluster_pods(
+        ocp_client_node, cmd, gluster_node, raise_on_error, rerun=True):
+    if gluster_node:
+        g_pod = (
+            GLUSTER_TOPOLOGY.get_pod_for_node(ocp_client_node, gluster_node)
+            or GLUSTER_TOPOLOGY.get_pod_for_node(
+                ocp_client_node, gluster_node, refresh=True))
+        if not g_pod:
+            raise exceptions.ExecutionError(
+                "Could not find Gluster PODs with node filter as "
+                "'%s'." % gluster_node)
+        gluster_pod_names = [g_pod["pod_name"]]
+    else:
+        gluster_pod_names = [
+            pod["pod_name"]
+            for pod in GLUSTER_TOPOLOGY.get_pods(ocp_client_node)]
+
+    err_msg = ""
+    for gluster_pod_name in gluster_pod_names:
+        pod_cmd = "oc exec %s -- %s" % (gluster_pod_name, cmd)
+        ret, out, err = command.cmd_run_with_status(
+            pod_cmd, ocp_client_node)
+        out = out.strip() if out else out
+        if int(ret) == 0:
+            return out
+
+        # NOTE: cached POD may be already respinned, so rerun the command
+        # once using fresh Gluster PODs data if the POD is not found.
+        if (rerun and command.is_pod_not_found_error(err, gluster_pod_name)
+                and GLUSTER_TOPOLOGY.is_pod_gone(
+                    ocp_client_node, gluster_pod_name)):
+            g.log.info(
+                "Gluster POD '%s' doesn't exist anymore, rerunning the "
+                "command using fresh Gluster PODs data." % gluster_pod_name)
+            return _cmd_run_on_gluster_pods(
+                ocp_client_node, cmd, gluster_node, raise_on_error,
+                rerun=False)
+        err = ("Failed to run '%s' command on '%s' Gluster POD. Got "
+               "non-zero return code '%s'. Error: %s\n" % (
+                   cmd, gluster_pod_name, ret, err))
+        g.log.error(err)
+        if not raise_on_error:
+            return out
+        err_msg += err
+    raise exceptions.ExecutionError(err_msg)
+
+
 def cmd_run_on_gluster_pod_or_node(
         ocp_client_node, cmd, gluster_node=None, raise_on_error=True):
     """Run shell command on either Gluster PODs or Gluster nodes.
@@ -935,35 +1329,12 @@ def cmd_run_on_gluster_pod_or_node(
         Output of a shell command as string object.
     """
     # Containerized Glusterfs
-    gluster_pods = oc_get_pods(ocp_client_node, selector="glusterfs-node=pod")
-    err_msg = ""
-    if gluster_pods:
-        if gluster_node:
-            for pod_name, pod_data in gluster_pods.items():
-                if gluster_node in (pod_data["ip"], pod_data["node"]):
-                    gluster_pod_names = [pod_name]
-                    break
-            else:
-                raise exceptions.ExecutionError(
-                    "Could not find Gluster PODs with node filter as "
-                    "'%s'." % gluster_node)
-        else:
-            gluster_pod_names = list(gluster_pods.keys())
-
-        for gluster_pod_name in gluster_pod_names:
-            try:
-                pod_cmd = "oc exec %s -- %s" % (gluster_pod_name, cmd)
-                return command.cmd_run(
-                    pod_cmd, hostname=ocp_client_node,
-                    raise_on_error=raise_on_error)
-            except Exception as e:
-                err = ("Failed to run '%s' command on '%s' Gluster POD. "
-                       "Error: %s\n" % (cmd, gluster_pod_name, e))
-                err_msg += err
-                g.log.error(err)
-        raise exceptions.ExecutionError(err_msg)
+    if GLUSTER_TOPOLOGY.get_pods(ocp_client_node):
+        return _cmd_run_on_gluster_pods(
+            ocp_client_node, cmd, gluster_node, raise_on_error)
 
     # Standalone Glusterfs
+    err_msg = ""
     if gluster_node:
         g_hosts = [gluster_node]
     else:
@@ -1072,13 +1443,19 @@ def wait_for_pod_be_ready(hostname, pod_name,
          bool: True if pod status is Running and ready state,
                otherwise Raise Exception
     '''
-    for w in waiter.Waiter(timeout, wait_step):
-        # command to find pod status and its phase
-        cmd = ("oc get pods %s -o=custom-columns="
-               ":.status.containerStatuses[0].ready,"
-               ":.status.phase") % pod_name
-        out = command.cmd_run(cmd, hostname=hostname)
-        output = out.split()
+    custom = ":.status.containerStatuses[0].ready,:.status.phase"
+    watch, _waiter = _get_waiter(hostname, "pod", timeout, wait_step)
+    for w in _waiter:
+        pod = watch.get(pod_name) if watch is not None else None
+        if pod is not None:
+            output = [
+                kube_api.get_json_path_value(pod, path)
+                for path in kube_api.parse_custom_columns(custom)]
+        else:
+            # command to find pod status and its phase
+            cmd = "oc get pods %s -o=custom-columns=%s" % (pod_name, custom)
+            out = command.cmd_run(cmd, hostname=hostname)
+            output = out.split()
 
         # command to find if pod is ready
         if output[0] == "true" and output[1] == "Running":
@@ -1128,10 +1505,15 @@ def wait_for_pods_be_ready(
     custom = (
         r':.metadata.name,":.status.conditions[?(@.type==\"Ready\")]".status')
     pod_status = None
-    for w in waiter.Waiter(timeout, wait_step):
-        pod_status = oc_get_custom_resource(
-            hostname, "pod", custom, selector=selector,
-            field_selector=field_selector)
+    watch, _waiter = _get_waiter(hostname, "pod", timeout, wait_step)
+    for w in _waiter:
+        if watch is not None:
+            pod_status = watch.get_custom_resource(
+                custom, selector=selector, field_selector=field_selector)
+        else:
+            pod_status = oc_get_custom_resource(
+                hostname, "pod", custom, selector=selector,
+                field_selector=field_selector)
 
         if not pod_status and pod_count != 0:
             selection_text = ''
@@ -1237,14 +1619,20 @@ def get_pvc_status(hostname, pvc_name):
     return output
 
 
-def wait_for_pvcs_be_bound(hostname, pvc_names, timeout=300, wait_step=10):
+def wait_for_pvcs_be_bound(hostname, pvc_names, timeout=300, wait_step=10,
+                           selector=None):
     """Wait for bunch of PVCs to be in 'Bound' state.
 
+    All the PVCs get listed once per check, so amount of 'oc' calls
+    doesn't depend on the amount of PVCs to be waited for.
+
     Args:
         hostname (str): hostname on which oc commands will be executed.
         pvc_names (iterable): bunch of PVC names to be waited for.
         timeout (int): total time in seconds we should wait for 'Bound' state.
         wait_step (int): seconds to sleep before checking PVCs again.
+        selector (str): optional. Label selector to narrow the list of PVCs
+            requested on each check, like 'app=foo'.
     Raises: exceptions.ExecutionError in case of errors.
     Returns: None
     """
@@ -1252,29 +1640,36 @@ def wait_for_pvcs_be_bound(hostname, pvc_names, timeout=300, wait_step=10):
     if len(pvc_names[0]) == 1:
         pvc_names = (pvc_names, )
     pvc_data = {pvc_name: {'state': 'not_checked'} for pvc_name in pvc_names}
-    for pvc_name in pvc_names:
-        pvc_not_found_counter = 0
-        for w in _waiter:
-            output = get_pvc_status(hostname, pvc_name)
+    pending_pvc_names = list(pvc_data.keys())
+    pvc_not_found_counters = dict.fromkeys(pending_pvc_names, 0)
+    for w in _waiter:
+        pvc_states = dict(
+            pvc for pvc in oc_get_custom_resource(
+                hostname, 'pvc', [':.metadata.name', ':.status.phase'],
+                selector=selector)
+            if len(pvc) == 2)
+        for pvc_name in pending_pvc_names[:]:
+            output = pvc_states.get(pvc_name)
             pvc_data[pvc_name]['state'] = output
+            msg = None
             if not output:
                 g.log.info("PVC '%s' not found, sleep for %ssec." % (
                     pvc_name, wait_step))
                 pvc_data[pvc_name]['state'] = 'not_found'
-                if pvc_not_found_counter > 0:
+                if pvc_not_found_counters[pvc_name] > 0:
                     msg = ("PVC '%s' has not been found 2 times already. Make "
                            "sure you provided correct PVC name." % pvc_name)
                 else:
-                    pvc_not_found_counter += 1
+                    pvc_not_found_counters[pvc_name] += 1
                     continue
-            elif output == "Pending":
+            elif output in ("Pending", "<none>"):
                 g.log.info("PVC '%s' is in Pending state, sleep for %ssec" % (
                     pvc_name, wait_step))
                 continue
             elif output == "Bound":
                 g.log.info("PVC '%s' is in Bound state." % pvc_name)
-                _waiter._attempt = 0
-                break
+                pending_pvc_names.remove(pvc_name)
+                continue
             elif output == "Error":
                 msg = "PVC '%s' is in 'Error' state." % pvc_name
                 g.log.error(msg)
@@ -1283,6 +1678,8 @@ def wait_for_pvcs_be_bound(hostname, pvc_names, timeout=300, wait_step=10):
                 g.log.error(msg)
             if msg:
                 raise AssertionError(msg)
+        if not pending_pvc_names:
+            break
     if _waiter.expired:
         # Gather more info for ease of debugging
         for pvc_name in pvc_names:
@@ -1507,6 +1904,12 @@ def get_events(hostname,
             "type": "Normal"
         }
     """
+    event_store = kube_watch.get_event_store(hostname)
+    if event_store is not None:
+        return copy.deepcopy(event_store.find(
+            obj_name=obj_name, obj_namespace=obj_namespace, obj_type=obj_type,
+            event_reason=event_reason, event_type=event_type))
+
     field_selector = []
     if obj_name:
         field_selector.append('involvedObject.name=%s' % obj_name)
@@ -1518,12 +1921,14 @@ def get_events(hostname,
         field_selector.append('reason=%s' % event_reason)
     if event_type:
         field_selector.append('type=%s' % event_type)
-    cmd = "oc get events -o yaml"
-    if openshift_version.get_openshift_version() >= '3.9':
+    cmd = "oc get events -o json"
+    is_field_selector_supported = (
+        openshift_version.get_openshift_version() >= '3.9')
+    if is_field_selector_supported:
         cmd += " --field-selector %s" % ",".join(field_selector or "''")
     get_objects = command.cmd_run(cmd, hostname=hostname)
-    objects = yaml.load(get_objects, Loader=yaml.FullLoader)['items']
-    if openshift_version.get_openshift_version() >= '3.9':
+    objects = utils.load_json_or_yaml(get_objects)['items']
+    if is_field_selector_supported:
         return objects
 
     # Backup approach for OCP3.6 and OCP3.7 which do not have
@@ -1549,7 +1954,8 @@ def wait_for_events(hostname,
                     event_reason=None, event_type=None,
                     timeout=120, wait_step=3):
     """Wait for appearence of specific set of events."""
-    for w in waiter.Waiter(timeout, wait_step):
+    _waiter = _get_waiter(hostname, "events", timeout, wait_step)[1]
+    for w in _waiter:
         events = get_events(
             hostname=hostname, obj_name=obj_name, obj_namespace=obj_namespace,
             obj_type=obj_type, event_reason=event_reason,
@@ -2023,9 +2429,24 @@ def oc_patch(ocp_node, rtype, rname, changes, raise_on_error=True):
         raise exceptions.ExecutionError(
             "Json %s is not serializable to string")
 
-    cmd = ['oc', 'patch', rtype, rname, '-p', '\'%s\'' % changes]
-    out = command.cmd_run(
-        cmd, hostname=ocp_node, raise_on_error=raise_on_error)
+    out = None
+    client, resource = _get_kube_api(ocp_node, rtype)
+    if client:
+        try:
+            client.patch(resource, rname, json.loads(changes))
+            out = "%s/%s patched" % (rtype, rname)
+        except exceptions.KubeAPIError as e:
+            if e.status is not None and not raise_on_error:
+                return None
+            if not _is_kube_api_unreachable(ocp_node, e):
+                raise
+
+    if out is None:
+        cmd = ['oc', 'patch', rtype, rname, '-p', '\'%s\'' % changes]
+        out = command.cmd_run(
+            cmd, hostname=ocp_node, raise_on_error=raise_on_error)
+    if rtype in ("dc", "deploymentconfig") and rname == HEKETI_DC:
+        HEKETI_ENDPOINT.invalidate()
     return out or None
 
 
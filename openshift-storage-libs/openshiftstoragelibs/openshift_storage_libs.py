@@ -5,7 +5,10 @@ from glusto.core import Glusto as g
 import six
 import yaml
 
-from openshiftstoragelibs.command import cmd_run
+from openshiftstoragelibs.command import (
+    cmd_run,
+    cmd_run_many,
+)
 from openshiftstoragelibs.exceptions import (
     ExecutionError,
     NotSupportedException,
@@ -41,14 +44,14 @@ def validate_multipath_pod(hostname, podname, hacount, mpath):
 
     pod_nodename = pod_nodename_list[0]
     active_node_count, enable_node_count = (1, hacount - 1)
-    cmd = "multipath -ll %s | grep 'status=active' | wc -l" % mpath
-    active_count = int(cmd_run(cmd, pod_nodename))
+    cmd = "multipath -ll %s | grep 'status=%s' | wc -l"
+    (_, active_count, _), (_, enable_count, _) = cmd_run_many(
+        pod_nodename, [cmd % (mpath, 'active'), cmd % (mpath, 'enabled')])
+    active_count, enable_count = int(active_count), int(enable_count)
     assert active_node_count == active_count, (
         "Active node count on %s for %s is %s and not 1" % (
             pod_nodename, podname, active_count))
 
-    cmd = "multipath -ll %s | grep 'status=enabled' | wc -l" % mpath
-    enable_count = int(cmd_run(cmd, pod_nodename))
     assert enable_node_count == enable_count, (
         "Passive node count on %s for %s is %s and not %s" % (
             pod_nodename, podname, enable_count, enable_node_count))
@@ -159,14 +162,18 @@ def get_iscsi_session(node, iqn=None, raise_on_error=True):
         ExecutionError: In case of any failure if raise_on_error=True.
     """
 
+    out = cmd_run(
+        _get_iscsi_session_cmd(iqn), node, raise_on_error=raise_on_error)
+
+    return out.split("\n") if out else out
+
+
+def _get_iscsi_session_cmd(iqn=None):
     cmd = "set -o pipefail && ((iscsiadm -m session"
     if iqn:
         cmd += " | grep %s" % iqn
     cmd += ") | awk '{print $3}' | cut -d ':' -f 1)"
-
-    out = cmd_run(cmd, node, raise_on_error=raise_on_error)
-
-    return out.split("\n") if out else out
+    return cmd
 
 
 def get_iscsi_block_devices_by_path(node, iqn=None, raise_on_error=True):
@@ -180,13 +187,22 @@ def get_iscsi_block_devices_by_path(node, iqn=None, raise_on_error=True):
     raises:
         ExecutionError: In case of any failure if raise_on_error=True.
     """
+    out = cmd_run(
+        _get_iscsi_block_devices_cmd(iqn), node,
+        raise_on_error=raise_on_error)
+
+    return _parse_iscsi_block_devices(out)
+
+
+def _get_iscsi_block_devices_cmd(iqn=None):
     cmd = "set -o pipefail && ((ls --format=context /dev/disk/by-path/ip*"
     if iqn:
         cmd += " | grep %s" % iqn
     cmd += ") | awk -F '/|:|-' '{print $10,$25}')"
+    return cmd
 
-    out = cmd_run(cmd, node, raise_on_error=raise_on_error)
 
+def _parse_iscsi_block_devices(out):
     if not out:
         return out
 
@@ -209,10 +225,44 @@ def get_mpath_name_from_device_name(node, device, raise_on_error=True):
     Raises:
         ExecutionError: In case of any failure if raise_on_error=True.
     """
-    cmd = ("set -o pipefail && ((lsblk -n --list --output=NAME /dev/%s)"
-           " | tail -1)" % device)
+    return cmd_run(
+        _get_mpath_name_cmd(device), node, raise_on_error=raise_on_error)
+
+
+def _get_mpath_name_cmd(device):
+    return ("set -o pipefail && ((lsblk -n --list --output=NAME /dev/%s)"
+            " | tail -1)" % device)
+
+
+def get_iscsi_sessions_devices_and_mpaths(node, iqn):
+    """Get iscsi sessions, block devices and their mpath names at once.
+
+    Replaces sequential calls of 'get_iscsi_session',
+    'get_iscsi_block_devices_by_path' and 'get_mpath_name_from_device_name'
+    with two batched remote calls.
+
+    Args:
+        node (str): where we want to run the command.
+        iqn (str): name of iqn.
+    Returns:
+        tuple: list of session ip's, dict of block devices and their ip's
+            and dict of block devices and their mpath names.
+    Raises:
+        AssertionError: In case of any failure.
+    """
+    (_, sessions, _), (_, devices, _) = cmd_run_many(
+        node, [_get_iscsi_session_cmd(iqn), _get_iscsi_block_devices_cmd(iqn)])
+    sessions = sessions.split("\n") if sessions else sessions
+    devices = _parse_iscsi_block_devices(devices)
 
-    return cmd_run(cmd, node, raise_on_error=raise_on_error)
+    mpaths = {}
+    if devices:
+        device_names = list(devices.keys())
+        results = cmd_run_many(
+            node, [_get_mpath_name_cmd(device) for device in device_names])
+        for device, (_, mpath, _) in zip(device_names, results):
+            mpaths[device] = mpath
+    return sessions, devices, mpaths
 
 
 def get_active_and_enabled_devices_from_mpath(node, mpath):
@@ -230,8 +280,9 @@ def get_active_and_enabled_devices_from_mpath(node, mpath):
     cmd = ("set -o pipefail && ((multipath -ll %s | grep -A 1 status=%s)"
            r" | grep -v '\-\-' | cut -d ':' -f 4 | awk '{print $2}')")
 
-    active = cmd_run(cmd % (mpath, 'active'), node).split('\n')[1::2]
-    enabled = cmd_run(cmd % (mpath, 'enabled'), node).split('\n')[1::2]
+    (_, active, _), (_, enabled, _) = cmd_run_many(
+        node, [cmd % (mpath, 'active'), cmd % (mpath, 'enabled')])
+    active, enabled = active.split('\n')[1::2], enabled.split('\n')[1::2]
 
     out_dic = {
         'active': active,
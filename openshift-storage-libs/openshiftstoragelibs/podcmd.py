@@ -47,17 +47,32 @@ lifetime of a function that addresses both hosts and pods.
 
 from collections import namedtuple
 from functools import partial, wraps
+import threading
 
 from glusto.core import Glusto as g
-import mock
 import six
 
+from openshiftstoragelibs.command import is_pod_not_found_error
 from openshiftstoragelibs import openshift_ops
 
 # Define a namedtuple that allows us to address pods instead of just
 # hosts,
 Pod = namedtuple('Pod', 'node podname')
 
+# NOTE: 'oc' commands which get Gluster PODs placement call 'g.run' which
+# may be patched by 'GlustoPod'. Such nested calls of the current thread
+# go to the original run method using this flag, because patching 'g.run'
+# back is not thread-safe.
+_LOCAL = threading.local()
+
+
+def _call_with_orig_run(func, *args, **kwargs):
+    _LOCAL.depth = getattr(_LOCAL, "depth", 0) + 1
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _LOCAL.depth -= 1
+
 
 def run(target, command, user=None, log_level=None, orig_run=g.run):
     """Function that runs a command on a host or in a pod via a host.
@@ -85,21 +100,29 @@ def run(target, command, user=None, log_level=None, orig_run=g.run):
     # NOTE: orig_run captures the glusto run method at function
     # definition time in order to capture the method before
     # any additional monkeypatching by other code
+    return _run(target, command, user, log_level, orig_run)
+
+
+def _run(target, command, user, log_level, orig_run, rerun=True):
+    if getattr(_LOCAL, "depth", 0):
+        return orig_run(target, command, user=user, log_level=log_level)
 
     ocp_client_node = list(g.config['ocp_servers']['client'].keys())[0]
-    with mock.patch.object(g, 'run', new=orig_run):
-        gluster_pods = openshift_ops.get_ocp_gluster_pod_details(
-            ocp_client_node)
+    gluster_pods = _call_with_orig_run(
+        openshift_ops.GLUSTER_TOPOLOGY.get_pods, ocp_client_node)
 
+    orig_target, is_cached_pod = target, False
     if target == 'auto_get_gluster_endpoint':
         if gluster_pods:
             target = Pod(ocp_client_node, gluster_pods[0]["pod_name"])
+            is_cached_pod = True
         else:
             target = list(g.config.get("gluster_servers", {}).keys())[0]
     elif not isinstance(target, Pod) and gluster_pods:
         for g_pod in gluster_pods:
             if target in (g_pod['pod_host_ip'], g_pod['pod_hostname']):
                 target = Pod(ocp_client_node, g_pod['pod_name'])
+                is_cached_pod = True
                 break
 
     if isinstance(target, Pod):
@@ -111,7 +134,21 @@ def run(target, command, user=None, log_level=None, orig_run=g.run):
 
         # unpack the tuple to make sure our return value exactly matches
         # our docstring
-        return g.run(target.node, cmd, user=user, log_level=log_level)
+        ret, out, err = orig_run(
+            target.node, cmd, user=user, log_level=log_level)
+
+        # NOTE: POD name taken from the cache may be outdated because of
+        # POD respin, so rerun the command once using fresh data in such
+        # case.
+        if (ret != 0 and is_cached_pod and rerun
+                and is_pod_not_found_error(
+                    err, target.podname)):
+            if _call_with_orig_run(
+                    openshift_ops.GLUSTER_TOPOLOGY.is_pod_gone,
+                    ocp_client_node, target.podname):
+                return _run(orig_target, command, user, log_level, orig_run,
+                            rerun=False)
+        return ret, out, err
     else:
         return orig_run(target, command, user=user, log_level=log_level)
 
@@ -0,0 +1,404 @@
+"""Reconciliation of the storage inventories of all the layers.
+
+PVCs, PVs, Heketi volumes, Heketi block volumes, Gluster volumes and
+Gluster block volumes get listed once each, and then get indexed by their
+names and IDs. Relations between the layers are checked using these
+indexes only, so reconciliation takes linear time on the amount of the
+objects.
+
+Checked relations:
+    - PVC 'spec.volumeName' and PV 'spec.claimRef';
+    - file PV 'gluster.kubernetes.io/heketi-volume-id' annotation and
+      'spec.glusterfs.path' and ID and name of the Heketi volume;
+    - block PV 'gluster.org/volume-id' annotation and ID of the Heketi
+      block volume;
+    - names of the Heketi and Gluster volumes;
+    - name and block hosting volume of the Heketi block volume and
+      'gluster-block list' output of that block hosting volume.
+
+Objects which miss their counterpart in the adjacent layer are orphans.
+Objects which have the counterpart with inconsistent data, for example,
+PV pointing to the Heketi volume with another name, are mismatches.
+
+Example:
+    >>> inventory = StorageInventory.collect(ocp_node, h_node, h_url)
+    >>> report = reconcile(inventory, pvc_prefixes=["autotests-pvc"])
+    >>> report.assert_consistent()
+"""
+
+import collections
+import re
+
+from glusto.core import Glusto as g
+import six
+
+from openshiftstoragelibs import gluster_ops
+from openshiftstoragelibs import heketi_ops
+from openshiftstoragelibs import openshift_ops
+
+
+PVC = "pvc"
+PV = "pv"
+HEKETI_VOLUME = "heketi_volume"
+GLUSTER_VOLUME = "gluster_volume"
+HEKETI_BLOCK_VOLUME = "heketi_block_volume"
+GLUSTER_BLOCK_VOLUME = "gluster_block_volume"
+LAYERS = (
+    PVC, PV, HEKETI_VOLUME, GLUSTER_VOLUME, HEKETI_BLOCK_VOLUME,
+    GLUSTER_BLOCK_VOLUME)
+
+HEKETI_DB_VOLUME = "heketidbstorage"
+FILE_PROVISIONER = "kubernetes.io/glusterfs"
+BLOCK_PROVISIONER = "gluster.org/glusterblock"
+HEKETI_VOLUME_ID_ANNOTATION = "gluster.kubernetes.io/heketi-volume-id"
+BLOCK_VOLUME_ID_ANNOTATION = "gluster.org/volume-id"
+PROVISIONER_ANNOTATION = "pv.kubernetes.io/provisioned-by"
+
+_HEKETI_BLOCK_VOLUME_RE = re.compile(r"Id:(\S+)\s+Cluster:(\S+)\s+Name:(\S+)")
+
+
+class StorageInventory(object):
+    """Indexed storage objects of all the layers.
+
+    Args:
+        pvcs (list): PVC dicts.
+        pvs (list): PV dicts.
+        heketi_volumes (list): Heketi volume info dicts, like the ones of
+            the 'heketi-cli topology info --json' output.
+        heketi_block_volumes (list): '(id, cluster, name)' tuples of the
+            Heketi block volumes. None means that Heketi block volumes were
+            not listed, and neither they nor block PVs are checked.
+        gluster_volumes (list): names of the Gluster volumes.
+        gluster_block_volumes (dict): names of the block hosting volumes
+            and lists of the names of their block volumes. None means that
+            Gluster block volumes were not listed and are not checked.
+        namespaces (set): projects which PVCs were listed. PVs claimed in
+            other projects are ignored. Projects of the listed PVCs are
+            always included.
+
+    Attributes:
+        pvcs (dict): '(namespace, name)' tuples and PVC dicts.
+        pvs (dict): PV names and PV dicts.
+        heketi_volumes (dict): Heketi volume IDs and volume dicts.
+        heketi_volume_ids (dict): Heketi volume names and IDs.
+        heketi_block_volumes (dict): Heketi block volume IDs and
+            '(id, cluster, name)' tuples or None.
+        block_hosting_volumes (dict): Heketi block volume IDs and IDs of
+            their block hosting volumes.
+        gluster_volumes (set): names of the Gluster volumes.
+        gluster_block_volumes (set): '(block hosting volume name, block
+            volume name)' tuples or None.
+    """
+
+    def __init__(self, pvcs, pvs, heketi_volumes, heketi_block_volumes,
+                 gluster_volumes, gluster_block_volumes=None,
+                 namespaces=None):
+        self.pvcs = dict(
+            ((pvc["metadata"].get("namespace"), pvc["metadata"]["name"]), pvc)
+            for pvc in pvcs)
+        self.namespaces = set(namespaces or ()) | set(
+            namespace for namespace, _name in self.pvcs)
+        self.pvs = dict((pv["metadata"]["name"], pv) for pv in pvs)
+        self.heketi_volumes = dict(
+            (volume["id"], volume) for volume in heketi_volumes)
+        self.heketi_volume_ids = dict(
+            (volume["name"], volume["id"]) for volume in heketi_volumes)
+        self.heketi_block_volumes = None
+        if heketi_block_volumes is not None:
+            self.heketi_block_volumes = dict(
+                (block_volume[0], tuple(block_volume))
+                for block_volume in heketi_block_volumes)
+        self.block_hosting_volumes = {}
+        for volume in heketi_volumes:
+            for block_volume_id in (volume.get("blockinfo") or {}).get(
+                    "blockvolume") or []:
+                self.block_hosting_volumes[block_volume_id] = volume["id"]
+        self.gluster_volumes = set(gluster_volumes)
+        self.gluster_block_volumes = None
+        if gluster_block_volumes is not None:
+            self.gluster_block_volumes = set(
+                (vol_name, block_name)
+                for vol_name, block_names in gluster_block_volumes.items()
+                for block_name in block_names)
+
+    @classmethod
+    def collect(cls, ocp_node, heketi_client_node, heketi_server_url,
+                g_node="auto_get_gluster_endpoint", namespaces=None,
+                block=True):
+        """List storage objects of all the layers once.
+
+        Independent inventories are listed concurrently. Gluster block
+        volumes are listed after the Heketi ones to know block hosting
+        volumes.
+
+        Args:
+            ocp_node (str): node to run 'oc' commands on.
+            heketi_client_node (str): node to run 'heketi-cli' commands on.
+            heketi_server_url (str): Heketi server URL.
+            g_node (str): Gluster node or POD to run 'gluster' commands
+                on. Default value means all the Gluster PODs or nodes.
+            namespaces (set): see the class args. Defaults to the storage
+                project set in the 'openshift' config section.
+            block (bool): whether block volumes should be listed and
+                checked.
+        Returns:
+            StorageInventory: new inventory.
+        """
+        if namespaces is None:
+            namespaces = [g.config.get("openshift", {}).get(
+                "storage_project_name", "glusterfs")]
+
+        def get_heketi_block_volumes():
+            if not block:
+                return None
+            return _HEKETI_BLOCK_VOLUME_RE.findall(
+                heketi_ops.heketi_blockvolume_list(
+                    heketi_client_node, heketi_server_url) or "")
+
+        pvcs, pvs, topology, heketi_block_volumes, gluster_volumes = (
+            heketi_ops.map_parallel(lambda func: func(), (
+                lambda: openshift_ops.oc_get_yaml(
+                    ocp_node, "pvc").get("items", []),
+                lambda: openshift_ops.oc_get_all_pvs(
+                    ocp_node).get("items", []),
+                lambda: heketi_ops.HeketiTopology.get(
+                    heketi_client_node, heketi_server_url),
+                get_heketi_block_volumes,
+                lambda: gluster_ops.get_gluster_vol_names(g_node),
+            )))
+
+        gluster_block_volumes = None
+        if block:
+            gluster_vol_names = set(gluster_volumes)
+            bhv_names = [
+                volume["name"] for volume in topology.volumes.values()
+                if volume.get("block")
+                and volume["name"] in gluster_vol_names]
+            gluster_block_volumes = {}
+            if bhv_names:
+                gluster_block_volumes = gluster_ops.get_block_volumes_by_bhv(
+                    bhv_names, g_node=g_node)
+
+        return cls(
+            pvcs, pvs, list(topology.volumes.values()), heketi_block_volumes,
+            gluster_volumes, gluster_block_volumes, namespaces=namespaces)
+
+
+class ReconciliationReport(object):
+    """Orphans and mismatches found by the 'reconcile' function.
+
+    Keys of the objects are '<namespace>/<name>' for PVCs, names for PVs
+    and Gluster volumes, IDs for Heketi volumes and Heketi block volumes
+    and '<block hosting volume name>/<name>' for Gluster block volumes.
+
+    Attributes:
+        orphans (dict): layers and sets of the keys of the objects which
+            miss their counterparts.
+        mismatches (dict): layers and dicts of the keys of the objects and
+            descriptions of their inconsistencies.
+        reasons (dict): '(layer, key)' tuples and lists of the missing
+            counterparts of the orphans.
+    """
+
+    def __init__(self):
+        self.orphans = dict((layer, set()) for layer in LAYERS)
+        self.mismatches = dict((layer, {}) for layer in LAYERS)
+        self.reasons = collections.defaultdict(list)
+
+    def add_orphan(self, layer, key, reason):
+        self.orphans[layer].add(key)
+        self.reasons[(layer, key)].append(reason)
+
+    def add_mismatch(self, layer, key, description):
+        descriptions = self.mismatches[layer]
+        if key in descriptions:
+            description = "%s; %s" % (descriptions[key], description)
+        descriptions[key] = description
+
+    def is_consistent(self):
+        return not any(self.orphans.values()) and not any(
+            self.mismatches.values())
+
+    def get_message(self, limit=20):
+        """Get human readable description of the found issues.
+
+        Args:
+            limit (int): max amount of the objects reported per layer.
+        Returns:
+            str: line per issue grouped by layers.
+        """
+        lines = []
+        for layer in LAYERS:
+            orphans = sorted(self.orphans[layer])
+            if orphans:
+                lines.append("%d orphaned %s objects:" % (
+                    len(orphans), layer))
+                lines.extend(
+                    "    %s: %s" % (key, ", ".join(self.reasons[(layer, key)]))
+                    for key in orphans[:limit])
+                if len(orphans) > limit:
+                    lines.append("    ...")
+            mismatches = sorted(self.mismatches[layer].items())
+            if mismatches:
+                lines.append("%d mismatched %s objects:" % (
+                    len(mismatches), layer))
+                lines.extend(
+                    "    %s: %s" % item for item in mismatches[:limit])
+                if len(mismatches) > limit:
+                    lines.append("    ...")
+        return "\n".join(lines)
+
+    def assert_consistent(self):
+        """Raise AssertionError describing issues if any are found."""
+        if not self.is_consistent():
+            err_msg = "Storage inventories do not match:\n%s" % (
+                self.get_message())
+            g.log.error(err_msg)
+            raise AssertionError(err_msg)
+
+
+def _is_block_provisioner(provisioner):
+    # NOTE: block provisioner name may have custom suffix, like
+    # 'gluster.org/glusterblock-app-storage'.
+    return (provisioner or "").startswith(BLOCK_PROVISIONER)
+
+
+def _get_annotation(obj, name):
+    return (obj["metadata"].get("annotations") or {}).get(name)
+
+
+def reconcile(inventory, pvc_prefixes=None):
+    """Find orphans and mismatches between the inventories of all layers.
+
+    Args:
+        inventory (StorageInventory): listed storage objects.
+        pvc_prefixes (list|str): if provided, then only PVCs and PVs which
+            claim names start with one of them are reported, as well as
+            Heketi and Gluster volumes and block volumes which names
+            contain one of them, because they are named after PVCs.
+            All the objects are used to find counterparts.
+    Returns:
+        ReconciliationReport: found issues.
+    """
+    if isinstance(pvc_prefixes, six.string_types):
+        pvc_prefixes = [pvc_prefixes]
+    pvc_prefixes = tuple(pvc_prefixes or ())
+
+    def is_pvc_in_scope(name):
+        return not pvc_prefixes or (name or "").startswith(pvc_prefixes)
+
+    def is_volume_in_scope(name):
+        return not pvc_prefixes or any(
+            prefix in (name or "") for prefix in pvc_prefixes)
+
+    report = ReconciliationReport()
+    pvcs, pvs = inventory.pvcs, inventory.pvs
+    heketi_volumes = inventory.heketi_volumes
+    heketi_block_volumes = inventory.heketi_block_volumes
+
+    # PVC -> PV
+    for (namespace, name), pvc in pvcs.items():
+        if not is_pvc_in_scope(name):
+            continue
+        key = "%s/%s" % (namespace, name)
+        pv_name = pvc.get("spec", {}).get("volumeName")
+        if not pv_name:
+            if pvc.get("status", {}).get("phase") == "Bound":
+                report.add_mismatch(PVC, key, "bound without volume name")
+            continue
+        pv = pvs.get(pv_name)
+        if pv is None:
+            report.add_orphan(PVC, key, "no PV %s" % pv_name)
+            continue
+        claim = pv["spec"].get("claimRef") or {}
+        if (claim.get("namespace"), claim.get("name")) != (namespace, name):
+            report.add_mismatch(PVC, key, "PV %s is claimed by %s/%s" % (
+                pv_name, claim.get("namespace"), claim.get("name")))
+
+    # PV -> PVC, Heketi volume and Heketi block volume
+    claimed_volume_ids, claimed_block_volume_ids = set(), set()
+    for name, pv in pvs.items():
+        claim = pv["spec"].get("claimRef") or {}
+        provisioner = _get_annotation(pv, PROVISIONER_ANNOTATION)
+        volume_id = _get_annotation(pv, HEKETI_VOLUME_ID_ANNOTATION)
+        block_volume_id = _get_annotation(pv, BLOCK_VOLUME_ID_ANNOTATION)
+        if provisioner == FILE_PROVISIONER and volume_id:
+            claimed_volume_ids.add(volume_id)
+        elif _is_block_provisioner(provisioner) and block_volume_id:
+            claimed_block_volume_ids.add(block_volume_id)
+
+        if claim and claim.get("namespace") not in inventory.namespaces:
+            continue
+        if not is_pvc_in_scope(claim.get("name")):
+            continue
+        if not claim:
+            report.add_orphan(PV, name, "no claim")
+        elif (claim.get("namespace"), claim.get("name")) not in pvcs:
+            report.add_orphan(PV, name, "no PVC %s/%s" % (
+                claim.get("namespace"), claim.get("name")))
+
+        if provisioner == FILE_PROVISIONER:
+            volume = heketi_volumes.get(volume_id)
+            path = pv["spec"].get("glusterfs", {}).get("path")
+            if volume is None:
+                report.add_orphan(PV, name, "no Heketi volume %s" % volume_id)
+            elif path != volume["name"]:
+                report.add_mismatch(PV, name, (
+                    "path %s differs from name %s of Heketi volume %s" % (
+                        path, volume["name"], volume_id)))
+        elif (_is_block_provisioner(provisioner)
+                and heketi_block_volumes is not None):
+            if block_volume_id not in heketi_block_volumes:
+                report.add_orphan(PV, name, "no Heketi block volume %s" % (
+                    block_volume_id))
+
+    # Heketi volume -> PV and Gluster volume
+    for volume_id, volume in heketi_volumes.items():
+        if not is_volume_in_scope(volume["name"]):
+            continue
+        if (not volume.get("block") and volume["name"] != HEKETI_DB_VOLUME
+                and volume_id not in claimed_volume_ids):
+            report.add_orphan(HEKETI_VOLUME, volume_id, "no PV")
+        if volume["name"] not in inventory.gluster_volumes:
+            report.add_orphan(HEKETI_VOLUME, volume_id, (
+                "no Gluster volume %s" % volume["name"]))
+
+    # Gluster volume -> Heketi volume
+    for vol_name in inventory.gluster_volumes:
+        if (is_volume_in_scope(vol_name)
+                and vol_name not in inventory.heketi_volume_ids):
+            report.add_orphan(GLUSTER_VOLUME, vol_name, "no Heketi volume")
+
+    # Heketi block volume -> PV and Gluster block volume
+    heketi_block_keys = set()
+    for block_volume_id, (_id, _cluster, name) in (
+            (heketi_block_volumes or {}).items()):
+        bhv = heketi_volumes.get(
+            inventory.block_hosting_volumes.get(block_volume_id))
+        if bhv is not None:
+            heketi_block_keys.add((bhv["name"], name))
+        if not is_volume_in_scope(name):
+            continue
+        if block_volume_id not in claimed_block_volume_ids:
+            report.add_orphan(HEKETI_BLOCK_VOLUME, block_volume_id, "no PV")
+        if bhv is None:
+            report.add_mismatch(
+                HEKETI_BLOCK_VOLUME, block_volume_id,
+                "block hosting volume is unknown")
+        elif (inventory.gluster_block_volumes is not None
+                and (bhv["name"], name)
+                not in inventory.gluster_block_volumes):
+            report.add_orphan(
+                HEKETI_BLOCK_VOLUME, block_volume_id,
+                "no Gluster block volume %s/%s" % (bhv["name"], name))
+
+    # Gluster block volume -> Heketi block volume
+    if heketi_block_volumes is not None:
+        for vol_name, name in inventory.gluster_block_volumes or ():
+            if (is_volume_in_scope(name)
+                    and (vol_name, name) not in heketi_block_keys):
+                report.add_orphan(
+                    GLUSTER_BLOCK_VOLUME, "%s/%s" % (vol_name, name),
+                    "no Heketi block volume")
+
+    return report
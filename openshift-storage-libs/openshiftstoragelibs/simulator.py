@@ -0,0 +1,1480 @@
+"""Local simulator of the OpenShift cluster with containerized Gluster.
+
+'ClusterSimulator' is a transport (see 'transport' module) which serves
+commands issued by the library from an in-memory model of the cluster
+instead of running them over SSH. It allows to run and load-test the
+library logic, such as 'ScaleUpBaseClass' helpers, on thousands of objects
+without a real cluster.
+
+Following commands are emulated:
+    - 'oc get' with default, 'wide', 'name', 'json', 'yaml' and
+      'custom-columns' output formats, label and field selectors;
+    - 'oc create -f -', 'oc delete', 'oc version', 'oc project',
+      'oc exec' and 'oc rsh';
+    - 'heketi-cli' volume create/list/info/delete, blockvolume list/info,
+      cluster list, node list/info and topology info commands;
+    - 'gluster' volume list/info/status/heal info, heal-count statistics
+      and peer status commands;
+    - 'gluster-block list';
+    - 'rpm -q' for getting package versions;
+    - 'echo', 'grep', 'awk', 'cut', 'head', 'tail' and 'wc' as parts
+      of pipelines;
+    - 'sh -c' with the ' ; ' separated commands.
+
+PVCs of the storage classes with 'kubernetes.io/glusterfs' provisioner
+get Heketi volume and PV created and become 'Bound' after 'bind_delay'
+seconds. Deletion of such PVCs deletes their PV and Heketi volume after
+'delete_delay' seconds. Deployment configs get their PODs created which
+become 'Running' after 'pod_start_delay' seconds. Volumes get entries
+to be healed using the 'set_heal_entries' method.
+
+Example:
+    >>> g.set_transport(ClusterSimulator(nodes=3, pvcs=1000, latency=0.1))
+    >>> openshift_ops.oc_get_pods(ocp_node, selector='glusterfs-node=pod')
+"""
+
+import collections
+import copy
+import datetime
+import heapq
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import random
+import re
+import shlex
+import threading
+import time
+try:
+    import xml.etree.cElementTree as etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+import six
+import yaml
+
+from openshiftstoragelibs import kube_api
+from openshiftstoragelibs import kube_watch
+from openshiftstoragelibs import transport
+from openshiftstoragelibs import utils
+
+
+FILE_PROVISIONER = "kubernetes.io/glusterfs"
+HEKETI_MOUNTS_DIR = "/var/lib/heketi/mounts"
+FIRST_BRICK_PORT = 49152
+PACKAGE_VERSIONS = {
+    "heketi": "9.0.0-9.el7rhgs",
+    "heketi-client": "9.0.0-9.el7rhgs",
+    "glusterfs": "6.0-30.1.el7rhgs",
+    "glusterfs-server": "6.0-30.1.el7rhgs",
+    "gluster-block": "0.2.1-36.el7rhgs",
+}
+OPENSHIFT_VERSION = "v3.11.219"
+KUBERNETES_VERSION = "v1.11.0+d4cacc0"
+
+_AWK_PRINT_RE = re.compile(r"^\{\s*print\s+\$(\d+)\s*\}$")
+_SIZE_RE = re.compile(r"^(\d+)([KMGT]i)?$")
+_SIZE_UNITS = {None: 1, "Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30,
+               "Ti": 2 ** 40}
+
+
+class _CommandError(Exception):
+    """Failure of the simulated command with its return code."""
+
+    def __init__(self, err, ret=1):
+        super(_CommandError, self).__init__(err)
+        self.err, self.ret = err, ret
+
+
+def _get_timestamp(now):
+    return datetime.datetime.utcfromtimestamp(now).strftime(
+        "%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_size_gi(size):
+    """Convert Kubernetes quantity like '1Gi' to the amount of GiB."""
+    match = _SIZE_RE.match(six.text_type(size).strip())
+    if not match:
+        raise _CommandError("Quantity '%s' is not supported." % size)
+    amount = int(match.group(1)) * _SIZE_UNITS[match.group(2)]
+    return max(-(-amount // _SIZE_UNITS["Gi"]), 1)
+
+
+def _format_table(rows):
+    """Align columns the way 'oc' does using 3 spaces as padding."""
+    if not rows:
+        return ""
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "".join(
+        "   ".join(value.ljust(width) for value, width in zip(row, widths))
+        .rstrip() + "\n" for row in rows)
+
+
+def _split_options(args, options_with_value=()):
+    """Split command args to the positional ones and the options.
+
+    Args:
+        args (list): command args.
+        options_with_value (tuple): names of options like '-o' or
+            '--selector' which take value from the next arg if it is not
+            provided using '=' or, for short options, without separator.
+    Returns:
+        tuple: list of positional args and dict of options.
+    """
+    positional, options = [], {}
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg == "--":
+            positional.extend(args)
+            break
+        elif not arg.startswith("-") or arg == "-":
+            positional.append(arg)
+            continue
+        name, value = arg, True
+        if "=" in arg:
+            name, value = arg.split("=", 1)
+        elif arg in options_with_value:
+            value = args.pop(0) if args else ""
+        else:
+            for option in options_with_value:
+                if (not option.startswith("--") and arg.startswith(option)
+                        and arg != option):
+                    name, value = option, arg[len(option):]
+                    break
+        options[name] = value
+    return positional, options
+
+
+class ClusterSimulator(object):
+    """Transport serving commands from an in-memory cluster model.
+
+    Args:
+        nodes (int): amount of Gluster nodes, each one with Gluster POD.
+        devices_per_node (int): amount of Heketi devices on each node.
+        device_size (int): size of each device in GiB.
+        pvcs (int): amount of bound PVCs to be created on start.
+        volumes (int): amount of Heketi volumes not related to PVCs
+            to be created on start.
+        block_volumes (int): amount of Heketi block volumes to be
+            created on start.
+        block_hosting_volume_size (int): size in GiB of the block hosting
+            volumes created for the block volumes.
+        namespace (str): project where all the objects live.
+        heketi_dc_name (str): name of the Heketi deployment config.
+        storage_class (str): name of the file storage class to be created
+            on start and to be used for the PVCs created on start.
+        pvc_name_prefix (str): name prefix of the PVCs created on start.
+        volume_name_prefix (str): 'volumenameprefix' parameter of the
+            storage class created on start.
+        latency (float|dict): seconds each command takes. Dict allows
+            to set it per command, i.e. '{"oc": 0.2, "heketi-cli": 0.5,
+            "gluster": 1, "default": 0.1}'.
+        bind_delay (float): seconds after which PVCs get bound.
+        delete_delay (float): seconds after which PVs and Heketi volumes
+            of the deleted PVCs get deleted.
+        pod_start_delay (float): seconds after which PODs get running.
+        max_bricks_per_process (int): amount of bricks multiplexed into
+            one brick process after which new process gets started.
+        seed (int): seed of the generator of IDs and names.
+    """
+
+    def __init__(self, nodes=3, devices_per_node=1, device_size=16384,
+                 pvcs=0, volumes=0, block_volumes=0,
+                 block_hosting_volume_size=100, namespace="glusterfs",
+                 heketi_dc_name="heketi-storage",
+                 storage_class="glusterfs-storage",
+                 pvc_name_prefix="autotests-pvc", volume_name_prefix=None,
+                 latency=0,
+                 bind_delay=0, delete_delay=0, pod_start_delay=0,
+                 max_bricks_per_process=250, seed=None):
+        self.namespace = namespace
+        self.latency = latency
+        self.max_bricks_per_process = max_bricks_per_process
+        self.block_hosting_volume_size = block_hosting_volume_size
+        self.bind_delay, self.delete_delay, self.pod_start_delay = 0, 0, 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._timers, self._timer_seq = [], 0
+        self._resource_version = 0
+        self._objects = collections.defaultdict(dict)
+        self._cluster_id = self._get_id()
+        self._nodes = collections.OrderedDict()
+        self._devices = collections.OrderedDict()
+        self._bricks = collections.OrderedDict()
+        self._volumes = collections.OrderedDict()
+        self._block_volumes = collections.OrderedDict()
+        self._brick_processes = collections.defaultdict(list)
+        self._process_by_brick = {}
+        self._shd_pids = {}
+        # NOTE: amount of the served commands per program like 'oc',
+        # 'heketi-cli' or 'gluster' including the ones run inside of PODs.
+        self.stats = collections.Counter()
+
+        for i in range(1, nodes + 1):
+            self._add_gluster_node(
+                "gluster-node-%d.example.com" % i, "10.70.46.%d" % (10 + i),
+                devices_per_node, device_size, zone=(i - 1) % 3 + 1)
+        self._create_volume(2, name="heketidbstorage")
+        self._create_dc(heketi_dc_name, {
+            "glusterfs": "heketi-storage-pod", "heketi": "storage-pod"},
+            "heketi")
+        self._create_object({
+            "apiVersion": "storage.k8s.io/v1",
+            "kind": "StorageClass",
+            "metadata": {"name": storage_class},
+            "parameters": {
+                "resturl": "http://heketi-storage.%s.svc:8080" % namespace,
+                "restuser": "admin",
+                "secretName": "heketi-storage-admin-secret",
+                "secretNamespace": namespace,
+            },
+            "provisioner": FILE_PROVISIONER,
+            "reclaimPolicy": "Delete",
+        })
+        if volume_name_prefix:
+            self._get_object("StorageClass", storage_class)["parameters"][
+                "volumenameprefix"] = volume_name_prefix
+        for i in range(pvcs):
+            self._create_object({
+                "apiVersion": "v1",
+                "kind": "PersistentVolumeClaim",
+                "metadata": {"name": "%s-%05d" % (pvc_name_prefix, i)},
+                "spec": {
+                    "accessModes": ["ReadWriteOnce"],
+                    "resources": {"requests": {"storage": "1Gi"}},
+                    "storageClassName": storage_class,
+                },
+            })
+        for i in range(volumes):
+            self._create_volume(1)
+        for i in range(block_volumes):
+            self._create_block_volume(1)
+        self._advance()
+
+        # NOTE: initial objects are ready right after the start.
+        self.bind_delay = bind_delay
+        self.delete_delay = delete_delay
+        self.pod_start_delay = pod_start_delay
+
+    # Cluster model
+
+    def _get_id(self):
+        return "%032x" % self._random.getrandbits(128)
+
+    def _get_suffix(self, length=5):
+        return "".join(
+            self._random.choice("bcdfghjklmnpqrstvwxz2456789")
+            for _ in range(length))
+
+    def _schedule(self, delay, func, *args):
+        heapq.heappush(
+            self._timers, (time.time() + delay, self._timer_seq, func, args))
+        self._timer_seq += 1
+
+    def _advance(self):
+        """Apply all the scheduled changes which are due."""
+        now = time.time()
+        while self._timers and self._timers[0][0] <= now:
+            _due, _seq, func, args = heapq.heappop(self._timers)
+            func(*args)
+
+    def _add_gluster_node(self, hostname, ip, devices, device_size, zone):
+        node_id = self._get_id()
+        self._nodes[node_id] = {
+            "id": node_id, "cluster": self._cluster_id, "zone": zone,
+            "hostnames": {"manage": [hostname], "storage": [ip]},
+            "state": "online", "devices": [], "peer_id": self._get_id(),
+        }
+        for i in range(devices):
+            device_id = self._get_id()
+            self._devices[device_id] = {
+                "id": device_id, "name": "/dev/sd%s" % chr(ord("b") + i),
+                "node": node_id, "state": "online", "tags": {},
+                "total": device_size * 2 ** 20, "used": 0, "bricks": [],
+                "pv_uuid": "%032x" % self._random.getrandbits(128),
+            }
+            self._nodes[node_id]["devices"].append(device_id)
+        self._shd_pids[ip] = self._random.randint(300, 30000)
+        self._create_object({
+            "apiVersion": "v1", "kind": "Node",
+            "metadata": {"name": hostname, "labels": {
+                "glusterfs": "storage-host",
+                "kubernetes.io/hostname": hostname}},
+            "status": {"addresses": [
+                {"type": "InternalIP", "address": ip},
+                {"type": "Hostname", "address": hostname}]},
+        })
+        self._create_pod(
+            "glusterfs-storage-%s" % self._get_suffix(),
+            {"glusterfs": "storage-pod", "glusterfs-node": "pod"},
+            "glusterfs", hostname, ip)
+
+    def _get_node_ip(self, hostname):
+        for node in self._nodes.values():
+            if hostname in node["hostnames"]["manage"]:
+                return node["hostnames"]["storage"][0]
+        return None
+
+    def _create_pod(self, name, labels, container, node_name, ip=None):
+        """Create POD which gets running after the start delay."""
+        pod = self._create_object({
+            "apiVersion": "v1", "kind": "Pod",
+            "metadata": {"name": name, "labels": labels},
+            "spec": {
+                "containers": [{"name": container, "image": container}],
+                "nodeName": node_name,
+            },
+            "status": {
+                "phase": "Pending",
+                "hostIP": self._get_node_ip(node_name),
+                "containerStatuses": [{
+                    "name": container, "ready": False, "restartCount": 0,
+                    "state": {"waiting": {"reason": "ContainerCreating"}},
+                }],
+            },
+        })
+        self._schedule(
+            self.pod_start_delay, self._start_pod, name,
+            pod["metadata"]["uid"], ip or "10.128.%d.%d" % (
+                self._random.randint(0, 255), self._random.randint(2, 254)))
+        return pod
+
+    def _start_pod(self, name, uid, ip):
+        pod = self._get_object("Pod", name)
+        if pod is None or pod["metadata"]["uid"] != uid:
+            return
+        pod["status"]["phase"] = "Running"
+        pod["status"]["podIP"] = ip
+        for status in pod["status"]["containerStatuses"]:
+            status["ready"] = True
+            status["state"] = {"running": {
+                "startedAt": _get_timestamp(time.time())}}
+        self._touch(pod)
+
+    def _create_dc(self, name, labels, container, replicas=1):
+        self._create_object({
+            "apiVersion": "apps.openshift.io/v1",
+            "kind": "DeploymentConfig",
+            "metadata": {"name": name, "labels": dict(labels)},
+            "spec": {
+                "replicas": replicas,
+                "selector": {"deploymentconfig": name},
+                "template": {
+                    "metadata": {"labels": dict(labels)},
+                    "spec": {"containers": [
+                        {"name": container, "image": container}]},
+                },
+            },
+        })
+
+    def _deploy(self, dc):
+        """Create PODs of the deployment config spreading them by nodes."""
+        name = dc["metadata"]["name"]
+        template = dc["spec"].get("template", {})
+        labels = dict(template.get("metadata", {}).get("labels") or {})
+        labels.update({
+            "deploymentconfig": name, "deployment": "%s-1" % name})
+        containers = template.get("spec", {}).get("containers") or [{}]
+        hostnames = [n["hostnames"]["manage"][0]
+                     for n in self._nodes.values()]
+        for i in range(int(dc["spec"].get("replicas", 1))):
+            self._create_pod(
+                "%s-1-%s" % (name, self._get_suffix()), dict(labels),
+                containers[0].get("name", name),
+                hostnames[i % len(hostnames)] if hostnames else None)
+        dc["status"] = {
+            "replicas": dc["spec"].get("replicas", 1), "latestVersion": 1}
+
+    def _touch(self, obj):
+        self._resource_version += 1
+        obj["metadata"]["resourceVersion"] = six.text_type(
+            self._resource_version)
+
+    def _get_object(self, kind, name):
+        return self._objects[kind].get(name)
+
+    def _create_object(self, obj):
+        """Add API object to the cluster and start its controllers."""
+        kind = obj.get("kind")
+        resource = kube_api.KINDS.get(kind)
+        if resource is None:
+            raise _CommandError(
+                'error: unable to recognize "STDIN": no matches for kind '
+                '"%s"' % kind)
+        metadata = obj.setdefault("metadata", {})
+        name = metadata.get("name")
+        if not name and metadata.get("generateName"):
+            name = metadata["name"] = (
+                metadata["generateName"] + self._get_suffix())
+        if not name:
+            raise _CommandError(
+                "error: resource name may not be empty")
+        if name in self._objects[kind]:
+            raise _CommandError(
+                'Error from server (AlreadyExists): error when creating '
+                '"STDIN": %s "%s" already exists' % (
+                    resource["plural"], name))
+        if resource["namespaced"]:
+            metadata["namespace"] = self.namespace
+        metadata.setdefault("labels", {})
+        metadata["uid"] = "%s-%s-%s-%s-%s" % tuple(
+            self._get_id()[i:j] for i, j in (
+                (0, 8), (8, 12), (12, 16), (16, 20), (20, 32)))
+        metadata["creationTimestamp"] = _get_timestamp(time.time())
+        self._touch(obj)
+        self._objects[kind][name] = obj
+
+        if kind == "PersistentVolumeClaim":
+            obj["status"] = {"phase": "Pending"}
+            self._schedule(
+                self.bind_delay, self._provision, name, metadata["uid"])
+        elif kind == "DeploymentConfig":
+            self._deploy(obj)
+        elif kind == "Pod" and not obj.get("status"):
+            obj["status"] = {"phase": "Running", "containerStatuses": [
+                {"name": c.get("name"), "ready": True, "restartCount": 0,
+                 "state": {"running": {}}}
+                for c in obj.get("spec", {}).get("containers", [])]}
+        return obj
+
+    def _delete_object(self, kind, name):
+        obj = self._objects[kind].pop(name)
+        if kind == "PersistentVolumeClaim":
+            volume_name = obj.get("spec", {}).get("volumeName")
+            if volume_name:
+                self._schedule(
+                    self.delete_delay, self._reclaim, volume_name)
+        elif kind == "DeploymentConfig":
+            for pod_name, pod in list(self._objects["Pod"].items()):
+                if pod["metadata"]["labels"].get(
+                        "deploymentconfig") == name:
+                    del self._objects["Pod"][pod_name]
+
+    def _add_event(self, obj, event_type, reason, message):
+        self._create_object({
+            "apiVersion": "v1", "kind": "Event",
+            "metadata": {"name": "%s.%x" % (
+                obj["metadata"]["name"], self._random.getrandbits(64))},
+            "involvedObject": {
+                "kind": obj["kind"], "name": obj["metadata"]["name"],
+                "namespace": self.namespace, "uid": obj["metadata"]["uid"]},
+            "reason": reason, "message": message, "type": event_type,
+            "count": 1, "source": {"component": "persistentvolume-controller"},
+        })
+
+    def _provision(self, pvc_name, uid):
+        """Create Heketi volume and PV for the PVC and bind them."""
+        pvc = self._get_object("PersistentVolumeClaim", pvc_name)
+        if pvc is None or pvc["metadata"]["uid"] != uid:
+            return
+        spec = pvc.setdefault("spec", {})
+        sc_name = spec.get("storageClassName") or pvc["metadata"].get(
+            "annotations", {}).get("volume.beta.kubernetes.io/storage-class")
+        sc = self._get_object("StorageClass", sc_name)
+        if sc is None or sc.get("provisioner") != FILE_PROVISIONER:
+            self._add_event(
+                pvc, "Warning", "ProvisioningFailed",
+                'storageclass.storage.k8s.io "%s" not found' % sc_name)
+            return
+        size = _parse_size_gi(
+            spec.get("resources", {}).get("requests", {}).get(
+                "storage", "1Gi"))
+        prefix = sc.get("parameters", {}).get("volumenameprefix")
+        name = None
+        if prefix:
+            name = "%s_%s_%s_%%s" % (prefix, self.namespace, pvc_name)
+        try:
+            volume = self._create_volume(size, name=name)
+        except _CommandError as e:
+            self._add_event(pvc, "Warning", "ProvisioningFailed", e.err)
+            return
+
+        pv_name = "pvc-%s" % uid
+        self._create_object({
+            "apiVersion": "v1", "kind": "PersistentVolume",
+            "metadata": {
+                "name": pv_name,
+                "annotations": {
+                    "Description": (
+                        "Gluster-Internal: Dynamically provisioned PV"),
+                    "gluster.kubernetes.io/heketi-volume-id": volume["id"],
+                    "gluster.org/type": "file",
+                    "kubernetes.io/createdby": "heketi-dynamic-provisioner",
+                    "pv.beta.kubernetes.io/gid": six.text_type(
+                        volume["gid"]),
+                    "pv.kubernetes.io/bound-by-controller": "yes",
+                    "pv.kubernetes.io/provisioned-by": FILE_PROVISIONER,
+                },
+            },
+            "spec": {
+                "accessModes": spec.get("accessModes", ["ReadWriteOnce"]),
+                "capacity": {"storage": "%dGi" % size},
+                "claimRef": {
+                    "apiVersion": "v1", "kind": "PersistentVolumeClaim",
+                    "name": pvc_name, "namespace": self.namespace,
+                    "resourceVersion": pvc["metadata"]["resourceVersion"],
+                    "uid": uid,
+                },
+                "glusterfs": {
+                    "endpoints": "glusterfs-dynamic-%s" % uid,
+                    "path": volume["name"],
+                },
+                "persistentVolumeReclaimPolicy": sc.get(
+                    "reclaimPolicy", "Delete"),
+                "storageClassName": sc_name,
+            },
+            "status": {"phase": "Bound"},
+        })
+        spec["volumeName"] = pv_name
+        pvc["metadata"].setdefault("annotations", {}).update({
+            "pv.kubernetes.io/bind-completed": "yes",
+            "pv.kubernetes.io/bound-by-controller": "yes",
+            "volume.beta.kubernetes.io/storage-provisioner": (
+                FILE_PROVISIONER),
+        })
+        pvc["status"] = {
+            "phase": "Bound",
+            "accessModes": spec.get("accessModes", ["ReadWriteOnce"]),
+            "capacity": {"storage": "%dGi" % size},
+        }
+        self._touch(pvc)
+        self._add_event(
+            pvc, "Normal", "ProvisioningSucceeded",
+            "Successfully provisioned volume %s using kubernetes.io/"
+            "glusterfs" % pv_name)
+
+    def _reclaim(self, pv_name):
+        pv = self._get_object("PersistentVolume", pv_name)
+        if pv is None:
+            return
+        if pv["spec"].get("persistentVolumeReclaimPolicy") != "Delete":
+            pv["status"]["phase"] = "Released"
+            self._touch(pv)
+            return
+        volume_id = pv["metadata"]["annotations"].get(
+            "gluster.kubernetes.io/heketi-volume-id")
+        if volume_id in self._volumes:
+            self._delete_volume(volume_id)
+        del self._objects["PersistentVolume"][pv_name]
+
+    def _create_volume(self, size, name=None, replica=3, options=None,
+                       block=False):
+        """Create Heketi volume placing bricks on the least used nodes.
+
+        Args:
+            size (int): size of the volume in GiB.
+            name (str): volume name. '%s' in it gets replaced with ID.
+            replica (int): amount of bricks to be placed on different nodes.
+            options (list): Gluster volume options.
+            block (bool): whether the volume is block hosting one.
+        Returns:
+            dict: Heketi volume info without bricks.
+        """
+        brick_size = size * 2 ** 20
+        candidates = []
+        for node in self._nodes.values():
+            devices = [self._devices[d] for d in node["devices"]
+                       if self._devices[d]["state"] == "online"]
+            if node["state"] != "online" or not devices:
+                continue
+            device = max(devices, key=lambda d: d["total"] - d["used"])
+            if device["total"] - device["used"] >= brick_size:
+                candidates.append(device)
+        if len(candidates) < replica:
+            raise _CommandError(
+                "Error: Failed to allocate new volume: No space", ret=255)
+        candidates.sort(key=lambda d: d["total"] - d["used"], reverse=True)
+
+        volume_id = self._get_id()
+        name = name or "vol_%s"
+        volume = {
+            "id": volume_id,
+            "name": name % volume_id if "%s" in name else name,
+            "size": size, "cluster": self._cluster_id,
+            "replica": replica, "bricks": [],
+            "gid": self._random.randint(2000, 2147483647),
+            "options": list(options or []),
+            "block": block, "block_volumes": [],
+        }
+        for device in candidates[:replica]:
+            brick_id = self._get_id()
+            node = self._nodes[device["node"]]
+            self._bricks[brick_id] = {
+                "id": brick_id,
+                "path": "%s/vg_%s/brick_%s/brick" % (
+                    HEKETI_MOUNTS_DIR, device["id"], brick_id),
+                "device": device["id"], "node": node["id"],
+                "volume": volume_id, "size": brick_size,
+            }
+            device["used"] += brick_size
+            device["bricks"].append(brick_id)
+            volume["bricks"].append(brick_id)
+            self._attach_brick(node["hostnames"]["storage"][0], brick_id)
+        self._volumes[volume_id] = volume
+        return volume
+
+    def _create_block_volume(self, size, name=None):
+        """Create Heketi block volume on the block hosting volume which
+        has enough free space or on the new one.
+
+        Args:
+            size (int): size of the block volume in GiB.
+            name (str): block volume name. '%s' in it gets replaced with ID.
+        Returns:
+            dict: Heketi block volume info.
+        """
+        for volume in self._volumes.values():
+            if volume["block"] and self._get_free_size(volume) >= size:
+                break
+        else:
+            volume = self._create_volume(
+                max(self.block_hosting_volume_size, size),
+                name="vol_%s", block=True)
+        block_volume_id = self._get_id()
+        name = name or "blockvol_%s"
+        block_volume = {
+            "id": block_volume_id,
+            "name": name % block_volume_id if "%s" in name else name,
+            "size": size, "volume": volume["id"],
+        }
+        volume["block_volumes"].append(block_volume_id)
+        self._block_volumes[block_volume_id] = block_volume
+        return block_volume
+
+    def _get_free_size(self, volume):
+        return volume["size"] - sum(
+            self._block_volumes[b]["size"] for b in volume["block_volumes"])
+
+    def _delete_volume(self, volume_id):
+        volume = self._volumes.pop(volume_id)
+        for brick_id in volume["bricks"]:
+            brick = self._bricks.pop(brick_id)
+            device = self._devices[brick["device"]]
+            device["used"] -= brick["size"]
+            device["bricks"].remove(brick_id)
+            self._process_by_brick.pop(brick_id)["bricks"].discard(brick_id)
+
+    def _attach_brick(self, host, brick_id):
+        """Multiplex brick into the brick process having free slots."""
+        processes = self._brick_processes[host]
+        for process in processes:
+            if len(process["bricks"]) < self.max_bricks_per_process:
+                break
+        else:
+            process = {
+                "pid": self._random.randint(300, 30000),
+                "port": FIRST_BRICK_PORT + len(processes), "bricks": set(),
+            }
+            processes.append(process)
+        process["bricks"].add(brick_id)
+        self._process_by_brick[brick_id] = process
+
+    # Heketi
+
+    def _get_brick_info(self, brick_id):
+        return dict(self._bricks[brick_id])
+
+    def _get_volume_info(self, volume_id):
+        volume = self._volumes[volume_id]
+        hosts = [
+            self._nodes[self._bricks[b]["node"]]["hostnames"]["storage"][0]
+            for b in volume["bricks"]]
+        return {
+            "size": volume["size"], "name": volume["name"],
+            "durability": {
+                "type": "replicate" if volume["replica"] > 1 else "none",
+                "replicate": {"replica": volume["replica"]},
+                "disperse": {},
+            },
+            "gid": volume["gid"],
+            "glustervolumeoptions": volume["options"] or ["", ""],
+            "snapshot": {"enable": True, "factor": 1},
+            "id": volume_id, "cluster": volume["cluster"],
+            "mount": {"glusterfs": {
+                "hosts": hosts,
+                "device": "%s:%s" % (hosts[0], volume["name"]),
+                "options": {"backup-volfile-servers": ",".join(hosts[1:])},
+            }},
+            "block": volume["block"],
+            "blockinfo": {
+                "freesize": self._get_free_size(volume), "reservedsize": 0,
+                "blockvolume": list(volume["block_volumes"]),
+            } if volume["block"] else {},
+            "bricks": [self._get_brick_info(b) for b in volume["bricks"]],
+        }
+
+    def _get_block_volume_info(self, block_volume_id):
+        block_volume = self._block_volumes[block_volume_id]
+        volume = self._volumes[block_volume["volume"]]
+        hosts = [
+            self._nodes[self._bricks[b]["node"]]["hostnames"]["storage"][0]
+            for b in volume["bricks"]]
+        return {
+            "id": block_volume_id, "name": block_volume["name"],
+            "size": block_volume["size"], "cluster": volume["cluster"],
+            "blockhostingvolume": volume["id"], "hacount": len(hosts),
+            "blockvolume": {
+                "hosts": hosts, "username": "", "password": "",
+                "iqn": "iqn.2016-12.org.gluster-block:%s" % block_volume_id,
+                "lun": 0,
+            },
+        }
+
+    def _get_device_info(self, device_id):
+        device = self._devices[device_id]
+        return {
+            "name": device["name"], "id": device_id,
+            "state": device["state"], "tags": dict(device["tags"]),
+            "pv_uuid": device["pv_uuid"],
+            "storage": {
+                "total": device["total"], "used": device["used"],
+                "free": device["total"] - device["used"],
+            },
+            "bricks": [self._get_brick_info(b) for b in device["bricks"]],
+        }
+
+    def _get_node_info(self, node_id):
+        node = self._nodes[node_id]
+        return {
+            "zone": node["zone"], "id": node_id,
+            "cluster": node["cluster"], "state": node["state"],
+            "hostnames": copy.deepcopy(node["hostnames"]),
+            "devices": [self._get_device_info(d) for d in node["devices"]],
+        }
+
+    @staticmethod
+    def _format_heketi_volume(info):
+        return (
+            "Name: %(name)s\nSize: %(size)s\nVolume Id: %(id)s\n"
+            "Cluster Id: %(cluster)s\nMount: %(device)s\n"
+            "Mount Options: backup-volfile-servers=%(backup)s\n"
+            "Block: %(block)s\nFree Size: %(free)s\nReserved Size: 0\n"
+            "Block Hosting Restriction: (none)\nBlock Volumes: [%(blocks)s]\n"
+            "Durability Type: %(type)s\nDistribute Count: 1\n"
+            "Replica Count: %(replica)s\n" % dict(
+                info, device=info["mount"]["glusterfs"]["device"],
+                block="true" if info["block"] else "false",
+                free=info["blockinfo"].get("freesize", 0),
+                blocks=" ".join(info["blockinfo"].get("blockvolume", [])),
+                backup=info["mount"]["glusterfs"]["options"][
+                    "backup-volfile-servers"],
+                type=info["durability"]["type"],
+                replica=info["durability"]["replicate"]["replica"]))
+
+    def _run_heketi_cli(self, args):
+        positional, options = _split_options(args, (
+            "-s", "--server", "--user", "--secret", "--size", "--name",
+            "--replica", "--durability", "--gluster-volume-options",
+            "--clusters"))
+        as_json = "--json" in options
+        command, params = tuple(positional[:2]), positional[2:]
+        if "--version" in options:
+            return "heketi-cli v%s\n" % PACKAGE_VERSIONS["heketi-client"]
+
+        if command == ("volume", "create"):
+            replica = int(options.get("--replica", 3))
+            if options.get("--durability") == "none":
+                replica = 1
+            volume_options = options.get("--gluster-volume-options")
+            volume = self._create_volume(
+                int(options.get("--size", 1)),
+                name=options.get("--name"), replica=replica,
+                options=volume_options.split(",") if volume_options else [])
+            info = self._get_volume_info(volume["id"])
+            if as_json:
+                return json.dumps(info)
+            return self._format_heketi_volume(info)
+        elif command == ("volume", "list"):
+            if as_json:
+                return json.dumps({"volumes": list(self._volumes)})
+            return "".join(
+                "Id:%s    Cluster:%s    Name:%s%s\n" % (
+                    v["id"], v["cluster"], v["name"],
+                    " [block]" if v["block"] else "")
+                for v in self._volumes.values())
+        elif command in (("volume", "info"), ("volume", "delete")):
+            if not params or params[0] not in self._volumes:
+                raise _CommandError("Error: Id not found", ret=255)
+            if command[1] == "delete":
+                if self._volumes[params[0]]["block_volumes"]:
+                    raise _CommandError(
+                        "Error: Cannot delete a block hosting volume "
+                        "containing block volumes", ret=255)
+                self._delete_volume(params[0])
+                return "Volume %s deleted\n" % params[0]
+            info = self._get_volume_info(params[0])
+            if as_json:
+                return json.dumps(info)
+            return self._format_heketi_volume(info)
+        elif command == ("cluster", "list"):
+            if as_json:
+                return json.dumps({"clusters": [self._cluster_id]})
+            return "Clusters:\nId:%s [file][block]\n" % self._cluster_id
+        elif command == ("node", "list"):
+            return "".join(
+                "Id:%s\tCluster:%s\n" % (n, self._cluster_id)
+                for n in self._nodes)
+        elif command == ("node", "info"):
+            if not params or params[0] not in self._nodes:
+                raise _CommandError("Error: Id not found", ret=255)
+            info = self._get_node_info(params[0])
+            if as_json:
+                return json.dumps(info)
+            return "Node Id: %s\nState: %s\nCluster Id: %s\nZone: %s\n" % (
+                info["id"], info["state"], info["cluster"], info["zone"])
+        elif command == ("topology", "info") and as_json:
+            return json.dumps({"clusters": [{
+                "id": self._cluster_id, "file": True, "block": True,
+                "volumes": [self._get_volume_info(v) for v in self._volumes],
+                "nodes": [self._get_node_info(n) for n in self._nodes],
+                "blockvolumes": list(self._block_volumes),
+            }]})
+        elif command == ("blockvolume", "list"):
+            if as_json:
+                return json.dumps({"blockvolumes": list(self._block_volumes)})
+            return "".join(
+                "Id:%s    Cluster:%s    Name:%s\n" % (
+                    b, self._cluster_id, b_info["name"])
+                for b, b_info in self._block_volumes.items())
+        elif command == ("blockvolume", "info") and as_json:
+            if not params or params[0] not in self._block_volumes:
+                raise _CommandError("Error: Id not found", ret=255)
+            return json.dumps(self._get_block_volume_info(params[0]))
+        raise _CommandError(
+            "Error: 'heketi-cli %s' is not supported by the cluster "
+            "simulator" % " ".join(args))
+
+    # Gluster
+
+    def _get_xml_output(self, name):
+        root = etree.Element("cliOutput")
+        for tag, text in (("opRet", "0"), ("opErrno", "0"), ("opErrstr", "")):
+            etree.SubElement(root, tag).text = text
+        return root, etree.SubElement(root, name)
+
+    @staticmethod
+    def _add_xml_fields(parent, *fields):
+        for tag, text in fields:
+            etree.SubElement(parent, tag).text = six.text_type(text)
+
+    def _get_brick_host_and_path(self, brick_id):
+        brick = self._bricks[brick_id]
+        node = self._nodes[brick["node"]]
+        return node["hostnames"]["storage"][0], brick["path"], node
+
+    def _get_volumes_by_name(self, name):
+        if name in (None, "all"):
+            return list(self._volumes.values())
+        volumes = [v for v in self._volumes.values() if v["name"] == name]
+        if not volumes:
+            raise _CommandError(
+                "Volume %s does not exist" % name, ret=1)
+        return volumes
+
+    def _get_volume_status_xml(self, name):
+        root, parent = self._get_xml_output("volStatus")
+        volumes_xml = etree.SubElement(parent, "volumes")
+        for volume in self._get_volumes_by_name(name):
+            volume_xml = etree.SubElement(volumes_xml, "volume")
+            hosts = []
+            nodes_xml = []
+            for brick_id in volume["bricks"]:
+                host, path, node = self._get_brick_host_and_path(brick_id)
+                hosts.append(host)
+                process = self._process_by_brick[brick_id]
+                port = process["port"]
+                node_xml = etree.Element("node")
+                self._add_xml_fields(
+                    node_xml, ("hostname", host), ("path", path),
+                    ("peerid", node["peer_id"]), ("status", 1),
+                    ("port", port))
+                ports_xml = etree.SubElement(node_xml, "ports")
+                self._add_xml_fields(
+                    ports_xml, ("tcp", port), ("rdma", "N/A"))
+                self._add_xml_fields(
+                    node_xml, ("pid", process["pid"]))
+                nodes_xml.append(node_xml)
+            if volume["replica"] > 1:
+                for host in hosts:
+                    node_xml = etree.Element("node")
+                    self._add_xml_fields(
+                        node_xml, ("hostname", "Self-heal Daemon"),
+                        ("path", host), ("peerid", ""), ("status", 1),
+                        ("port", "N/A"))
+                    ports_xml = etree.SubElement(node_xml, "ports")
+                    self._add_xml_fields(
+                        ports_xml, ("tcp", "N/A"), ("rdma", "N/A"))
+                    self._add_xml_fields(
+                        node_xml, ("pid", self._shd_pids[host]))
+                    nodes_xml.append(node_xml)
+            self._add_xml_fields(
+                volume_xml, ("volName", volume["name"]),
+                ("nodeCount", len(nodes_xml)))
+            volume_xml.extend(nodes_xml)
+            etree.SubElement(volume_xml, "tasks")
+        return etree.tostring(root, encoding="unicode" if six.PY3 else None)
+
+    def _get_volume_info_xml(self, name):
+        root, parent = self._get_xml_output("volInfo")
+        volumes_xml = etree.SubElement(parent, "volumes")
+        volumes = self._get_volumes_by_name(name)
+        for volume in volumes:
+            volume_xml = etree.SubElement(volumes_xml, "volume")
+            replica = volume["replica"]
+            self._add_xml_fields(
+                volume_xml, ("name", volume["name"]), ("id", volume["id"]),
+                ("status", 1), ("statusStr", "Started"),
+                ("brickCount", len(volume["bricks"])),
+                ("distCount", replica), ("replicaCount", replica),
+                ("type", 2 if replica > 1 else 0),
+                ("typeStr", "Replicate" if replica > 1 else "Distribute"),
+                ("transport", 0))
+            bricks_xml = etree.SubElement(volume_xml, "bricks")
+            for brick_id in volume["bricks"]:
+                host, path, node = self._get_brick_host_and_path(brick_id)
+                brick_xml = etree.SubElement(
+                    bricks_xml, "brick", uuid=node["peer_id"])
+                brick_xml.text = "%s:%s" % (host, path)
+                self._add_xml_fields(
+                    brick_xml, ("name", brick_xml.text),
+                    ("hostUuid", node["peer_id"]), ("isArbiter", 0))
+            options = [o.split(" ", 1) for o in volume["options"] if o]
+            self._add_xml_fields(volume_xml, ("optCount", len(options)))
+            options_xml = etree.SubElement(volume_xml, "options")
+            for option in options:
+                option_xml = etree.SubElement(options_xml, "option")
+                self._add_xml_fields(
+                    option_xml, ("name", option[0]),
+                    ("value", option[-1]))
+        self._add_xml_fields(volumes_xml, ("count", len(volumes)))
+        return etree.tostring(root, encoding="unicode" if six.PY3 else None)
+
+    def _get_volume_list_xml(self):
+        root, parent = self._get_xml_output("volList")
+        self._add_xml_fields(parent, ("count", len(self._volumes)))
+        self._add_xml_fields(parent, *[
+            ("volume", v["name"]) for v in self._volumes.values()])
+        return etree.tostring(root, encoding="unicode" if six.PY3 else None)
+
+    def set_heal_entries(self, vol_name, entries, heal_rate=0):
+        """Make the volume have entries to be healed.
+
+        Entries are pending on all the bricks of the volume except the
+        first one, which is considered to be the one which was down.
+
+        Args:
+            vol_name (str): name of the Gluster volume.
+            entries (int): amount of entries to be healed on each brick.
+            heal_rate (float): amount of entries healed per second.
+        """
+        with self._lock:
+            volume = self._get_volumes_by_name(vol_name)[0]
+            volume["heal"] = {
+                "entries": entries, "rate": heal_rate, "start": time.time()}
+
+    def _get_heal_entries(self, volume):
+        heal = volume.get("heal")
+        if not heal:
+            return [0] * len(volume["bricks"])
+        entries = max(heal["entries"] - int(
+            heal["rate"] * (time.time() - heal["start"])), 0)
+        return [0] + [entries] * (len(volume["bricks"]) - 1)
+
+    def _get_heal_info_xml(self, name):
+        volume = self._get_volumes_by_name(name)[0]
+        root, parent = self._get_xml_output("healInfo")
+        bricks_xml = etree.SubElement(parent, "bricks")
+        for brick_id, entries in zip(
+                volume["bricks"], self._get_heal_entries(volume)):
+            host, path, node = self._get_brick_host_and_path(brick_id)
+            brick_xml = etree.SubElement(
+                bricks_xml, "brick", hostUuid=node["peer_id"])
+            self._add_xml_fields(
+                brick_xml, ("name", "%s:%s" % (host, path)),
+                ("status", "Connected"), ("numberOfEntries", entries))
+        return etree.tostring(root, encoding="unicode" if six.PY3 else None)
+
+    def _get_heal_count_output(self, name):
+        volume = self._get_volumes_by_name(name)[0]
+        lines = [
+            "Gathering count of entries to be healed on volume %s has "
+            "been successful " % volume["name"]]
+        for brick_id, entries in zip(
+                volume["bricks"], self._get_heal_entries(volume)):
+            host, path, _node = self._get_brick_host_and_path(brick_id)
+            lines.extend([
+                "", "Brick %s:%s" % (host, path),
+                "Number of entries: %d" % entries])
+        return "\n".join(lines) + "\n"
+
+    def _get_peer_status_xml(self, host):
+        root, parent = self._get_xml_output("peerStatus")
+        for node in self._nodes.values():
+            if host in node["hostnames"]["storage"]:
+                continue
+            peer_xml = etree.SubElement(parent, "peer")
+            self._add_xml_fields(
+                peer_xml, ("uuid", node["peer_id"]),
+                ("hostname", node["hostnames"]["storage"][0]))
+            hostnames_xml = etree.SubElement(peer_xml, "hostnames")
+            self._add_xml_fields(
+                hostnames_xml, ("hostname", node["hostnames"]["storage"][0]))
+            self._add_xml_fields(
+                peer_xml, ("connected", 1), ("state", 3),
+                ("stateStr", "Peer in Cluster"))
+        return etree.tostring(root, encoding="unicode" if six.PY3 else None)
+
+    def _run_gluster(self, args, host):
+        positional, options = _split_options(args, ("--mode",))
+        as_xml = "--xml" in options
+        command = positional[:2]
+        if command and command[0] in ("v", "vol"):
+            command[0] = "volume"
+        if command == ["volume", "list"] and as_xml:
+            return self._get_volume_list_xml()
+        elif command == ["volume", "list"]:
+            return "".join(v["name"] + "\n" for v in self._volumes.values())
+        elif command == ["volume", "heal"] and positional[3:] == ["info"]:
+            if not as_xml:
+                raise _CommandError(
+                    "Only XML output of the heal info is supported by the "
+                    "cluster simulator")
+            return self._get_heal_info_xml(positional[2])
+        elif (command == ["volume", "heal"]
+                and positional[3:] == ["statistics", "heal-count"]):
+            return self._get_heal_count_output(positional[2])
+        elif command == ["volume", "status"] and as_xml:
+            name = positional[2] if len(positional) > 2 else None
+            return self._get_volume_status_xml(name)
+        elif command == ["volume", "info"] and as_xml:
+            name = positional[2] if len(positional) > 2 else None
+            return self._get_volume_info_xml(name)
+        elif command == ["peer", "status"] and as_xml:
+            return self._get_peer_status_xml(host)
+        raise _CommandError(
+            "'gluster %s' is not supported by the cluster simulator" % (
+                " ".join(args)))
+
+    def _run_gluster_block(self, args):
+        positional, options = _split_options(args)
+        if positional[:1] == ["list"] and len(positional) > 1:
+            volume = self._get_volumes_by_name(positional[1])[0]
+            result = {
+                "blocks": [
+                    self._block_volumes[b]["name"]
+                    for b in volume["block_volumes"]],
+                "RESULT": "SUCCESS",
+            }
+            if "--json-pretty" in options:
+                return json.dumps(result, indent=2) + "\n"
+            elif "--json" in options:
+                return json.dumps(result) + "\n"
+            return "".join(name + "\n" for name in result["blocks"])
+        raise _CommandError(
+            "'gluster-block %s' is not supported by the cluster simulator" % (
+                " ".join(args)))
+
+    # OpenShift
+
+    def _get_resource(self, rtype):
+        resource = kube_api.get_resource(rtype.split(".")[0])
+        if resource is None:
+            raise _CommandError(
+                'error: the server doesn\'t have a resource type "%s"' % (
+                    rtype))
+        return resource
+
+    def _get_objects(self, rtype, names, selector, field_selector):
+        resource = self._get_resource(rtype)
+        objects = self._objects[resource["kind"]]
+        if names:
+            result = []
+            for name in names:
+                if name not in objects:
+                    raise _CommandError(
+                        'Error from server (NotFound): %s "%s" not found' % (
+                            resource["plural"], name))
+                result.append(objects[name])
+            return result
+        result = [objects[name] for name in sorted(objects)]
+        if selector:
+            result = [
+                obj for obj in result if kube_watch._match_label_selector(
+                    obj["metadata"].get("labels") or {}, selector)]
+        if field_selector:
+            result = [
+                obj for obj in result if kube_watch._match_field_selector(
+                    obj, field_selector)]
+        return result
+
+    @staticmethod
+    def _get_table(kind, objects, output, no_headers):
+        now = datetime.datetime.utcnow()
+        if kind == "Pod":
+            headers = ["NAME", "READY", "STATUS", "RESTARTS", "AGE"]
+            if output == "wide":
+                headers += ["IP", "NODE"]
+            rows = []
+            for pod in objects:
+                info = kube_api.get_pod_wide_info(pod, now=now)
+                rows.append([pod["metadata"]["name"]] + [
+                    info[h.lower()] for h in headers[1:]])
+        elif kind == "PersistentVolumeClaim":
+            headers = ["NAME", "STATUS", "VOLUME", "CAPACITY",
+                       "ACCESS MODES", "STORAGECLASS", "AGE"]
+            rows = [[
+                pvc["metadata"]["name"], pvc["status"]["phase"],
+                pvc["spec"].get("volumeName", ""),
+                pvc["status"].get("capacity", {}).get("storage", ""),
+                "RWO" if pvc["status"].get("accessModes") else "",
+                pvc["spec"].get("storageClassName", ""),
+                kube_api.get_pod_wide_info(pvc, now=now)["age"],
+            ] for pvc in objects]
+        else:
+            headers = ["NAME", "AGE"]
+            rows = [[
+                obj["metadata"]["name"],
+                kube_api.get_pod_wide_info(obj, now=now)["age"],
+            ] for obj in objects]
+        if not no_headers:
+            rows.insert(0, headers)
+        return _format_table(rows)
+
+    def _run_oc_get(self, args):
+        positional, options = _split_options(args, (
+            "-o", "--output", "-l", "--selector", "--field-selector", "-n",
+            "--namespace", "--template"))
+        if not positional:
+            raise _CommandError(
+                "You must specify the type of resource to get.")
+        rtype, names = positional[0], positional[1:]
+        if "/" in rtype:
+            rtype, name = rtype.split("/", 1)
+            names = [name] + names
+        resource = self._get_resource(rtype)
+        objects = self._get_objects(
+            rtype, names, options.get("-l", options.get("--selector")),
+            options.get("--field-selector"))
+        output = options.get("-o", options.get("--output", ""))
+        no_headers = options.get("--no-headers", False) not in (
+            False, "false")
+
+        if output.startswith("custom-columns="):
+            columns = [
+                c for c in re.split(
+                    r",(?![^\[]*\])", output[len("custom-columns="):])
+                if c.strip()]
+            paths = kube_api.parse_custom_columns(
+                output[len("custom-columns="):])
+            rows = [] if no_headers else [[
+                c.split(":", 1)[0] if ":" in c else c for c in columns]]
+            rows.extend(
+                [kube_api.get_json_path_value(obj, path) for path in paths]
+                for obj in objects)
+            return _format_table(rows)
+        elif output in ("json", "yaml"):
+            if len(names) == 1:
+                data = objects[0]
+            else:
+                data = {
+                    "apiVersion": "v1", "kind": "List", "items": objects,
+                    "metadata": {"resourceVersion": "", "selfLink": ""}}
+            if output == "json":
+                return json.dumps(data, indent=4) + "\n"
+            return yaml.safe_dump(data, default_flow_style=False)
+        elif output == "name":
+            return "".join(
+                "%s/%s\n" % (resource["kind"].lower(), o["metadata"]["name"])
+                for o in objects)
+        elif output in ("", "wide"):
+            if not objects:
+                raise _CommandError("No resources found.", ret=0)
+            return self._get_table(
+                resource["kind"], objects, output, no_headers)
+        raise _CommandError(
+            "error: output format '%s' is not supported by the cluster "
+            "simulator" % output)
+
+    def _run_oc_create(self, args, stdin):
+        positional, options = _split_options(args, ("-f", "--filename"))
+        if options.get("-f", options.get("--filename")) != "-":
+            raise _CommandError(
+                "error: only 'oc create -f -' is supported by the cluster "
+                "simulator")
+        try:
+            data = utils.load_json_or_yaml(stdin)
+        except Exception as e:
+            raise _CommandError("error: error parsing STDIN: %s" % e)
+        items = data.get("items", []) if data.get("kind") == "List" else [
+            data]
+        out = ""
+        for obj in items:
+            obj = self._create_object(copy.deepcopy(obj))
+            out += '%s "%s" created\n' % (
+                obj["kind"].lower(), obj["metadata"]["name"])
+        return out
+
+    def _run_oc_delete(self, args):
+        positional, options = _split_options(args, (
+            "-l", "--selector", "--grace-period", "--wait", "-n"))
+        if not positional:
+            raise _CommandError(
+                "error: You must provide one or more resources")
+        rtype, names = positional[0], positional[1:]
+        if "/" in rtype:
+            rtype, name = rtype.split("/", 1)
+            names = [name] + names
+        selector = options.get("-l", options.get("--selector"))
+        if not (names or selector):
+            raise _CommandError(
+                "error: resource(s) were provided, but no name, label "
+                "selector, or --all flag specified")
+        kind = self._get_resource(rtype)["kind"]
+        if "--ignore-not-found" in options:
+            names = [name for name in names if name in self._objects[kind]]
+            if not (names or selector):
+                return ""
+        out = ""
+        for obj in self._get_objects(rtype, names, selector, None):
+            self._delete_object(kind, obj["metadata"]["name"])
+            out += '%s "%s" deleted\n' % (
+                kind.lower(), obj["metadata"]["name"])
+        return out
+
+    @staticmethod
+    def _split_pod_command(args):
+        """Get POD name and command of the 'oc exec' and 'oc rsh' args."""
+        args = list(args)
+        while args and args[0].startswith("-"):
+            option = args.pop(0)
+            if option in ("-c", "--container") and args:
+                args.pop(0)
+        if not args:
+            return None, []
+        pod_name, args = args[0], args[1:]
+        if args[:1] == ["--"]:
+            args = args[1:]
+        return pod_name, args
+
+    def _run_oc(self, args, stdin):
+        if not args:
+            raise _CommandError("error: oc command is required")
+        command, args = args[0], args[1:]
+        if command == "get":
+            return self._run_oc_get(args)
+        elif command == "create":
+            return self._run_oc_create(args, stdin)
+        elif command == "delete":
+            return self._run_oc_delete(args)
+        elif command == "version":
+            return (
+                "oc %(oc)s\nkubernetes %(k8s)s\nfeatures: Basic-Auth GSSAPI "
+                "Kerberos SPNEGO\n\nServer https://master.example.com:8443\n"
+                "openshift %(oc)s\nkubernetes %(k8s)s\n" % {
+                    "oc": OPENSHIFT_VERSION, "k8s": KUBERNETES_VERSION})
+        elif command == "project":
+            if args:
+                self.namespace = args[0]
+                return 'Now using project "%s" on server.\n' % args[0]
+            return 'Using project "%s" on server.\n' % self.namespace
+        elif command == "logs":
+            return ""
+        elif command in ("exec", "rsh"):
+            pod_name, args = self._split_pod_command(args)
+            if not pod_name:
+                raise _CommandError("error: expected POD name")
+            pod = self._get_objects("pod", [pod_name], None, None)[0]
+            if pod["status"]["phase"] != "Running":
+                raise _CommandError(
+                    "error: unable to upgrade connection: container not "
+                    "found")
+            return self._run_program(
+                args, stdin, pod["status"].get("hostIP"))
+        raise _CommandError(
+            "error: 'oc %s' is not supported by the cluster simulator" % (
+                command))
+
+    # Commands
+
+    @staticmethod
+    def _run_rpm(args):
+        positional, options = _split_options(args, ("--queryformat",))
+        version, release = PACKAGE_VERSIONS.get(
+            positional[-1] if positional else "", "-").split("-", 1)
+        if not version:
+            raise _CommandError(
+                "package %s is not installed" % positional[-1])
+        query_format = options.get("--queryformat")
+        if not query_format:
+            return "%s-%s-%s.x86_64\n" % (positional[-1], version, release)
+        return query_format.replace("%{version}", version).replace(
+            "%{release}", release).replace("\\n", "\n")
+
+    @staticmethod
+    def _filter(args, stdin):
+        """Apply text filter of the pipeline to the output."""
+        lines = stdin.splitlines()
+        program, args = args[0], args[1:]
+        positional, options = _split_options(args, ("-d", "-f", "-n"))
+        if program == "grep":
+            pattern = positional[0] if positional else ""
+            flags = re.I if "-i" in options else 0
+            lines = [line for line in lines if bool(
+                re.search(pattern, line, flags)) != ("-v" in options)]
+        elif program == "awk" and positional:
+            match = _AWK_PRINT_RE.match(positional[0].strip())
+            if not match:
+                raise _CommandError("awk program '%s' is not supported" % (
+                    positional[0]))
+            index = int(match.group(1))
+            lines = [
+                (line.split()[index - 1] if len(line.split()) >= index
+                 else "") if index else line for line in lines]
+        elif program == "cut":
+            delimiter = options.get("-d", "\t")
+            fields = [int(f) for f in options.get("-f", "1").split(",")]
+            lines = [
+                line if delimiter not in line else delimiter.join(
+                    line.split(delimiter)[f - 1] for f in fields
+                    if f <= len(line.split(delimiter)))
+                for line in lines]
+        elif program in ("head", "tail"):
+            amount = int(options.get("-n", 10))
+            lines = lines[:amount] if program == "head" else (
+                lines[-amount:] if amount else [])
+        elif program == "wc" and "-l" in options:
+            return "%d\n" % len(lines)
+        else:
+            raise _CommandError(
+                "'%s' is not supported by the cluster simulator" % program)
+        return "".join(line + "\n" for line in lines)
+
+    def _run_program(self, args, stdin, host):
+        if args and args[0] == "timeout":
+            args = args[2:]
+        if not args:
+            raise _CommandError("command is empty")
+        program = args[0]
+        if program == "oc":
+            return self._run_oc(args[1:], stdin)
+        elif program == "heketi-cli":
+            return self._run_heketi_cli(args[1:])
+        elif program == "gluster":
+            return self._run_gluster(args[1:], host)
+        elif program == "gluster-block":
+            return self._run_gluster_block(args[1:])
+        elif program == "rpm":
+            return self._run_rpm(args[1:])
+        elif program == "echo":
+            return " ".join(args[1:]) + "\n"
+        elif program == "true":
+            return ""
+        elif program in ("sh", "bash") and args[1:2] == ["-c"]:
+            return self._run_script(args[2] if len(args) > 2 else "", host)
+        return self._filter(args, stdin)
+
+    def _run_script(self, script, host):
+        """Run ' ; ' separated commands what is used for batches."""
+        out, err, ret = [], [], 0
+        for command in script.split(" ; "):
+            pipeline, stdout = self._parse_pipeline(command), ""
+            try:
+                for args in pipeline:
+                    stdout = self._run_program(args, stdout, host)
+                ret = 0
+            except _CommandError as e:
+                stdout, ret = "", e.ret
+                err.append(e.err + "\n")
+            out.append(stdout)
+        if ret:
+            raise _CommandError("".join(err), ret=ret)
+        return "".join(out)
+
+    @staticmethod
+    def _parse_pipeline(command):
+        """Split shell command to the list of args of each program."""
+        if not isinstance(command, six.string_types):
+            command = " ".join(command)
+        # NOTE: library separates pipes and redirections with spaces,
+        # so they are separate tokens.
+        pipeline, args = [], []
+        tokens = shlex.split(command)
+        while tokens:
+            token = tokens.pop(0)
+            if token == "|":
+                pipeline.append(args)
+                args = []
+            elif token in ("&>", ">", "2>", ">>", "2>&1"):
+                if token != "2>&1" and tokens:
+                    tokens.pop(0)
+            elif token in ("&&", ";", "||", "&"):
+                raise _CommandError(
+                    "'%s' is not supported by the cluster simulator" % token,
+                    ret=127)
+            else:
+                args.append(token)
+        pipeline.append(args)
+        return pipeline
+
+    def _get_program(self, args):
+        """Get name of the program run by the command args."""
+        if args[:1] == ["timeout"]:
+            args = args[2:]
+        if args[:1] == ["oc"] and args[1:2] in (["exec"], ["rsh"]):
+            _pod_name, pod_args = self._split_pod_command(args[2:])
+            if pod_args:
+                return self._get_program(pod_args)
+        return args[0] if args else ""
+
+    def _get_latency(self, program):
+        if not isinstance(self.latency, dict):
+            return self.latency
+        return self.latency.get(program, self.latency.get("default", 0))
+
+    def execute(self, host, command):
+        """Run shell command against the cluster model.
+
+        Args:
+            host (str): node the command is run on. Used as Gluster node
+                for the 'gluster' commands run not inside of a POD.
+            command (str|list): shell command.
+        Returns:
+            tuple: return code, stdout, stderr and latency of the command.
+        """
+        try:
+            pipeline = self._parse_pipeline(command)
+        except (_CommandError, ValueError) as e:
+            return getattr(e, "ret", 2), "", six.text_type(e), 0
+        programs = [self._get_program(args) for args in pipeline]
+        program = ([p for p in programs if p != "echo"] or programs)[0]
+        with self._lock:
+            self._advance()
+            self.stats[program] += 1
+            out, ret, err = "", 0, ""
+            for args in pipeline:
+                try:
+                    out = self._run_program(args, out, host)
+                except _CommandError as e:
+                    out, ret, err = "", e.ret, e.err + "\n"
+                except Exception as e:
+                    out, ret, err = "", 1, "error: %s\n" % e
+        return ret, out, err, self._get_latency(program)
+
+    def run(self, host, command, user=None):
+        ret, out, err, latency = self.execute(host, command)
+        if latency:
+            time.sleep(latency)
+        return ret, out, err
+
+    def run_async(self, host, command, user=None, log_level=None):
+        start = time.time()
+        ret, out, err, latency = self.execute(host, command)
+
+        def communicate():
+            time.sleep(max(latency - (time.time() - start), 0))
+            return ret, out, err
+        return transport._AsyncResult(communicate)
@@ -0,0 +1,191 @@
+"""Pluggable transports of the 'g.run' and 'g.run_async' commands.
+
+By default, all the commands are run over SSH. Transport set using
+'MonkeyPatchedGlusto.set_transport' replaces it, so the whole library,
+which uses 'command.cmd_run' and 'g.run', works on top of it.
+
+'RecordingTransport' runs commands over SSH and writes each of them with
+its results and duration to a journal. 'ReplayTransport' serves the
+journaled results without any cluster, what allows to profile and
+benchmark the library logic offline.
+
+Journal is a file with JSON line per command:
+'[host, command, return code, stdout, stderr, duration]'. The first line is
+a header with the seed of the 'random' module used during recording, so
+random names generated using 'utils.get_random_str' are the same during
+replay. Journal gets gzip-compressed if its path ends with '.gz'.
+
+Example:
+    >>> g.set_transport(RecordingTransport('/tmp/journal.gz'))
+    >>> heketi_ops.heketi_volume_list(h_node, h_url, json=True)
+    >>> g.set_transport(ReplayTransport('/tmp/journal.gz'))
+    >>> heketi_ops.heketi_volume_list(h_node, h_url, json=True)
+"""
+
+import atexit
+import collections
+import gzip
+import io
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import random
+import threading
+import time
+
+from glusto.core import Glusto as g
+import six
+
+from openshiftstoragelibs import exceptions
+
+
+JOURNAL_VERSION = 1
+
+
+def _get_command_key(host, command):
+    if not isinstance(command, six.string_types):
+        command = " ".join(command)
+    return host, command
+
+
+def _open_journal(path, mode):
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8")
+    return io.open(path, mode, encoding="utf-8")
+
+
+class _AsyncResult(object):
+    """Result of 'run_async' call compatible with the Glusto's one."""
+
+    def __init__(self, communicate):
+        self._communicate = communicate
+        self._result = None
+
+    def async_communicate(self):
+        if self._result is None:
+            self._result = self._communicate()
+        return self._result
+
+
+class RecordingTransport(object):
+    """Transport running commands over SSH and journaling them.
+
+    Args:
+        path (str): path of the journal file to be created.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._journal = _open_journal(path, "w")
+        self.seed = random.randint(0, 2 ** 32 - 1)
+        random.seed(self.seed)
+        self._write({
+            "version": JOURNAL_VERSION, "seed": self.seed,
+            "created": time.time()})
+        atexit.register(self.close)
+
+    def _write(self, entry):
+        line = six.text_type(json.dumps(entry, separators=(",", ":")))
+        with self._lock:
+            if self._journal is not None:
+                self._journal.write(line + u"\n")
+
+    def _record(self, host, command, result, duration):
+        ret, out, err = result
+        self._write([
+            host, command, ret, out, err, round(duration, 6)])
+
+    def run(self, host, command, user=None):
+        start = time.time()
+        result = g._run_over_ssh(host, command, user)
+        self._record(host, command, result, time.time() - start)
+        return result
+
+    def run_async(self, host, command, user=None, log_level=None):
+        start = time.time()
+        proc = g._run_async_over_ssh(
+            host, command, user=user, log_level=log_level)
+
+        def communicate():
+            result = proc.async_communicate()
+            self._record(host, command, result, time.time() - start)
+            return result
+        return _AsyncResult(communicate)
+
+    def close(self):
+        """Flush and close the journal."""
+        with self._lock:
+            journal, self._journal = self._journal, None
+        if journal is not None:
+            journal.close()
+
+
+class ReplayTransport(object):
+    """Transport serving results of the commands from a journal.
+
+    Results of the same command on the same host are served in the order
+    they were recorded. When all of them are served, the last one keeps
+    being returned, so polling loops see the final state.
+
+    Args:
+        path (str): path of the journal file.
+        with_latency (bool): if True, then each command takes as much
+            time as it took during recording.
+        strict (bool): if True, then commands which are absent in
+            the journal cause ExecutionError. Otherwise, they fail with
+            non-zero return code.
+    """
+
+    def __init__(self, path, with_latency=False, strict=True):
+        self.path = path
+        self.with_latency = with_latency
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._responses = collections.defaultdict(collections.deque)
+        with _open_journal(path, "r") as journal:
+            header = json.loads(journal.readline())
+            if header.get("version") != JOURNAL_VERSION:
+                raise exceptions.ConfigError(
+                    "Unsupported version '%s' of the '%s' journal." % (
+                        header.get("version"), path))
+            for line in journal:
+                host, command, ret, out, err, duration = json.loads(line)
+                self._responses[_get_command_key(host, command)].append(
+                    (ret, out, err, duration))
+        self.seed = header["seed"]
+        random.seed(self.seed)
+
+    def _get_response(self, host, command):
+        key = _get_command_key(host, command)
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                msg = "Command '%s' on '%s' host was not recorded." % (
+                    key[1], host)
+                g.log.error(msg)
+                if self.strict:
+                    raise exceptions.ExecutionError(msg)
+                return 1, "", msg, 0
+            if len(responses) > 1:
+                return responses.popleft()
+            return responses[0]
+
+    def run(self, host, command, user=None):
+        ret, out, err, duration = self._get_response(host, command)
+        if self.with_latency:
+            time.sleep(duration)
+        return ret, out, err
+
+    def run_async(self, host, command, user=None, log_level=None):
+        start = time.time()
+        ret, out, err, duration = self._get_response(host, command)
+
+        def communicate():
+            if self.with_latency:
+                time.sleep(max(duration - (time.time() - start), 0))
+            return ret, out, err
+        return _AsyncResult(communicate)
@@ -4,10 +4,22 @@ Generic utility functions not specifc to a larger suite of tools.
 For example, not specific to OCP, Gluster, Heketi, etc.
 """
 
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import errno
 import random
 import string
 
 from prometheus_client.parser import text_string_to_metric_families
+from six.moves import http_client
+import yaml
+
+# NOTE: libyaml based loader is much faster than the pure-Python one.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def get_random_str(size=14):
@@ -48,3 +60,40 @@ def parse_prometheus_data(text):
                 metrics[key] = val
 
     return metrics
+
+
+def load_json_or_yaml(text):
+    """Parse JSON or YAML text using the fastest available decoder.
+
+    JSON is tried first, because its decoder is much faster than any of
+    the YAML ones. Only if it fails, text gets parsed as YAML.
+
+    Args:
+        text (str): JSON or YAML formatted data
+
+    Returns:
+        parsed data as python objects
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return yaml.load(text, Loader=YAML_LOADER)
+
+
+def is_closed_connection_error(error):
+    """Check whether HTTP request failed because of closed connection.
+
+    Servers may close idle keep-alive connections at any time, and such
+    a connection fails the next request before it gets processed, so the
+    request may be safely sent again using new connection.
+
+    Args:
+        error (Exception): error raised by the request.
+    Returns:
+        bool: True if the server closed connection before replying.
+    """
+    # NOTE: 'RemoteDisconnected' of py3 is subclass of 'BadStatusLine'.
+    if isinstance(error, http_client.BadStatusLine):
+        return True
+    return getattr(error, "errno", None) in (
+        errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED)
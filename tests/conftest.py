@@ -0,0 +1,54 @@
+"""Pytest hooks reporting commands run by the test cases.
+
+Summary of the commands run by each test case gets attached to its JUnit
+report as 'commands[<family>]' properties and logged. If 'common' section
+of the config has 'command_metrics_file' option, then all the collected
+metrics get written to that file in the Prometheus text format after each
+test case.
+
+Full outputs of the commands which are too long to be logged get spilled
+to the file named after the test case if 'command_output_spill_dir' option
+is set. See 'openshiftstoragelibs/command_log.py' for details.
+"""
+
+from glusto.core import Glusto as g
+import pytest
+
+from openshiftstoragelibs.command_log import COMMAND_OUTPUT_LOGGER
+from openshiftstoragelibs.command_metrics import COMMAND_METRICS
+
+
+def _write_command_metrics_file():
+    path = g.config.get("common", {}).get("command_metrics_file")
+    if not path:
+        return
+    try:
+        COMMAND_METRICS.write_prometheus_file(path)
+    except (IOError, OSError) as e:
+        g.log.error(
+            "Failed to write command metrics to '%s' file: %s" % (path, e))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    item._command_metrics_snapshot = COMMAND_METRICS.snapshot()
+    COMMAND_OUTPUT_LOGGER.set_test_name(item.nodeid)
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    yield
+    COMMAND_OUTPUT_LOGGER.set_test_name(None)
+    snapshot = getattr(item, "_command_metrics_snapshot", None)
+    if snapshot is None:
+        return
+    properties = COMMAND_METRICS.get_junit_properties(since=snapshot)
+    item.user_properties.extend(properties)
+    g.log.info("Commands run by the '%s' test case:\n%s" % (
+        item.nodeid, "\n".join("%s: %s" % p for p in properties)))
+    _write_command_metrics_file()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    _write_command_metrics_file()
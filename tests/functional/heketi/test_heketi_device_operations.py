@@ -5,6 +5,7 @@ import six
 
 from openshiftstoragelibs.baseclass import BaseClass
 from openshiftstoragelibs.heketi_ops import (
+    HeketiTopology,
     heketi_blockvolume_create,
     heketi_blockvolume_delete,
     heketi_device_add,
@@ -12,11 +13,14 @@ from openshiftstoragelibs.heketi_ops import (
     heketi_device_disable,
     heketi_device_enable,
     heketi_device_info,
+    heketi_device_info_list,
     heketi_device_remove,
     heketi_node_disable,
     heketi_node_enable,
     heketi_node_info,
+    heketi_node_info_list,
     heketi_node_list,
+    heketi_node_set_state_list,
     heketi_topology_info,
     heketi_volume_create,
     heketi_volume_delete,
@@ -68,30 +72,26 @@ class TestHeketiDeviceOperations(BaseClass):
         self.assertTrue(node_list, "Failed to list heketi nodes")
         g.log.info("Successfully got the list of nodes")
         # Fetch online nodes  from node list
-        online_hosts = []
-
-        for node in node_list:
-            node_info = heketi_node_info(
-                self.heketi_client_node, self.heketi_server_url,
-                node, json=True)
-            if node_info["state"] == "online":
-                online_hosts.append(node_info)
+        online_hosts = [
+            node_info for node_info in heketi_node_info_list(
+                self.heketi_client_node, self.heketi_server_url, node_list)
+            if node_info["state"] == "online"]
 
         # Skip test if online node count is less than 3i
         if len(online_hosts) < 3:
             raise self.skipTest(
                 "This test can run only if online hosts are more than 2")
         # if we have n nodes, disable n-3 nodes
-        for node_info in online_hosts[3:]:
-            node_id = node_info["id"]
-            g.log.info("going to disable node id %s", node_id)
-            heketi_node_disable(self.heketi_client_node,
-                                self.heketi_server_url,
-                                node_id)
-            self.addCleanup(heketi_node_enable,
+        node_ids = [node_info["id"] for node_info in online_hosts[3:]]
+        if node_ids:
+            g.log.info("going to disable node ids %s", node_ids)
+            self.addCleanup(heketi_node_set_state_list,
                             self.heketi_client_node,
                             self.heketi_server_url,
-                            node_id)
+                            node_ids, True)
+            heketi_node_set_state_list(self.heketi_client_node,
+                                       self.heketi_server_url,
+                                       node_ids, False)
 
         for host in online_hosts[1:3]:
             found_online = False
@@ -384,9 +384,8 @@ class TestHeketiDeviceOperations(BaseClass):
 
         node_ids = heketi_node_list(heketi_node, heketi_url)
         self.assertTrue(node_ids)
-        for node_id in node_ids:
-            node_info = heketi_node_info(
-                heketi_node, heketi_url, node_id, json=True)
+        for node_id, node_info in zip(node_ids, heketi_node_info_list(
+                heketi_node, heketi_url, node_ids)):
             if (node_info["state"].lower() != "online"
                     or not node_info["devices"]):
                 continue
@@ -619,17 +618,16 @@ class TestHeketiDeviceOperations(BaseClass):
         h_node, h_url = self.heketi_client_node, self.heketi_server_url
 
         # Get the hostname  and devices attached to each host
-        topology_info = heketi_topology_info(h_node, h_url, json=True)
-        for cluster in topology_info['clusters']:
-            for node in cluster['nodes']:
-                node_with_devices[node['hostnames']['manage'][0]] = [
-                    device['id'] for device in node['devices']]
+        topology = HeketiTopology.get(h_node, h_url)
+        for node in topology.nodes.values():
+            node_with_devices[node['hostnames']['manage'][0]] = [
+                device['id'] for device in node['devices']]
 
         # Validate dev_path of each device
         for node, devices in node_with_devices.items():
             for dev in list(devices):
                 is_true = validate_dev_path_vg_and_uuid(
-                    h_node, h_url, node, dev)
+                    h_node, h_url, node, dev, topology=topology)
                 self.assertTrue(is_true, "Failed to verify dv_path for the "
                                 "device {}".format(dev))
 
@@ -665,8 +663,8 @@ class TestHeketiDeviceOperations(BaseClass):
         # Set tag on device on 3 different nodes
         node_list = heketi_node_list(h_node, h_server, json=True)
         device_list = []
-        for node_id in node_list[:3]:
-            node_info = heketi_node_info(h_node, h_server, node_id, json=True)
+        for node_info in heketi_node_info_list(
+                h_node, h_server, node_list[:3]):
             device_id = node_info.get('devices', {})[0].get('id')
             device_list.append(device_id)
             set_tags(h_node, h_server, 'device', device_id, "tier:test")
@@ -675,9 +673,8 @@ class TestHeketiDeviceOperations(BaseClass):
                 raise_on_error=False)
 
         # Get initial number of bricks present on device
-        for device_id in device_list:
-            device_info = heketi_device_info(
-                h_node, h_server, device_id, json=True)
+        for device_info in heketi_device_info_list(
+                h_node, h_server, device_list):
             initial_brick_count.append(len(device_info.get("bricks")))
 
         # Create volume with device tag option
@@ -689,9 +686,8 @@ class TestHeketiDeviceOperations(BaseClass):
             heketi_volume_delete, h_node, h_server, volume_info.get("id"))
 
         # Get number of bricks present on device after volume create
-        for device_id in device_list:
-            device_info = heketi_device_info(
-                h_node, h_server, device_id, json=True)
+        for device_info in heketi_device_info_list(
+                h_node, h_server, device_list):
             before_brick_count.append(len(device_info.get("bricks")))
 
         # Validate volume has created on tag devices
@@ -709,9 +705,8 @@ class TestHeketiDeviceOperations(BaseClass):
             heketi_volume_delete, h_node, h_server, volume_info.get("id"))
 
         # Get number of bricks present on device after volume create
-        for device_id in device_list:
-            device_info = heketi_device_info(
-                h_node, h_server, device_id, json=True)
+        for device_info in heketi_device_info_list(
+                h_node, h_server, device_list):
             after_brick_count.append(len(device_info.get("bricks")))
 
         # Validate volume has not created on tag devices
@@ -755,10 +750,11 @@ class TestHeketiDeviceOperations(BaseClass):
 
         # Disable 4th and other nodes
         if len(node_id_list) > 3:
-            for node_id in node_id_list[3:]:
-                heketi_node_disable(h_client, h_server, node_id)
-                self.addCleanup(
-                    heketi_node_enable, h_client, h_server, node_id)
+            self.addCleanup(
+                heketi_node_set_state_list, h_client, h_server,
+                node_id_list[3:], True)
+            heketi_node_set_state_list(
+                h_client, h_server, node_id_list[3:], False)
 
         # Create volume when 3 nodes are online
         vol_size, vol_count = 2, 4
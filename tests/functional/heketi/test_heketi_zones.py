@@ -113,16 +113,11 @@ class TestHeketiZones(baseclass.BaseClass):
         return heketi_db_data
 
     def _get_online_nodes(self):
-        node_ids = heketi_ops.heketi_node_list(self.h_client, self.h_server)
-        online_nodes = []
-        for node_id in node_ids:
-            node_info = heketi_ops.heketi_node_info(
-                self.h_client, self.h_server, node_id, json=True)
-            if (node_info["state"] == "online"
-                    and node_info['cluster'] == self.cluster_id):
-                online_nodes.append(
-                    (node_info["zone"], node_info['hostnames']['storage']))
-        return online_nodes
+        topology = heketi_ops.HeketiTopology.get(self.h_client, self.h_server)
+        return [
+            (node["zone"], node['hostnames']['storage'])
+            for node in topology.get_nodes(
+                cluster_id=self.cluster_id, online=True)]
 
     def _check_for_available_zones(self, zone_count):
         # Check amount of available online heketi nodes
@@ -588,30 +583,22 @@ class TestHeketiZones(baseclass.BaseClass):
                     }
         """
         zone_devices_nodes = dict()
-        topology_info = heketi_ops.heketi_topology_info(
-            self.h_client, self.h_server, json=True)
-        for cluster in topology_info['clusters']:
-            for node in cluster['nodes']:
-                if node['state'] == 'online':
-                    if node['zone'] not in zone_devices_nodes:
-                        zone_devices_nodes[node['zone']] = dict()
-
-                    if 'nodes' not in zone_devices_nodes[node['zone']]:
-                        zone_devices_nodes[node['zone']]['nodes'] = []
-
-                    (zone_devices_nodes[node['zone']][
-                        'nodes'].append(node['id']))
-
-                for device in node['devices']:
-                    if device['state'] == 'online':
-                        if node['zone'] not in zone_devices_nodes:
-                            zone_devices_nodes[node['zone']] = dict()
-
-                        if 'devices' not in zone_devices_nodes[node['zone']]:
-                            zone_devices_nodes[node['zone']]['devices'] = []
-
-                        (zone_devices_nodes[
-                            node['zone']]['devices'].append(device['id']))
+        topology = heketi_ops.HeketiTopology.get(self.h_client, self.h_server)
+        for zone in topology.zone_nodes:
+            zone_nodes = topology.get_nodes(zone=zone)
+            online_nodes = [
+                node['id'] for node in zone_nodes
+                if node['state'] == 'online']
+            online_devices = [
+                device['id'] for node in zone_nodes
+                for device in topology.get_devices(node['id'])
+                if device['state'] == 'online']
+            if online_nodes:
+                zone_devices_nodes.setdefault(zone, {})['nodes'] = (
+                    online_nodes)
+            if online_devices:
+                zone_devices_nodes.setdefault(zone, {})['devices'] = (
+                    online_devices)
 
         return zone_devices_nodes
 
@@ -0,0 +1,35 @@
+"""Config of the library used by the unit tests.
+
+Unit tests run the library against local stub servers, so they need
+neither a cluster nor a Glusto config file. Config used by the library
+gets defined here and must be set before any of the library modules get
+imported.
+"""
+
+from glusto.core import Glusto as g
+
+
+OCP_NODE = "master.example.com"
+HEKETI_USER = "admin"
+HEKETI_KEY = "adminkey"
+
+g.update_config({
+    "ocp_servers": {
+        "master": {OCP_NODE: {"hostname": OCP_NODE}},
+        "client": {OCP_NODE: {"hostname": OCP_NODE}},
+        "nodes": {},
+    },
+    "gluster_servers": {},
+    "openshift": {
+        "storage_project_name": "glusterfs",
+        "heketi_config": {
+            "heketi_dc_name": "heketi-storage",
+            "heketi_service_name": "heketi-storage",
+            "heketi_client_node": OCP_NODE,
+            "heketi_server_url": "http://heketi-storage.glusterfs.svc:8080",
+            "heketi_cli_user": HEKETI_USER,
+            "heketi_cli_key": HEKETI_KEY,
+        },
+    },
+    "common": {},
+})
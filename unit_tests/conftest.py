@@ -0,0 +1,3 @@
+# NOTE: config of the library must be set before any of the library modules
+# get imported by the test modules.
+from unit_tests import config  # noqa: F401
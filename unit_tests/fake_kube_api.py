@@ -0,0 +1,199 @@
+"""Fake Kubernetes API server used as handler of the stub server.
+
+It keeps API objects in memory and serves the subset of the API which is
+used by 'kube_api.KubeAPIClient': getting of objects and their lists
+filtered by label selector, creation, deletion and strategic merge
+patching. Objects get stored as they are, no defaults get applied, except
+of the metadata fields set by the API server.
+
+Example:
+    >>> api = FakeKubeAPI(token="secret")
+    >>> api.add_object(pod)
+    >>> with stub_server.StubServer(api) as server:
+    ...     client = kube_api.KubeAPIClient(server.url, token="secret")
+"""
+
+import copy
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import threading
+
+from six.moves.urllib import parse as urlparse
+
+from openshiftstoragelibs import kube_api
+
+
+CREATION_TIMESTAMP = "2020-01-01T00:00:00Z"
+STRATEGIC_MERGE_PATCH = "application/strategic-merge-patch+json"
+
+
+def _merge(obj, changes):
+    for key, value in changes.items():
+        if value is None:
+            obj.pop(key, None)
+        elif isinstance(value, dict) and isinstance(obj.get(key), dict):
+            _merge(obj[key], value)
+        else:
+            obj[key] = copy.deepcopy(value)
+
+
+def _match_selector(obj, selector):
+    labels = obj.get("metadata", {}).get("labels") or {}
+    for requirement in filter(None, (selector or "").split(",")):
+        key, value = requirement.split("=", 1)
+        if labels.get(key) != value:
+            return False
+    return True
+
+
+def _reply(code, obj):
+    return code, {"Content-Type": "application/json"}, json.dumps(obj)
+
+
+def _status(code, reason, message):
+    return _reply(code, {
+        "kind": "Status",
+        "apiVersion": "v1",
+        "status": "Failure",
+        "message": message,
+        "reason": reason,
+        "code": code,
+    })
+
+
+class FakeKubeAPI(object):
+    """Handler of the stub server serving Kubernetes API objects.
+
+    Args:
+        token (str): bearer token expected in the requests.
+        namespace (str): namespace of the objects added without one.
+    """
+
+    def __init__(self, token="token", namespace="glusterfs"):
+        self.token = token
+        self.namespace = namespace
+        self.objects = {}
+        self._resource_version = 0
+        self._lock = threading.Lock()
+
+    def _next_resource_version(self):
+        self._resource_version += 1
+        return str(self._resource_version)
+
+    def _get_key(self, resource, name, namespace):
+        return (resource["plural"],
+                namespace if resource["namespaced"] else None, name)
+
+    def add_object(self, obj, namespace=None):
+        """Store API object like it was created by the API server."""
+        resource = kube_api.KINDS[obj["kind"]]
+        obj = copy.deepcopy(obj)
+        metadata = obj.setdefault("metadata", {})
+        if resource["namespaced"]:
+            metadata["namespace"] = (
+                namespace or metadata.get("namespace") or self.namespace)
+        metadata.setdefault("creationTimestamp", CREATION_TIMESTAMP)
+        metadata.setdefault("uid", "uid-%s" % metadata["name"])
+        with self._lock:
+            metadata["resourceVersion"] = self._next_resource_version()
+            self.objects[self._get_key(
+                resource, metadata["name"], metadata.get("namespace"))] = obj
+        return obj
+
+    def get_object(self, rtype, name, namespace=None):
+        """Get stored object or None if it is absent."""
+        resource = kube_api.get_resource(rtype)
+        return self.objects.get(self._get_key(
+            resource, name, namespace or self.namespace))
+
+    def _parse_path(self, path):
+        """Get resource info, namespace and object name of the URL path."""
+        parts = path.strip("/").split("/")
+        if parts[0] == "api":
+            api_version, parts = parts[1], parts[2:]
+        else:
+            api_version, parts = "/".join(parts[1:3]), parts[3:]
+        namespace = None
+        if parts[0] == "namespaces" and len(parts) > 2:
+            namespace, parts = parts[1], parts[2:]
+        resource = kube_api.get_resource(parts[0])
+        if resource is None or resource["api_version"] != api_version:
+            return None, None, None
+        return resource, namespace, (parts[1] if len(parts) > 1 else None)
+
+    def __call__(self, request):
+        if request.headers.get("authorization") != "Bearer %s" % self.token:
+            return _status(401, "Unauthorized", "Unauthorized")
+        parsed_url = urlparse.urlsplit(request.path)
+        params = dict(urlparse.parse_qsl(parsed_url.query))
+        resource, namespace, name = self._parse_path(parsed_url.path)
+        if resource is None:
+            return _status(404, "NotFound", "the server could not find "
+                           "the requested resource")
+        with self._lock:
+            if name is None and request.method == "GET":
+                return self._list(resource, namespace, params)
+            if name is None and request.method == "POST":
+                return self._create(resource, namespace, request)
+            key = self._get_key(resource, name, namespace)
+            if key not in self.objects:
+                return _status(404, "NotFound", '%s "%s" not found' % (
+                    resource["plural"], name))
+            if request.method == "GET":
+                return _reply(200, self.objects[key])
+            if request.method == "DELETE":
+                del self.objects[key]
+                return _reply(200, {
+                    "kind": "Status", "apiVersion": "v1",
+                    "status": "Success"})
+            if request.method == "PATCH":
+                return self._patch(key, request)
+        return _status(405, "MethodNotAllowed", "method not allowed")
+
+    def _list(self, resource, namespace, params):
+        items = []
+        for key, obj in sorted(self.objects.items()):
+            if key[0] != resource["plural"] or (
+                    namespace and key[1] != namespace):
+                continue
+            if _match_selector(obj, params.get("labelSelector")):
+                # NOTE: API server doesn't set kind of the list items.
+                items.append(dict(
+                    (k, v) for k, v in obj.items()
+                    if k not in ("kind", "apiVersion")))
+        return _reply(200, {
+            "kind": "%sList" % resource["kind"],
+            "apiVersion": resource["api_version"],
+            "metadata": {"resourceVersion": str(self._resource_version)},
+            "items": items,
+        })
+
+    def _create(self, resource, namespace, request):
+        obj = json.loads(request.body)
+        if obj.get("kind") != resource["kind"]:
+            return _status(400, "BadRequest", "kind mismatch")
+        metadata = obj.setdefault("metadata", {})
+        if resource["namespaced"]:
+            metadata["namespace"] = namespace
+        key = self._get_key(resource, metadata.get("name"), namespace)
+        if key in self.objects:
+            return _status(409, "AlreadyExists", '%s "%s" already exists' % (
+                resource["plural"], metadata.get("name")))
+        metadata["creationTimestamp"] = CREATION_TIMESTAMP
+        metadata["uid"] = "uid-%s" % metadata["name"]
+        metadata["resourceVersion"] = self._next_resource_version()
+        self.objects[key] = obj
+        return _reply(201, obj)
+
+    def _patch(self, key, request):
+        if request.headers.get("content-type") != STRATEGIC_MERGE_PATCH:
+            return _status(415, "UnsupportedMediaType", "the body of the "
+                           "request was in an unknown format")
+        obj = self.objects[key]
+        _merge(obj, json.loads(request.body))
+        obj["metadata"]["resourceVersion"] = self._next_resource_version()
+        return _reply(200, obj)
@@ -0,0 +1,135 @@
+"""Local HTTP server replying the way the given handler function decides.
+
+It is used for testing the HTTP clients of the library without real
+servers. Server speaks HTTP/1.1, so keep-alive connections are kept open
+until client closes them or 'drop_connections' method gets called, what
+simulates server closing idle connections.
+
+Example:
+    >>> def handler(request):
+    ...     return 200, {"Content-Type": "text/plain"}, "Hello"
+    >>> with StubServer(handler) as server:
+    ...     client = HeketiClient(server.url)
+"""
+
+import collections
+import socket
+import threading
+
+import six
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+
+Request = collections.namedtuple(
+    "Request", ("method", "path", "headers", "body", "client_address"))
+
+
+class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.stub._add_socket(self.connection)
+
+    def finish(self):
+        try:
+            BaseHTTPServer.BaseHTTPRequestHandler.finish(self)
+        finally:
+            self.server.stub._remove_socket(self.connection)
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        request = Request(
+            self.command, self.path,
+            dict((k.lower(), v) for k, v in self.headers.items()),
+            body, self.client_address)
+        status, headers, content = self.server.stub._handle(request)
+        if isinstance(content, six.text_type):
+            content = content.encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content or b"")))
+        self.end_headers()
+        if content:
+            self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class StubServer(object):
+    """HTTP server running in the background thread on a random port.
+
+    Args:
+        handler (callable): called with the 'Request' object for each of
+            the requests, returns tuple of status code, dict of headers
+            and body.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self._lock = threading.Lock()
+        self._sockets = set()
+        self._server = _ThreadingHTTPServer(("127.0.0.1", 0), _RequestHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+
+    @property
+    def url(self):
+        return "http://%s:%s" % self._server.server_address
+
+    @property
+    def client_ports(self):
+        """Set of client ports, one per each of the client connections."""
+        return set(r.client_address[1] for r in self.requests)
+
+    def _add_socket(self, sock):
+        with self._lock:
+            self._sockets.add(sock)
+
+    def _remove_socket(self, sock):
+        with self._lock:
+            self._sockets.discard(sock)
+
+    def _handle(self, request):
+        with self._lock:
+            self.requests.append(request)
+        return self.handler(request)
+
+    def drop_connections(self):
+        """Close all the open connections like servers close idle ones."""
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self.drop_connections()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
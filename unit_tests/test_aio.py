@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+from glusto.core import Glusto as g
+import pytest
+
+from openshiftstoragelibs import aio
+from openshiftstoragelibs import heketi_ops
+from openshiftstoragelibs import openshift_ops
+from openshiftstoragelibs import simulator
+from unit_tests import config
+
+
+@pytest.fixture
+def simulated_cluster():
+    simulated = simulator.ClusterSimulator(seed=0, latency=0.2)
+    previous_transport = g.set_transport(simulated)
+    openshift_ops.GLUSTER_TOPOLOGY.invalidate()
+    yield simulated
+    g.set_transport(previous_transport)
+    openshift_ops.GLUSTER_TOPOLOGY.invalidate()
+
+
+def test_gather_bounded_limits_concurrency():
+    running, max_running = [0], [0]
+
+    async def task(i):
+        running[0] += 1
+        max_running[0] = max(max_running[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return i
+
+    results = aio.run(aio.gather_bounded(
+        [task(i) for i in range(10)], limit=3))
+
+    assert results == list(range(10))
+    assert max_running[0] == 3
+
+
+def test_gather_bounded_exceptions():
+    async def task(i):
+        if i == 1:
+            raise ValueError(i)
+        return i
+
+    results = aio.run(aio.gather_bounded(
+        [task(i) for i in range(3)], return_exceptions=True))
+    assert results[0::2] == [0, 2]
+    assert isinstance(results[1], ValueError)
+
+    with pytest.raises(ValueError):
+        aio.run(aio.gather_bounded([task(i) for i in range(3)]))
+
+
+def test_to_thread_runs_functions_in_parallel():
+    # NOTE: barrier gets passed only if all the functions run at once.
+    barrier = threading.Barrier(4, timeout=5)
+
+    def func(i):
+        barrier.wait()
+        return i, threading.current_thread()
+
+    results = aio.run(aio.gather_bounded(
+        [aio.to_thread(func, i) for i in range(4)], limit=4))
+
+    assert [i for i, _thread in results] == list(range(4))
+    assert threading.current_thread() not in [t for _i, t in results]
+
+
+def test_coroutines_run_commands_concurrently(simulated_cluster):
+    expected = openshift_ops.oc_get_pods(config.OCP_NODE)
+
+    start = time.time()
+    results = aio.run(aio.gather_bounded(
+        [aio.oc_get_pods(config.OCP_NODE) for i in range(5)], limit=5))
+    duration = time.time() - start
+
+    assert results == [expected] * 5
+    assert duration < 5 * simulated_cluster.latency
+
+
+def test_heketi_functions_are_wrapped():
+    assert asyncio.iscoroutinefunction(aio.heketi_volume_list)
+    assert aio.heketi_volume_list.__name__ == "heketi_volume_list"
+    assert aio.heketi_volume_list.__doc__.startswith(
+        "Coroutine version of "
+        "'openshiftstoragelibs.heketi_ops.heketi_volume_list'.")
+    for name in dir(heketi_ops):
+        if name.startswith("heketi_") and callable(
+                getattr(heketi_ops, name)):
+            assert asyncio.iscoroutinefunction(getattr(aio, name)), name
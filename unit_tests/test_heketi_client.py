@@ -0,0 +1,288 @@
+import base64
+import hashlib
+import hmac
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import threading
+import time
+
+from glusto.core import Glusto as g
+import mock
+import pytest
+
+from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import heketi_client
+from openshiftstoragelibs import heketi_ops
+from unit_tests import config
+from unit_tests import stub_server
+
+
+def _b64url_decode(data):
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class FakeHeketi(object):
+    """Handler of the stub server which serves Heketi API like Heketi does.
+
+    Requests get authenticated the way Heketi does it, volumes get created
+    and deleted using async operations which stay pending 'pending_polls'
+    times before they get finished.
+    """
+
+    def __init__(self, user=config.HEKETI_USER, key=config.HEKETI_KEY,
+                 pending_polls=1, delay=0):
+        self.user = user
+        self.key = key
+        self.pending_polls = pending_polls
+        self.delay = delay
+        self.volumes = {}
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def _check_auth(self, request):
+        auth = request.headers.get("authorization", "")
+        if not auth.lower().startswith("bearer "):
+            return "Token missing"
+        header, claims, signature = auth.split(" ", 1)[1].split(".")
+        expected_signature = hmac.new(
+            self.key.encode("utf-8"),
+            ("%s.%s" % (header, claims)).encode("ascii"),
+            hashlib.sha256).digest()
+        if _b64url_decode(signature) != expected_signature:
+            return "Token signature is invalid"
+        claims = json.loads(_b64url_decode(claims))
+        qsh = hashlib.sha256(("%s&%s" % (
+            request.method, request.path.split("?")[0])).encode(
+                "utf-8")).hexdigest()
+        if claims["iss"] != self.user or claims["qsh"] != qsh:
+            return "Invalid JWT token: unknown user or qsh"
+        if not claims["iat"] <= time.time() + 1 <= claims["exp"]:
+            return "Token is expired"
+        return None
+
+    def _start_operation(self, result_location):
+        with self._lock:
+            op_id = str(len(self._operations) + 1)
+            self._operations[op_id] = [self.pending_polls, result_location]
+        return 202, {"Location": "/queue/%s" % op_id}, ""
+
+    def _poll_operation(self, op_id):
+        with self._lock:
+            operation = self._operations[op_id]
+            if operation[0] > 0:
+                operation[0] -= 1
+                return 200, {"X-Pending": "true"}, ""
+        if operation[1] is None:
+            return 204, {}, ""
+        return 303, {"Location": operation[1]}, ""
+
+    def __call__(self, request):
+        error = self._check_auth(request)
+        if error:
+            return 401, {}, error + "\n"
+        if self.delay:
+            time.sleep(self.delay)
+        parts = request.path.strip("/").split("/")
+        if request.method == "GET" and parts == ["hello"]:
+            return 200, {}, "Hello from Heketi"
+        if parts[0] == "queue":
+            return self._poll_operation(parts[1])
+        if request.method == "POST" and parts == ["volumes"]:
+            req = json.loads(request.body)
+            vol_id = "%032x" % (len(self.volumes) + 1)
+            self.volumes[vol_id] = {
+                "id": vol_id,
+                "name": req.get("name") or "vol_%s" % vol_id,
+                "size": req["size"],
+                "durability": req["durability"],
+            }
+            return self._start_operation("/volumes/%s" % vol_id)
+        if parts[0] == "volumes" and len(parts) == 2:
+            if parts[1] not in self.volumes:
+                return 404, {}, "Id not found\n"
+            if request.method == "DELETE":
+                del self.volumes[parts[1]]
+                return self._start_operation(None)
+            return 200, {"Content-Type": "application/json"}, json.dumps(
+                self.volumes[parts[1]])
+        return 404, {}, "404 page not found\n"
+
+
+@pytest.fixture
+def fake_heketi():
+    heketi = FakeHeketi()
+    with stub_server.StubServer(heketi) as server:
+        server.heketi = heketi
+        yield server
+
+
+@pytest.fixture
+def client(fake_heketi):
+    client = heketi_client.HeketiClient(
+        fake_heketi.url, config.HEKETI_USER, config.HEKETI_KEY, timeout=5,
+        poll_interval=0.01)
+    yield client
+    client.close()
+
+
+def test_get_heketi_jwt():
+    token = heketi_client.get_heketi_jwt(
+        "admin", "secret", "get", "/volumes", now=1000)
+    header, claims, signature = token.split(".")
+
+    assert json.loads(_b64url_decode(header)) == {
+        "alg": "HS256", "typ": "JWT"}
+    assert json.loads(_b64url_decode(claims)) == {
+        "iss": "admin",
+        "iat": 1000,
+        "exp": 1000 + heketi_client.HEKETI_TOKEN_TTL,
+        "qsh": hashlib.sha256(b"GET&/volumes").hexdigest(),
+    }
+    assert _b64url_decode(signature) == hmac.new(
+        b"secret", ("%s.%s" % (header, claims)).encode("ascii"),
+        hashlib.sha256).digest()
+
+
+def test_requests_are_signed(client, fake_heketi):
+    assert client.hello() == "Hello from Heketi"
+
+    unsigned_client = heketi_client.HeketiClient(fake_heketi.url)
+    with pytest.raises(exceptions.HeketiClientError) as exc_info:
+        unsigned_client.hello()
+    assert exc_info.value.status == 401
+
+    wrong_key_client = heketi_client.HeketiClient(
+        fake_heketi.url, config.HEKETI_USER, "wrongkey")
+    with pytest.raises(exceptions.HeketiClientError) as exc_info:
+        wrong_key_client.hello()
+    assert exc_info.value.status == 401
+    assert "signature is invalid" in str(exc_info.value)
+
+
+def test_keep_alive_connection_is_reused(client, fake_heketi):
+    for i in range(5):
+        client.hello()
+
+    assert len(fake_heketi.requests) == 5
+    assert len(fake_heketi.client_ports) == 1
+
+
+def test_async_operation_is_polled(client, fake_heketi):
+    fake_heketi.heketi.pending_polls = 3
+
+    vol = client.volume_create({
+        "size": 1, "name": "vol1",
+        "durability": {"type": "replicate", "replicate": {"replica": 3}}})
+
+    assert vol == fake_heketi.heketi.volumes[vol["id"]]
+    assert [(r.method, r.path) for r in fake_heketi.requests] == [
+        ("POST", "/volumes")] + [("GET", "/queue/1")] * 4 + [
+        ("GET", "/volumes/%s" % vol["id"])]
+
+    assert client.volume_delete(vol["id"]) is None
+    assert fake_heketi.heketi.volumes == {}
+    assert fake_heketi.requests[-1].path == "/queue/2"
+
+
+def test_async_operation_timeout(client, fake_heketi):
+    fake_heketi.heketi.pending_polls = 1000
+
+    with pytest.raises(exceptions.HeketiClientError) as exc_info:
+        client.request(
+            "POST", "/volumes", {"size": 1, "durability": {}}, timeout=0.1)
+
+    assert "was not finished in 0.1 seconds" in str(exc_info.value)
+    assert exc_info.value.status is None
+
+
+def test_error_status_is_raised(client):
+    with pytest.raises(exceptions.HeketiClientError) as exc_info:
+        client.volume_info("absent")
+
+    assert exc_info.value.status == 404
+    assert "Id not found" in str(exc_info.value)
+
+
+def test_closed_keep_alive_connection_is_retried(client, fake_heketi):
+    connections = [client._get_connection()[0] for i in range(2)]
+    for conn in connections:
+        headers = client._get_headers("GET", "/hello", None)
+        conn.request("GET", "/hello", headers=headers)
+        conn.getresponse().read()
+        client._put_connection(conn)
+    fake_heketi.drop_connections()
+
+    # NOTE: all the pooled connections are closed by server, so retry
+    # must use new connection instead of another pooled one.
+    assert client.hello() == "Hello from Heketi"
+    assert len(fake_heketi.requests) == 3
+    assert len(fake_heketi.client_ports) == 3
+
+
+def test_closed_new_connection_is_not_retried(client, fake_heketi):
+    with mock.patch.object(
+            client, "_new_connection",
+            side_effect=client._new_connection) as new_connection:
+        client.hello()
+        fake_heketi.drop_connections()
+        fake_heketi.stop()
+        with pytest.raises(exceptions.HeketiClientError):
+            client.hello()
+
+    # NOTE: the stale pooled connection fails first, then new connection
+    # fails and it is not retried anymore.
+    assert new_connection.call_count == 2
+
+
+def test_timed_out_request_is_not_retried(fake_heketi):
+    client = heketi_client.HeketiClient(
+        fake_heketi.url, config.HEKETI_USER, config.HEKETI_KEY, timeout=0.2)
+    client.hello()
+    fake_heketi.heketi.delay = 0.5
+
+    with pytest.raises(exceptions.HeketiClientError) as exc_info:
+        client.request("POST", "/volumes", {"size": 1, "durability": {}})
+
+    assert "timed out" in str(exc_info.value)
+    time.sleep(0.5)
+    assert [r.method for r in fake_heketi.requests] == ["GET", "POST"]
+
+
+@pytest.fixture
+def heketi_rest_client(fake_heketi):
+    heketi_config = g.config["openshift"]["heketi_config"]
+    with mock.patch.dict(heketi_config, heketi_use_rest_client=True):
+        with mock.patch.object(heketi_ops, "heketi_cmd_run") as cmd_run:
+            yield fake_heketi
+    cmd_run.assert_not_called()
+    heketi_client.get_heketi_client(
+        fake_heketi.url, config.HEKETI_USER, config.HEKETI_KEY).close()
+
+
+def test_heketi_ops_use_rest_client(heketi_rest_client):
+    heketi_rest_client.heketi.pending_polls = 0
+
+    vol = heketi_ops.heketi_volume_create(
+        config.OCP_NODE, heketi_rest_client.url, 2, name="vol2", json=True)
+
+    assert vol["name"] == "vol2"
+    assert vol["size"] == 2
+    assert vol["durability"] == {
+        "type": "replicate", "replicate": {"replica": 3}}
+    assert heketi_ops.heketi_volume_info(
+        config.OCP_NODE, heketi_rest_client.url, vol["id"], json=True) == vol
+    assert len(heketi_rest_client.client_ports) == 1
+
+
+def test_heketi_ops_rest_client_errors(heketi_rest_client):
+    assert heketi_ops.heketi_volume_info(
+        config.OCP_NODE, heketi_rest_client.url, "absent", json=True,
+        raise_on_error=False) == ""
+    with pytest.raises(exceptions.HeketiClientError) as exc_info:
+        heketi_ops.heketi_volume_info(
+            config.OCP_NODE, heketi_rest_client.url, "absent", json=True)
+    assert exc_info.value.status == 404
@@ -0,0 +1,298 @@
+try:
+    # py2/3
+    import simplejson as json
+except ImportError:
+    # py2
+    import json
+import time
+
+from glusto.core import Glusto as g
+import mock
+import pytest
+import yaml
+
+from openshiftstoragelibs import exceptions
+from openshiftstoragelibs import kube_api
+from openshiftstoragelibs import openshift_ops
+from unit_tests import config
+from unit_tests import fake_kube_api
+from unit_tests import stub_server
+
+
+def _pod(name, node, labels=None, ready=True, restarts=0):
+    return {
+        "kind": "Pod",
+        "apiVersion": "v1",
+        "metadata": {"name": name, "labels": labels or {}},
+        "spec": {"nodeName": node, "containers": [{"name": "glusterfs"}]},
+        "status": {
+            "phase": "Running",
+            "podIP": "10.0.0.%s" % name[-1],
+            "conditions": [
+                {"type": "Initialized", "status": "True"},
+                {"type": "Ready", "status": "True" if ready else "False"},
+            ],
+            "containerStatuses": [{
+                "name": "glusterfs",
+                "ready": ready,
+                "restartCount": restarts,
+                "state": {"running": {}},
+            }],
+        },
+    }
+
+
+def _pvc(name, labels=None):
+    return {
+        "kind": "PersistentVolumeClaim",
+        "apiVersion": "v1",
+        "metadata": {"name": name, "labels": labels or {}},
+        "spec": {"resources": {"requests": {"storage": "1Gi"}}},
+    }
+
+
+@pytest.fixture
+def fake_api(tmp_path):
+    api = fake_kube_api.FakeKubeAPI()
+    with stub_server.StubServer(api) as server:
+        kubeconfig = tmp_path / "kubeconfig"
+        kubeconfig.write_text(yaml.safe_dump({
+            "current-context": "test",
+            "contexts": [{"name": "test", "context": {
+                "cluster": "test", "user": "test",
+                "namespace": api.namespace}}],
+            "clusters": [{"name": "test", "cluster": {"server": server.url}}],
+            "users": [{"name": "test", "user": {"token": api.token}}],
+        }))
+        common_config = {
+            "ocp_api_backend": "api",
+            "kube_api_kubeconfig": str(kubeconfig),
+        }
+        kube_api.reset_kube_api_client()
+        with mock.patch.dict(g.config["common"], common_config):
+            with mock.patch.object(
+                    openshift_ops.command, "cmd_run",
+                    return_value="") as cmd_run:
+                server.api, server.cmd_run = api, cmd_run
+                yield server
+        kube_api.reset_kube_api_client()
+
+
+def test_oc_get_yaml(fake_api):
+    pvc = fake_api.api.add_object(_pvc("pvc1"))
+    fake_api.api.add_object(_pvc("pvc2"))
+
+    assert openshift_ops.oc_get_yaml(config.OCP_NODE, "pvc", "pvc1") == pvc
+    pvcs = openshift_ops.oc_get_yaml(config.OCP_NODE, "pvc")
+    assert fake_api.requests[-1].path == (
+        "/api/v1/namespaces/glusterfs/persistentvolumeclaims")
+    assert pvcs["kind"] == "List"
+    assert pvcs["metadata"]["resourceVersion"] == "2"
+    assert [(i["kind"], i["apiVersion"], i["metadata"]["name"])
+            for i in pvcs["items"]] == [
+        ("PersistentVolumeClaim", "v1", "pvc1"),
+        ("PersistentVolumeClaim", "v1", "pvc2")]
+    assert openshift_ops.oc_get_yaml(
+        config.OCP_NODE, "pvc", "absent", raise_on_error=False) == {}
+    with pytest.raises(exceptions.KubeAPIError) as exc_info:
+        openshift_ops.oc_get_yaml(config.OCP_NODE, "pvc", "absent")
+    assert exc_info.value.status == 404
+    assert 'persistentvolumeclaims "absent" not found' in str(
+        exc_info.value)
+
+    # NOTE: all the requests use one keep-alive connection.
+    assert len(fake_api.client_ports) == 1
+    fake_api.cmd_run.assert_not_called()
+
+
+def test_oc_create(fake_api):
+    openshift_ops.oc_create(config.OCP_NODE, yaml.safe_dump({
+        "kind": "List",
+        "apiVersion": "v1",
+        "items": [
+            _pvc("pvc1"),
+            {"kind": "Service", "apiVersion": "v1",
+             "metadata": {"name": "svc1"}, "spec": {"ports": []}},
+        ],
+    }), value_type="stdin")
+    openshift_ops.oc_create(
+        config.OCP_NODE, json.dumps(_pvc("pvc2")), value_type="stdin")
+
+    for rtype, name in (("pvc", "pvc1"), ("svc", "svc1"), ("pvc", "pvc2")):
+        obj = fake_api.api.get_object(rtype, name)
+        assert obj["metadata"]["namespace"] == "glusterfs"
+        assert obj["metadata"]["uid"] == "uid-%s" % name
+    assert [(r.method, r.path) for r in fake_api.requests] == [
+        ("POST", "/api/v1/namespaces/glusterfs/persistentvolumeclaims"),
+        ("POST", "/api/v1/namespaces/glusterfs/services"),
+        ("POST", "/api/v1/namespaces/glusterfs/persistentvolumeclaims")]
+    with pytest.raises(exceptions.KubeAPIError) as exc_info:
+        openshift_ops.oc_create(
+            config.OCP_NODE, json.dumps(_pvc("pvc2")), value_type="stdin")
+    assert exc_info.value.status == 409
+    fake_api.cmd_run.assert_not_called()
+
+
+def test_oc_create_falls_back_to_oc(fake_api):
+    obj = {"kind": "Unknown", "apiVersion": "v1", "metadata": {"name": "x"}}
+
+    openshift_ops.oc_create(
+        config.OCP_NODE, json.dumps(obj), value_type="stdin")
+    openshift_ops.oc_create(config.OCP_NODE, "/tmp/pvc.yaml")
+
+    assert fake_api.requests == []
+    assert [c[0][0][:3] for c in fake_api.cmd_run.call_args_list] == [
+        ["echo", "'%s'" % json.dumps(obj), "|"],
+        ["oc", "create", "-f"]]
+
+
+def test_oc_delete(fake_api):
+    fake_api.api.add_object(_pvc("pvc1"))
+    fake_api.api.add_object(_pvc("pvc2", labels={"app": "x"}))
+    fake_api.api.add_object(_pvc("pvc3", labels={"app": "x"}))
+    fake_api.api.add_object(_pvc("pvc4", labels={"app": "y"}))
+
+    openshift_ops.oc_delete(config.OCP_NODE, "pvc", "pvc1", is_force=True)
+    openshift_ops.oc_delete(config.OCP_NODE, "pvc", label={"app": "x"})
+    openshift_ops.oc_delete(
+        config.OCP_NODE, "pvc", "absent", raise_on_absence=False)
+    openshift_ops.oc_delete_resources(
+        config.OCP_NODE, "pvc", ["absent", "pvc4"])
+
+    assert fake_api.api.objects == {}
+    deletions = [r for r in fake_api.requests if r.method == "DELETE"]
+    assert [r.path.rsplit("/", 1)[-1] for r in deletions] == [
+        "pvc1", "pvc2", "pvc3", "absent", "pvc4"]
+    assert json.loads(deletions[0].body) == {
+        "kind": "DeleteOptions",
+        "apiVersion": "v1",
+        "propagationPolicy": "Background",
+        "gracePeriodSeconds": 0,
+    }
+    assert "gracePeriodSeconds" not in json.loads(deletions[1].body)
+    with pytest.raises(exceptions.KubeAPIError) as exc_info:
+        openshift_ops.oc_delete(config.OCP_NODE, "pvc", "absent")
+    assert exc_info.value.status == 404
+    fake_api.cmd_run.assert_not_called()
+
+
+def test_oc_patch(fake_api):
+    fake_api.api.add_object(_pvc("pvc1", labels={"app": "x"}))
+
+    out = openshift_ops.oc_patch(
+        config.OCP_NODE, "pvc", "pvc1",
+        {"metadata": {"labels": {"app": None, "new": "label"}}})
+
+    assert out == "pvc/pvc1 patched"
+    assert fake_api.api.get_object("pvc", "pvc1")["metadata"]["labels"] == {
+        "new": "label"}
+    assert fake_api.requests[0].headers["content-type"] == (
+        fake_kube_api.STRATEGIC_MERGE_PATCH)
+    assert openshift_ops.oc_patch(
+        config.OCP_NODE, "pvc", "absent", {"metadata": {}},
+        raise_on_error=False) is None
+    fake_api.cmd_run.assert_not_called()
+
+
+def test_oc_get_custom_resource(fake_api):
+    fake_api.api.add_object(_pod("pod1", "node1", {"app": "x"}))
+    fake_api.api.add_object(_pod("pod2", "node2", {"app": "x"}, False))
+    fake_api.api.add_object(_pod("pod3", "node1", {"app": "y"}))
+    custom = [":.metadata.name", ":.spec.nodeName",
+              r'":.status.conditions[?(@.type==\"Ready\")].status"']
+
+    assert openshift_ops.oc_get_custom_resource(
+        config.OCP_NODE, "pod", custom) == [
+        ["pod1", "node1", "True"],
+        ["pod2", "node2", "False"],
+        ["pod3", "node1", "True"]]
+    assert openshift_ops.oc_get_custom_resource(
+        config.OCP_NODE, "pod", custom, name="pod2") == [
+        "pod2", "node2", "False"]
+    assert openshift_ops.oc_get_custom_resource(
+        config.OCP_NODE, "pod", custom, selector="app=x",
+        field_selector="spec.nodeName=node1") == [["pod1", "node1", "True"]]
+    assert openshift_ops.oc_get_custom_resource(
+        config.OCP_NODE, "pod", ":.spec.absent", selector="app=z") == [[]]
+    fake_api.cmd_run.assert_not_called()
+
+
+def test_oc_get_pods(fake_api):
+    fake_api.api.add_object(_pod("pod1", "node1", {"app": "x"}, restarts=2))
+    fake_api.api.add_object(_pod("pod2", "node2", {"app": "x"}, False))
+    fake_api.api.add_object(_pod("pod3", "node1", {"app": "y"}))
+
+    pods = openshift_ops.oc_get_pods(config.OCP_NODE, selector="app=x")
+
+    assert sorted(pods) == ["pod1", "pod2"]
+    for pod in pods.values():
+        assert pod.pop("age") != "<unknown>"
+    assert pods["pod1"] == {
+        "ready": "1/1", "status": "Running", "restarts": "2",
+        "ip": "10.0.0.1", "node": "node1"}
+    assert pods["pod2"] == {
+        "ready": "0/1", "status": "Running", "restarts": "0",
+        "ip": "10.0.0.2", "node": "node2"}
+    assert list(openshift_ops.oc_get_pods(
+        config.OCP_NODE, name="pod3")) == ["pod3"]
+    assert [r.path for r in fake_api.requests] == [
+        "/api/v1/namespaces/glusterfs/pods?labelSelector=app%3Dx",
+        "/api/v1/namespaces/glusterfs/pods/pod3"]
+    fake_api.cmd_run.assert_not_called()
+
+
+def test_unreachable_api_falls_back_to_oc(fake_api):
+    fake_api.stop()
+
+    assert openshift_ops.oc_get_pods(config.OCP_NODE) == {}
+    assert openshift_ops.oc_get_pods(config.OCP_NODE) == {}
+
+    assert [c[0][0] for c in fake_api.cmd_run.call_args_list] == [
+        "oc get -o wide --no-headers=true pods "] * 2
+    assert kube_api.get_kube_api_client(config.OCP_NODE) is None
+
+
+@pytest.fixture
+def client(fake_api):
+    client = kube_api.KubeAPIClient(
+        fake_api.url, token=fake_api.api.token, namespace="glusterfs",
+        timeout=0.2)
+    yield client
+    client.close()
+
+
+def test_closed_keep_alive_connection_is_retried(client, fake_api):
+    pods = kube_api.get_resource("pods")
+    connections = [client._get_connection()[0] for i in range(2)]
+    for conn in connections:
+        conn.request(
+            "GET", client.get_path(pods),
+            headers={"Authorization": "Bearer %s" % client.token})
+        conn.getresponse().read()
+        client._put_connection(conn)
+    fake_api.drop_connections()
+
+    # NOTE: all the pooled connections are closed by server, so retry
+    # must use new connection instead of another pooled one.
+    assert client.get(pods)["items"] == []
+    assert len(fake_api.requests) == 3
+    assert len(fake_api.client_ports) == 3
+
+
+def test_timed_out_request_is_not_retried(client, fake_api):
+    pvcs = kube_api.get_resource("pvc")
+    client.get(pvcs)
+    api = fake_api.handler
+
+    def slow_handler(request):
+        time.sleep(0.5)
+        return api(request)
+
+    fake_api.handler = slow_handler
+    with pytest.raises(exceptions.KubeAPIError) as exc_info:
+        client.create(_pvc("pvc1"))
+
+    assert exc_info.value.status is None
+    assert "timed out" in str(exc_info.value)
+    time.sleep(0.5)
+    assert [r.method for r in fake_api.requests] == ["GET", "POST"]
@@ -0,0 +1,227 @@
+import threading
+
+from glusto.core import Glusto as g
+import mock
+import pytest
+
+import openshiftstoragelibs
+from openshiftstoragelibs import SSHSessionPool
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeProc(object):
+    def __init__(self, returncode):
+        self.returncode = returncode
+
+    def communicate(self):
+        return "", ""
+
+
+class FakeSSH(object):
+    def __init__(self, host, user):
+        self.host, self.user = host, user
+        self.is_alive = True
+        self.commands = []
+
+    def popen(self, command, universal_newlines=False):
+        self.commands.append(command)
+        return FakeProc(0 if self.is_alive else 255)
+
+
+@pytest.fixture
+def clock():
+    fake_clock = FakeClock()
+    with mock.patch.object(openshiftstoragelibs, "time", fake_clock):
+        yield fake_clock
+
+
+@pytest.fixture
+def sessions():
+    """List of the created sessions, closed ones have 'is_closed' set."""
+    return []
+
+
+@pytest.fixture
+def pool(clock, sessions):
+    def connect(host, user):
+        ssh = FakeSSH(host, user)
+        sessions.append(ssh)
+        return ssh
+
+    def disconnect(ssh):
+        ssh.is_closed = True
+
+    return SSHSessionPool(
+        connect, disconnect, max_sessions_per_host=2, idle_timeout=300,
+        health_check_interval=60)
+
+
+def _stats(**kwargs):
+    stats = {
+        "hits": 0, "connects": 0, "reconnects": 0, "evictions": 0,
+        "waits": 0, "wait_time": 0.0, "idle": 0, "busy": 0}
+    stats.update(kwargs)
+    return stats
+
+
+def test_sessions_are_reused_per_host(pool, sessions):
+    ssh1 = pool.acquire("host1", "root")
+    pool.release("host1", "root", ssh1)
+    assert pool.acquire("host1", "root") is ssh1
+    ssh2 = pool.acquire("host1", "root")
+    ssh3 = pool.acquire("host2", "root")
+
+    assert ssh2 is not ssh1
+    assert [(s.host, s.user) for s in sessions] == [
+        ("host1", "root"), ("host1", "root"), ("host2", "root")]
+    assert pool.get_stats() == {
+        "root@host1": _stats(hits=1, connects=2, busy=2),
+        "root@host2": _stats(connects=1, busy=1),
+    }
+    for ssh in (ssh1, ssh2):
+        pool.release("host1", "root", ssh)
+    pool.release("host2", "root", ssh3)
+    assert pool.get_stats()["root@host1"] == _stats(
+        hits=1, connects=2, idle=2)
+
+
+def test_sessions_per_host_are_limited(pool, sessions, clock):
+    busy = [pool.acquire("host1", "root") for i in range(2)]
+    acquired = []
+
+    def acquire():
+        acquired.append(pool.acquire("host1", "root"))
+    waiting_thread = threading.Thread(target=acquire)
+    waiting_thread.start()
+    waiting_thread.join(0.2)
+
+    # NOTE: other hosts are not affected by the limit of the busy host.
+    other_host_ssh = pool.acquire("host2", "root")
+    assert waiting_thread.is_alive()
+    assert acquired == []
+
+    clock.now += 5
+    pool.release("host1", "root", busy[0])
+    waiting_thread.join(5)
+
+    assert acquired == [busy[0]]
+    assert len(sessions) == 3
+    assert pool.get_stats() == {
+        "root@host1": _stats(
+            hits=1, connects=2, waits=1, wait_time=5.0, busy=2),
+        "root@host2": _stats(connects=1, busy=1),
+    }
+    pool.release("host2", "root", other_host_ssh)
+
+
+def test_idle_sessions_are_evicted(pool, sessions, clock):
+    ssh1, ssh2 = [pool.acquire("host1", "root") for i in range(2)]
+    pool.release("host1", "root", ssh1)
+    clock.now += 200
+    pool.release("host1", "root", ssh2)
+    clock.now += 101
+
+    ssh3 = pool.acquire("host1", "root")
+
+    # NOTE: 'ssh1' was idle for too long, so it got closed not being
+    # checked, and 'ssh2' got checked and reused.
+    assert ssh3 is ssh2
+    assert ssh1.is_closed
+    assert ssh1.commands == []
+    assert ssh2.commands == ["true"]
+    assert pool.get_stats()["root@host1"] == _stats(
+        hits=1, connects=2, evictions=1, busy=1)
+
+    # NOTE: expired sessions get closed on release of other ones too.
+    ssh4 = pool.acquire("host1", "root")
+    pool.release("host1", "root", ssh3)
+    clock.now += 301
+    pool.release("host1", "root", ssh4)
+
+    assert ssh3.is_closed
+    assert not hasattr(ssh4, "is_closed")
+    assert pool.get_stats()["root@host1"] == _stats(
+        hits=1, connects=3, evictions=2, idle=1)
+
+
+def test_stale_sessions_are_checked_before_reuse(pool, sessions, clock):
+    ssh1, ssh2 = [pool.acquire("host1", "root") for i in range(2)]
+    pool.release("host1", "root", ssh1)
+    pool.release("host1", "root", ssh2)
+    clock.now += 61
+
+    assert pool.acquire("host1", "root") is ssh2
+    assert ssh2.commands == ["true"]
+
+    ssh1.is_alive = False
+    ssh3 = pool.acquire("host1", "root")
+
+    assert ssh3 is sessions[-1] and ssh3 not in (ssh1, ssh2)
+    assert ssh1.commands == ["true"]
+    assert ssh1.is_closed
+    assert pool.get_stats()["root@host1"] == _stats(
+        hits=1, connects=3, reconnects=1, busy=2)
+
+
+def test_outdated_sessions_are_closed(pool, sessions):
+    ssh1, ssh2 = [pool.acquire("host1", "root") for i in range(2)]
+    pool.release("host1", "root", ssh1)
+
+    pool.close_sessions("host1", "root")
+    pool.release("host1", "root", ssh2)
+
+    assert ssh1.is_closed and ssh2.is_closed
+    ssh3 = pool.acquire("host1", "root")
+    pool.release("host1", "root", ssh3)
+    ssh4 = pool.acquire("host1", "root", fresh=True)
+    pool.release("host1", "root", ssh4, broken=True)
+
+    assert ssh3.is_closed and ssh4.is_closed
+    assert pool.get_stats()["root@host1"] == _stats(
+        connects=4, reconnects=1)
+
+
+def test_failed_connect_releases_slot(pool):
+    pool._connect = mock.Mock(side_effect=Exception("No route to host"))
+
+    for i in range(3):
+        with pytest.raises(Exception):
+            pool.acquire("host1", "root")
+
+    assert pool.get_stats()["root@host1"] == _stats()
+
+
+def test_pooled_connections_are_not_cached_by_glusto():
+    barrier = threading.Barrier(2, timeout=5)
+    shared_ssh = FakeSSH("host1", "root")
+
+    def get_ssh_connection(cls, host, user=None):
+        # NOTE: connects to different hosts must run in parallel.
+        barrier.wait()
+        ssh = FakeSSH(host, user)
+        cls._ssh_connections["%s@%s" % (user, host)] = ssh
+        return ssh
+
+    created = []
+    with mock.patch.object(
+            g, "_get_ssh_connection", classmethod(get_ssh_connection)):
+        with mock.patch.dict(g._ssh_connections, {"root@host1": shared_ssh}):
+            threads = [
+                threading.Thread(target=lambda host=host: created.append(
+                    g._create_pooled_ssh_connection(host, "root")))
+                for host in ("host1", "host2")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+            assert g._ssh_connections == {"root@host1": shared_ssh}
+    assert sorted(ssh.host for ssh in created) == ["host1", "host2"]
+    assert shared_ssh not in created